@@ -4,7 +4,11 @@ from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
 from enum import Enum
 
-from models import BrigadeType, BrigadeStats, GENERAL_TRAITS
+from models import BrigadeType, BrigadeStats, GENERAL_TRAIT_NAMES, BRIGADE_TYPE_BY_NAME, brigade_total_stats
+
+def roll_d6() -> int:
+    """Roll a six-sided die; cheaper than random.randint for the many rolls in a battle."""
+    return int(random.random() * 6) + 1
 
 class BattlePhase(Enum):
     SKIRMISH = "Skirmish"
@@ -57,7 +61,7 @@ class BattleSystem:
         self._apply_general_trait_bonuses(side2, is_holy_war)
         
         # Determine positive/negative sides (random)
-        if random.choice([True, False]):
+        if random.random() < 0.5:
             positive_side, negative_side = side1, side2
         else:
             positive_side, negative_side = side2, side1
@@ -93,20 +97,20 @@ class BattleSystem:
         neg_general = negative_side.general
         
         if pos_general:
-            trait_name, _ = GENERAL_TRAITS[pos_general.trait_id]
+            trait_name = GENERAL_TRAIT_NAMES[pos_general.trait_id]
             if trait_name == "Cautious":
                 self.log("Positive side general is Cautious - may skip skirmishing")
                 # In a real implementation, this would prompt the player
                 # For now, randomly decide
-                if random.choice([True, False]):
+                if random.random() < 0.5:
                     self.log("Positive side chooses to skip skirmishing!")
                     return {'battle_continues': True}
         
         if neg_general:
-            trait_name, _ = GENERAL_TRAITS[neg_general.trait_id]
+            trait_name = GENERAL_TRAIT_NAMES[neg_general.trait_id]
             if trait_name == "Cautious":
                 self.log("Negative side general is Cautious - may skip skirmishing")
-                if random.choice([True, False]):
+                if random.random() < 0.5:
                     self.log("Negative side chooses to skip skirmishing!")
                     return {'battle_continues': True}
         
@@ -146,8 +150,8 @@ class BattleSystem:
             target = random.choice(available_targets)
             
             # Roll skirmish vs defense
-            skirmish_roll = random.randint(1, 6) + skirmisher.stats.skirmish
-            defense_roll = random.randint(1, 6) + target.stats.defense
+            skirmish_roll = roll_d6() + skirmisher.stats.skirmish
+            defense_roll = roll_d6() + target.stats.defense
             
             self.log(f"#{skirmisher.id} attacks #{target.id}: {skirmish_roll} vs {defense_roll}")
             
@@ -158,7 +162,7 @@ class BattleSystem:
                 # Check for overrun (3+ difference)
                 if skirmish_roll >= defense_roll + 3:
                     self.log(f"⚡ OVERRUN! #{target.id} must roll destruction die")
-                    if random.randint(1, 6) <= 2:
+                    if roll_d6() <= 2:
                         target.is_destroyed = True
                         self.log(f"💀 #{target.id} is destroyed!")
             else:
@@ -197,7 +201,7 @@ class BattleSystem:
             if pos_survivors == 0:
                 # Check for Heroic sacrifice before declaring defeat
                 if positive_side.general and not positive_side.general.is_captured:
-                    trait_name, _ = GENERAL_TRAITS[positive_side.general.trait_id]
+                    trait_name = GENERAL_TRAIT_NAMES[positive_side.general.trait_id]
                     if trait_name == "Heroic":
                         self.log("🔥 HEROIC SACRIFICE! General sacrifices himself for new pitch!")
                         positive_side.general.is_captured = True  # General dies
@@ -218,7 +222,7 @@ class BattleSystem:
             elif neg_survivors == 0:
                 # Check for Heroic sacrifice
                 if negative_side.general and not negative_side.general.is_captured:
-                    trait_name, _ = GENERAL_TRAITS[negative_side.general.trait_id]
+                    trait_name = GENERAL_TRAIT_NAMES[negative_side.general.trait_id]
                     if trait_name == "Heroic":
                         self.log("🔥 HEROIC SACRIFICE! General sacrifices himself for new pitch!")
                         negative_side.general.is_captured = True
@@ -269,7 +273,7 @@ class BattleSystem:
         if not general:
             return
         
-        trait_name, _ = GENERAL_TRAITS[general.trait_id]
+        trait_name = GENERAL_TRAIT_NAMES[general.trait_id]
         if trait_name == "Bold" and skirmishers:
             # Apply bonus to best skirmisher
             best_skirmisher = max(skirmishers, key=lambda b: b.stats.skirmish)
@@ -282,7 +286,7 @@ class BattleSystem:
         if not side.general:
             return
         
-        trait_name, _ = GENERAL_TRAITS[side.general.trait_id]
+        trait_name = GENERAL_TRAIT_NAMES[side.general.trait_id]
         
         for brigade in side.brigades:
             if brigade.is_destroyed:
@@ -316,7 +320,7 @@ class BattleSystem:
         
         # Brigade dice and bonuses
         for brigade in brigades:
-            roll = random.randint(1, 6)
+            roll = roll_d6()
             total += roll + brigade.stats.pitch
         
         # General level bonus
@@ -324,7 +328,7 @@ class BattleSystem:
             general_bonus = general.level
             
             # Apply general trait bonuses
-            trait_name, _ = GENERAL_TRAITS[general.trait_id]
+            trait_name = GENERAL_TRAIT_NAMES[general.trait_id]
             if trait_name == "Brilliant":
                 general_bonus *= 2  # Double general level for pitch
                 self.log(f"Brilliant general: {general_bonus} pitch bonus (doubled)")
@@ -344,16 +348,16 @@ class BattleSystem:
             if brigade.is_destroyed:
                 continue
             
-            rally_roll = random.randint(1, 6) + brigade.stats.rally
+            rally_roll = roll_d6() + brigade.stats.rally
             
             # Apply general trait bonuses
             if side.general:
-                trait_name, _ = GENERAL_TRAITS[side.general.trait_id]
+                trait_name = GENERAL_TRAIT_NAMES[side.general.trait_id]
                 
                 # Free reroll for Inspiring trait
                 if trait_name == "Inspiring":
                     original_roll = rally_roll
-                    reroll = random.randint(1, 6) + brigade.stats.rally
+                    reroll = roll_d6() + brigade.stats.rally
                     if reroll > rally_roll:
                         rally_roll = reroll
                         self.log(f"Inspiring general: #{brigade.id} rerolled {original_roll} → {rally_roll}")
@@ -387,12 +391,12 @@ class BattleSystem:
                 if brigade.is_destroyed:
                     continue
                 
-                casualty_roll = random.randint(1, 6)
+                casualty_roll = roll_d6()
                 
                 # Check for enemy Merciless trait
                 enemy_side = loser if side == winner else winner
                 if enemy_side and enemy_side.general:
-                    enemy_trait_name, _ = GENERAL_TRAITS[enemy_side.general.trait_id]
+                    enemy_trait_name = GENERAL_TRAIT_NAMES[enemy_side.general.trait_id]
                     if enemy_trait_name == "Merciless" and side != winner:
                         # Enemy brigades destroyed on 1-3 instead of 1-2
                         destruction_threshold = 3
@@ -404,7 +408,7 @@ class BattleSystem:
                 # Winner gets reroll
                 if side == winner:
                     if casualty_roll <= destruction_threshold:
-                        reroll = random.randint(1, 6)
+                        reroll = roll_d6()
                         self.log(f"#{brigade.id} casualty roll: {casualty_roll} → {reroll} (reroll)")
                         casualty_roll = reroll
                     else:
@@ -419,17 +423,17 @@ class BattleSystem:
             # General promotion/capture rolls
             if side.general:
                 general = side.general
-                promotion_roll = random.randint(1, 6)
+                promotion_roll = roll_d6()
                 
                 # Apply trait effects
-                trait_name, _ = GENERAL_TRAITS[general.trait_id]
+                trait_name = GENERAL_TRAIT_NAMES[general.trait_id]
                 promotion_threshold = 5
                 
                 if trait_name == "Ambitious":
                     promotion_threshold = 4  # -1 to promotion number needed
                 elif trait_name == "Lucky" and promotion_roll == 1:
                     # Reroll once on a 1
-                    reroll = random.randint(1, 6)
+                    reroll = roll_d6()
                     self.log(f"Lucky general rerolls promotion: {promotion_roll} → {reroll}")
                     promotion_roll = reroll
                 
@@ -441,7 +445,7 @@ class BattleSystem:
                 
                 # Winner gets reroll
                 if side == winner and promotion_roll == 1:
-                    reroll = random.randint(1, 6)
+                    reroll = roll_d6()
                     self.log(f"General {general.name} promotion roll: {promotion_roll} → {reroll} (reroll)")
                     promotion_roll = reroll
                 else:
@@ -461,15 +465,22 @@ class BattleSystem:
                             break
 
 # Factory functions for creating battle participants
-def create_battle_brigade(brigade_data: dict, stats: BrigadeStats) -> BattleBrigade:
-    """Create a BattleBrigade from database data."""
-    brigade_type = next(bt for bt in BrigadeType if bt.value == brigade_data['type'])
+def create_battle_brigade(brigade_data: dict, stats: Optional[BrigadeStats] = None) -> BattleBrigade:
+    """Create a BattleBrigade from database data.
+
+    Without explicit stats, the brigade gets its own mutable copy of the precomputed totals
+    for its type, enhancement and garrison state.
+    """
+    brigade_type = BRIGADE_TYPE_BY_NAME[brigade_data['type']]
+    enhancement = brigade_data.get('enhancement')
+    if stats is None:
+        stats = BrigadeStats(*brigade_total_stats(brigade_type, enhancement, brigade_data.get('is_garrisoned', False)))
     
     return BattleBrigade(
         id=brigade_data['id'],
         player_id=brigade_data['player_id'], 
         type=brigade_type,
-        enhancement=brigade_data.get('enhancement'),
+        enhancement=enhancement,
         stats=stats
     )
 
@@ -4,7 +4,7 @@ Centralizes all general trait effect implementations
 """
 
 from typing import Dict, List, Optional, Tuple
-from models import GENERAL_TRAITS
+from models import GENERAL_TRAIT_NAMES
 
 class GeneralTraitHandler:
     def __init__(self, data_manager):
@@ -20,7 +20,7 @@ class GeneralTraitHandler:
         if not general:
             return {"alerts": [], "revealed_traits": []}
         
-        trait_name, _ = GENERAL_TRAITS[general['trait_id']]
+        trait_name = GENERAL_TRAIT_NAMES[general['trait_id']]
         if trait_name != "Wary":
             return {"alerts": [], "revealed_traits": []}
         
@@ -39,7 +39,7 @@ class GeneralTraitHandler:
             if enemy_army.get('general_id'):
                 enemy_general = await self.db.get_general(enemy_army['general_id'])
                 if enemy_general:
-                    enemy_trait_name, _ = GENERAL_TRAITS[enemy_general['trait_id']]
+                    enemy_trait_name = GENERAL_TRAIT_NAMES[enemy_general['trait_id']]
                     revealed_traits.append({
                         "general_name": enemy_general['name'],
                         "trait": enemy_trait_name,
@@ -54,7 +54,7 @@ class GeneralTraitHandler:
         if not general:
             return []
         
-        trait_name, _ = GENERAL_TRAITS[general['trait_id']]
+        trait_name = GENERAL_TRAIT_NAMES[general['trait_id']]
         if trait_name != "Dogged":
             return []
         
@@ -81,7 +81,7 @@ class GeneralTraitHandler:
         if not general:
             return {"can_offer_chivalry": False}
         
-        trait_name, _ = GENERAL_TRAITS[general['trait_id']]
+        trait_name = GENERAL_TRAIT_NAMES[general['trait_id']]
         if trait_name != "Chivalrous":
             return {"can_offer_chivalry": False}
         
@@ -118,7 +118,7 @@ class GeneralTraitHandler:
     
     def apply_prodigious_trait(self, general_data: Dict) -> int:
         """Apply Prodigious trait: +2 levels (lost if trait rerolled)."""
-        trait_name, _ = GENERAL_TRAITS[general_data['trait_id']]
+        trait_name = GENERAL_TRAIT_NAMES[general_data['trait_id']]
         if trait_name == "Prodigious":
             return general_data.get('level', 1) + 2
         return general_data.get('level', 1)
@@ -164,7 +164,7 @@ class GeneralTraitHandler:
         if not general_data:
             return 1
         
-        trait_name, _ = GENERAL_TRAITS[general_data['trait_id']]
+        trait_name = GENERAL_TRAIT_NAMES[general_data['trait_id']]
         if trait_name == "Inspiring":
             return 2  # Celebrating gives +2 rally instead of +1
         
@@ -1,10 +1,37 @@
-import json
 import os
+import copy
+import time
 import asyncio
-from typing import Dict, List, Optional, Any
+import contextlib
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Sequence, Set, Tuple
 from datetime import datetime
-from dataclasses import asdict
-import aiofiles
+import orjson
+
+from models import brigade_cap_for_tier_counts, city_tier_counts, player_tier_counts, find_city
+
+
+# Dataclasses and non-string keys serialize natively; anything else orjson can't handle falls back to str()
+_JSON_DUMP_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
+
+def _dump_json(data: Dict) -> bytes:
+    """Serialize data to the indented JSON stored on disk."""
+    return orjson.dumps(data, default=str, option=_JSON_DUMP_OPTIONS)
+
+
+def _read_json(file_path: str) -> Dict:
+    """Read and parse a JSON file synchronously (run via asyncio.to_thread)."""
+    content = Path(file_path).read_bytes()
+    return orjson.loads(content) if content.strip() else {}
+
+
+def _write_bytes(file_path: str, content: bytes):
+    """Atomically replace a file's contents synchronously (run via asyncio.to_thread)."""
+    tmp_path = f"{file_path}.tmp"
+    Path(tmp_path).write_bytes(content)
+    os.replace(tmp_path, file_path)
+
 
 class JsonDataManager:
     def __init__(self, data_dir: str = "bot_data"):
@@ -19,6 +46,29 @@ class JsonDataManager:
         self.structures_file = os.path.join(data_dir, "structures.json")
         self.sieges_file = os.path.join(data_dir, "sieges.json")
         
+        # Unordered (player, player) pairs with an active war, built on first use
+        self._war_pair_index: Optional[Set[Tuple[int, int]]] = None
+        
+        # Short-lived snapshots of the hot per-player files, dropped on any write to that file:
+        # file_path -> (expires_at, data)
+        self.read_cache_ttl = 2.0
+        self._cached_files = (self.players_file, self.brigades_file, self.generals_file)
+        self._snapshots: Dict[str, Tuple[float, Dict]] = {}
+        self._cache_generations: Dict[str, int] = {file_path: 0 for file_path in self._cached_files}
+        # In-flight reads shared by concurrent cache misses: file_path -> (generation, future)
+        self._loads: Dict[str, Tuple[int, asyncio.Future]] = {}
+        # Records grouped by owner for each cached snapshot: file_path -> (snapshot data, {player_id: [records]})
+        self._player_indexes: Dict[str, Tuple[Dict, Dict[int, List[Dict]]]] = {}
+        # Saves are buffered as serialized JSON and written to disk at most every write_delay seconds:
+        # normalized file_path -> content. Reads see buffered content first.
+        self.write_delay = 1.0
+        self._pending_writes: Dict[str, bytes] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        
+        # One lock per data file, held across each read-modify-write so concurrent updates can't drop each other
+        self._file_locks: Dict[str, asyncio.Lock] = {}
+        
         # Create data directory if it doesn't exist
         os.makedirs(data_dir, exist_ok=True)
 
@@ -52,201 +102,431 @@ class JsonDataManager:
         ]
         
         for file_path, default_content in files_and_data:
-            if not os.path.exists(file_path):
+            if os.path.normpath(file_path) not in self._pending_writes and not os.path.exists(file_path):
                 await self._save_json(file_path, default_content)
 
     async def _load_json(self, file_path: str) -> Dict:
-        """Load JSON data from file."""
+        """Load JSON data from file, or from a save that hasn't been flushed to it yet."""
+        pending = self._pending_writes.get(os.path.normpath(file_path))
+        if pending is not None:
+            return orjson.loads(pending)
         try:
-            async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
-                content = await f.read()
-                return json.loads(content) if content.strip() else {}
-        except (FileNotFoundError, json.JSONDecodeError):
+            return await asyncio.to_thread(_read_json, file_path)
+        except (FileNotFoundError, orjson.JSONDecodeError):
             return {}
 
     async def _save_json(self, file_path: str, data: Dict):
-        """Save JSON data to file."""
-        async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
-            await f.write(json.dumps(data, indent=2, ensure_ascii=False, default=str))
+        """Save JSON data to file; the disk write is deferred and batched by flush()."""
+        # Serialize now so later changes to data can't leak into the save
+        self._pending_writes[os.path.normpath(file_path)] = _dump_json(data)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self._flush_later())
+        if file_path in self._cache_generations:
+            self._snapshots.pop(file_path, None)
+            self._cache_generations[file_path] += 1
+
+    async def _flush_later(self):
+        """Flush buffered saves after write_delay, so a burst of saves becomes one write per file."""
+        # Loop so saves that arrive during a flush are picked up by the next one
+        while self._pending_writes:
+            await asyncio.sleep(self.write_delay)
+            try:
+                await self.flush()
+            except OSError as e:
+                print(f"Error writing data files, will retry: {e}")
+
+    async def flush(self):
+        """Write all buffered saves to disk. Call before exiting so no saves are lost."""
+        async with self._flush_lock:
+            for file_path, content in list(self._pending_writes.items()):
+                await asyncio.to_thread(_write_bytes, file_path, content)
+                # Keep the entry if a newer save replaced it while this one was being written
+                if self._pending_writes.get(file_path) is content:
+                    del self._pending_writes[file_path]
+
+    @contextlib.asynccontextmanager
+    async def _locked(self, *file_paths: str):
+        """Hold the locks for the given data files, always taken in the same order to avoid deadlocks."""
+        async with contextlib.AsyncExitStack() as stack:
+            for file_path in sorted(set(file_paths)):
+                await stack.enter_async_context(self._file_locks.setdefault(file_path, asyncio.Lock()))
+            yield
 
     async def get_player(self, user_id: int) -> Optional[Dict]:
         """Get player data by user ID."""
-        players = await self._load_json(self.players_file)
-        return players.get(str(user_id))
+        players = await self._load_cached(self.players_file)
+        # Callers may modify the returned record (e.g. its cities list), so they always get their own copy
+        return copy.deepcopy(players.get(str(user_id)))
+
+    async def _load_cached(self, file_path: str) -> Dict:
+        """Load one of the cached files, reusing a fresh snapshot or one in-flight read shared between callers.
+
+        The returned dict is shared; callers must copy anything they hand out.
+        """
+        snapshot = self._snapshots.get(file_path)
+        if snapshot and time.monotonic() < snapshot[0]:
+            return snapshot[1]
+        
+        generation = self._cache_generations[file_path]
+        load = self._loads.get(file_path)
+        if load is None or load[0] != generation or load[1].done():
+            load = self._loads[file_path] = (generation, asyncio.ensure_future(self._load_json(file_path)))
+        
+        # Shield the shared read so one cancelled caller doesn't cancel it for the others
+        data = await asyncio.shield(load[1])
+        
+        # Don't cache a read that raced with a write to the same file
+        if generation == self._cache_generations[file_path]:
+            self._snapshots[file_path] = (time.monotonic() + self.read_cache_ttl, data)
+        return data
+
+    async def _records_for_player(self, file_path: str, player_id: int) -> List[Dict]:
+        """Records in a cached file owned by player_id, via an index rebuilt only when the snapshot changes.
+
+        The returned records are shared; callers must copy them.
+        """
+        data = await self._load_cached(file_path)
+        index = self._player_indexes.get(file_path)
+        if index is None or index[0] is not data:
+            by_player: Dict[int, List[Dict]] = {}
+            for record in data.values():
+                by_player.setdefault(record.get("player_id"), []).append(record)
+            index = self._player_indexes[file_path] = (data, by_player)
+        return index[1].get(player_id, [])
 
     async def create_player(self, user_id: int, username: str) -> bool:
         """Create a new player."""
-        try:
-            players = await self._load_json(self.players_file)
+        async with self._locked(self.players_file):
+            try:
+                players = await self._load_json(self.players_file)
+                
+                if str(user_id) in players:
+                    return False  # Player already exists
+                
+                players[str(user_id)] = {
+                    "user_id": user_id,
+                    "username": username,
+                    "war_college_level": 1,
+                    "general_cap": 1,
+                    "brigade_cap": 2,
+                    "cities": [{"name": "Capital", "tier": 1}],  # Default starting city
+                    "tier_counts": city_tier_counts([{"tier": 1}]),
+                    "resources": {
+                        "food": 10,
+                        "metal": 10,
+                        "stone": 5,
+                        "timber": 5,
+                        "fuel": 2,
+                        "gems": 1
+                    },
+                    "silver": 100,
+                    "created_at": datetime.now().isoformat()
+                }
+                
+                await self._save_json(self.players_file, players)
+                return True
+            except Exception:
+                return False
+
+    async def update_player(self, user_id: int, updates: Dict) -> Optional[Dict]:
+        """Update player data and return the updated player record."""
+        async with self._locked(self.players_file):
+            try:
+                players = await self._load_json(self.players_file)
+                
+                if str(user_id) not in players:
+                    return None
+                
+                player = players[str(user_id)]
+                player.update(updates)
+                # A replaced city list invalidates the tier counters, so rebuild them and the cap from it
+                if "cities" in updates:
+                    player["tier_counts"] = city_tier_counts(player.get("cities", []))
+                    player["brigade_cap"] = brigade_cap_for_tier_counts(player["tier_counts"])
+                player["updated_at"] = datetime.now().isoformat()
+                
+                await self._save_json(self.players_file, players)
+                return player
+            except Exception:
+                return None
+
+    async def get_brigades(self, player_id: int) -> List[Dict]:
+        """Get all brigades for a player."""
+        return copy.deepcopy(await self._records_for_player(self.brigades_file, player_id))
+
+    async def create_brigade(self, player_id: int, brigade_type: str, location: str = "Capital") -> str:
+        """Create a new brigade and return its ID."""
+        async with self._locked(self.brigades_file):
+            brigades = await self._load_json(self.brigades_file)
+            
+            # Generate unique ID
+            brigade_id = f"brigade_{len(brigades) + 1}_{int(time.time())}"
             
-            if str(user_id) in players:
-                return False  # Player already exists
-            
-            players[str(user_id)] = {
-                "user_id": user_id,
-                "username": username,
-                "war_college_level": 1,
-                "general_cap": 1,
-                "brigade_cap": 2,
-                "cities": [{"name": "Capital", "tier": 1}],  # Default starting city
-                "resources": {
-                    "food": 10,
-                    "metal": 10,
-                    "stone": 5,
-                    "timber": 5,
-                    "fuel": 2,
-                    "gems": 1
-                },
-                "silver": 100,
+            brigades[brigade_id] = {
+                "id": brigade_id,
+                "player_id": player_id,
+                "type": brigade_type,
+                "enhancement": None,
+                "location": location,
+                "army_id": None,
+                "is_garrisoned": False,
+                "is_fatigued": False,
                 "created_at": datetime.now().isoformat()
             }
             
-            await self._save_json(self.players_file, players)
-            return True
-        except Exception:
-            return False
-
-    async def update_player(self, user_id: int, updates: Dict) -> bool:
-        """Update player data."""
-        try:
-            players = await self._load_json(self.players_file)
+            await self._save_json(self.brigades_file, brigades)
+            return brigade_id
+
+    async def atomic_create_brigade(self, player_id: int, brigade_type: str, location: str = "Capital",
+                                    cost_resources: Optional[Dict[str, int]] = None,
+                                    cost_silver: int = 0) -> Optional[str]:
+        """Create a brigade and charge its cost in a single read/write pass.
+
+        Returns the new brigade ID, or None if the player is missing or cannot afford the cost.
+        """
+        async with self._locked(self.players_file, self.brigades_file):
+            players, brigades = await asyncio.gather(
+                self._load_json(self.players_file), self._load_json(self.brigades_file)
+            )
+            player = players.get(str(player_id))
+            if not player or not self._charge_player(player, cost_resources or {}, cost_silver):
+                return None
+            
+            now = datetime.now()
+            brigade_id = f"brigade_{len(brigades) + 1}_{int(now.timestamp())}"
+            brigades[brigade_id] = {
+                "id": brigade_id,
+                "player_id": player_id,
+                "type": brigade_type,
+                "enhancement": None,
+                "location": location,
+                "army_id": None,
+                "is_garrisoned": False,
+                "is_fatigued": False,
+                "created_at": now.isoformat()
+            }
             
-            if str(user_id) not in players:
+            await asyncio.gather(
+                self._save_json(self.players_file, players),
+                self._save_json(self.brigades_file, brigades)
+            )
+            return brigade_id
+
+    async def atomic_enhance_brigade(self, player_id: int, brigade_id: str, enhancement: str,
+                                     cost_resources: Optional[Dict[str, int]] = None,
+                                     cost_silver: int = 0) -> bool:
+        """Charge an enhancement's cost and apply it to an unenhanced brigade in a single read/write pass.
+
+        Returns False, changing nothing, if the brigade is missing, not the player's, already enhanced,
+        or the player cannot afford the cost.
+        """
+        async with self._locked(self.players_file, self.brigades_file):
+            players, brigades = await asyncio.gather(
+                self._load_json(self.players_file), self._load_json(self.brigades_file)
+            )
+            player = players.get(str(player_id))
+            brigade = brigades.get(brigade_id)
+            if not player or not brigade or brigade.get("player_id") != player_id or brigade.get("enhancement"):
+                return False
+            if not self._charge_player(player, cost_resources or {}, cost_silver):
                 return False
             
-            players[str(user_id)].update(updates)
-            players[str(user_id)]["updated_at"] = datetime.now().isoformat()
+            brigade["enhancement"] = enhancement
+            brigade["updated_at"] = player["updated_at"]
             
-            await self._save_json(self.players_file, players)
+            await asyncio.gather(
+                self._save_json(self.players_file, players),
+                self._save_json(self.brigades_file, brigades)
+            )
             return True
-        except Exception:
-            return False
-
-    async def get_brigades(self, player_id: int) -> List[Dict]:
-        """Get all brigades for a player."""
-        brigades = await self._load_json(self.brigades_file)
-        return [brigade for brigade in brigades.values() if brigade.get("player_id") == player_id]
-
-    async def create_brigade(self, player_id: int, brigade_type: str, location: str = "Capital") -> str:
-        """Create a new brigade and return its ID."""
-        brigades = await self._load_json(self.brigades_file)
-        
-        # Generate unique ID
-        brigade_id = f"brigade_{len(brigades) + 1}_{int(datetime.now().timestamp())}"
-        
-        brigades[brigade_id] = {
-            "id": brigade_id,
-            "player_id": player_id,
-            "type": brigade_type,
-            "enhancement": None,
-            "location": location,
-            "army_id": None,
-            "is_garrisoned": False,
-            "is_fatigued": False,
-            "created_at": datetime.now().isoformat()
-        }
-        
-        await self._save_json(self.brigades_file, brigades)
-        return brigade_id
 
     async def get_brigade(self, brigade_id: str) -> Optional[Dict]:
         """Get specific brigade by ID."""
         brigades = await self._load_json(self.brigades_file)
         return brigades.get(brigade_id)
 
+    async def get_brigades_by_ids(self, brigade_ids: List[str]) -> Dict[str, Dict]:
+        """Get several brigades by ID with a single file read; missing IDs are omitted."""
+        brigades = await self._load_json(self.brigades_file)
+        return {brigade_id: brigades[brigade_id] for brigade_id in brigade_ids if brigade_id in brigades}
+
     async def update_brigade(self, brigade_id: str, updates: Dict) -> bool:
         """Update brigade data."""
-        try:
-            brigades = await self._load_json(self.brigades_file)
-            
-            if brigade_id not in brigades:
+        async with self._locked(self.brigades_file):
+            try:
+                brigades = await self._load_json(self.brigades_file)
+                
+                if brigade_id not in brigades:
+                    return False
+                
+                brigades[brigade_id].update(updates)
+                brigades[brigade_id]["updated_at"] = datetime.now().isoformat()
+                
+                await self._save_json(self.brigades_file, brigades)
+                return True
+            except Exception:
                 return False
-            
-            brigades[brigade_id].update(updates)
-            brigades[brigade_id]["updated_at"] = datetime.now().isoformat()
-            
-            await self._save_json(self.brigades_file, brigades)
-            return True
-        except Exception:
-            return False
+
+    async def update_brigades(self, brigade_ids: List[str], updates: Dict) -> int:
+        """Apply the same updates to several brigades in one write and return how many were updated."""
+        async with self._locked(self.brigades_file):
+            try:
+                brigades = await self._load_json(self.brigades_file)
+                now = datetime.now().isoformat()
+                
+                updated = 0
+                for brigade_id in brigade_ids:
+                    if brigade_id in brigades:
+                        brigades[brigade_id].update(updates)
+                        brigades[brigade_id]["updated_at"] = now
+                        updated += 1
+                
+                if updated:
+                    await self._save_json(self.brigades_file, brigades)
+                return updated
+            except Exception:
+                return 0
 
     async def get_generals(self, player_id: int) -> List[Dict]:
         """Get all generals for a player."""
-        generals = await self._load_json(self.generals_file)
-        return [general for general in generals.values() if general.get("player_id") == player_id]
+        return copy.deepcopy(await self._records_for_player(self.generals_file, player_id))
 
     async def create_general(self, player_id: int, name: str, trait_id: int) -> str:
         """Create a new general and return its ID."""
-        generals = await self._load_json(self.generals_file)
-        
-        # Generate unique ID
-        general_id = f"general_{len(generals) + 1}_{int(datetime.now().timestamp())}"
-        
-        generals[general_id] = {
-            "id": general_id,
-            "player_id": player_id,
-            "name": name,
-            "level": 1,
-            "trait_id": trait_id,
-            "location": "Capital",
-            "army_id": None,
-            "is_captured": False,
-            "created_at": datetime.now().isoformat()
-        }
-        
-        await self._save_json(self.generals_file, generals)
-        return general_id
-
-    async def get_general(self, general_id: str) -> Optional[Dict]:
-        """Get specific general by ID."""
-        generals = await self._load_json(self.generals_file)
-        return generals.get(general_id)
-
-    async def update_general(self, general_id: str, updates: Dict) -> bool:
-        """Update general data."""
-        try:
+        async with self._locked(self.generals_file):
             generals = await self._load_json(self.generals_file)
             
-            if general_id not in generals:
-                return False
+            # Generate unique ID
+            general_id = f"general_{len(generals) + 1}_{int(time.time())}"
             
-            generals[general_id].update(updates)
-            generals[general_id]["updated_at"] = datetime.now().isoformat()
+            generals[general_id] = {
+                "id": general_id,
+                "player_id": player_id,
+                "name": name,
+                "level": 1,
+                "trait_id": trait_id,
+                "location": "Capital",
+                "army_id": None,
+                "is_captured": False,
+                "created_at": datetime.now().isoformat()
+            }
             
             await self._save_json(self.generals_file, generals)
+            return general_id
+
+    async def atomic_create_general(self, player_id: int, name: str, trait_id: int,
+                                    cost_silver: int = 0) -> Optional[str]:
+        """Create a general and charge its silver cost in a single read/write pass.
+
+        Returns the new general ID, or None if the player is missing or cannot afford the cost.
+        """
+        async with self._locked(self.players_file, self.generals_file):
+            players, generals = await asyncio.gather(
+                self._load_json(self.players_file), self._load_json(self.generals_file)
+            )
+            player = players.get(str(player_id))
+            if not player or not self._charge_player(player, {}, cost_silver):
+                return None
+            
+            now = datetime.now()
+            general_id = f"general_{len(generals) + 1}_{int(now.timestamp())}"
+            generals[general_id] = {
+                "id": general_id,
+                "player_id": player_id,
+                "name": name,
+                "level": 1,
+                "trait_id": trait_id,
+                "location": "Capital",
+                "army_id": None,
+                "is_captured": False,
+                "created_at": now.isoformat()
+            }
+            
+            await asyncio.gather(
+                self._save_json(self.players_file, players),
+                self._save_json(self.generals_file, generals)
+            )
+            return general_id
+
+    async def retire_general(self, player_id: int, general_id: str, player_updates: Optional[Dict] = None,
+                             silver_reward: int = 0) -> bool:
+        """Retire a general and apply the player's reward in a single read/write pass."""
+        async with self._locked(self.players_file, self.generals_file):
+            players, generals = await asyncio.gather(
+                self._load_json(self.players_file), self._load_json(self.generals_file)
+            )
+            player = players.get(str(player_id))
+            general = generals.get(general_id)
+            if not player or not general:
+                return False
+            
+            now = datetime.now().isoformat()
+            if player_updates:
+                player.update(player_updates)
+            if silver_reward:
+                player["silver"] = player.get("silver", 0) + silver_reward
+            player["updated_at"] = now
+            
+            general.update({"status": "retired", "retired_at": now, "updated_at": now})
+            
+            await asyncio.gather(
+                self._save_json(self.players_file, players),
+                self._save_json(self.generals_file, generals)
+            )
             return True
-        except Exception:
-            return False
+
+    async def get_general(self, general_id: str) -> Optional[Dict]:
+        """Get specific general by ID."""
+        generals = await self._load_json(self.generals_file)
+        return generals.get(general_id)
+
+    async def update_general(self, general_id: str, updates: Dict) -> Optional[Dict]:
+        """Update general data and return the updated general record."""
+        async with self._locked(self.generals_file):
+            try:
+                generals = await self._load_json(self.generals_file)
+                
+                if general_id not in generals:
+                    return None
+                
+                general = generals[general_id]
+                general.update(updates)
+                general["updated_at"] = datetime.now().isoformat()
+                
+                await self._save_json(self.generals_file, generals)
+                return general
+            except Exception:
+                return None
 
     async def create_army(self, player_id: int, general_id: str, brigade_ids: List[str], name: Optional[str] = None) -> str:
         """Create a new army."""
-        armies = await self._load_json(self.armies_file)
-        
-        # Generate unique ID
-        army_id = f"army_{len(armies) + 1}_{int(datetime.now().timestamp())}"
-        
-        if not name:
-            general = await self.get_general(general_id)
-            name = f"{general['name']}'s Army" if general else f"Army {len(armies) + 1}"
-        
-        armies[army_id] = {
-            "id": army_id,
-            "player_id": player_id,
-            "general_id": general_id,
-            "brigade_ids": brigade_ids,
-            "name": name,
-            "location": "Capital",
-            "movement_orders": None,
-            "created_at": datetime.now().isoformat()
-        }
-        
-        # Update general and brigades to reference this army
-        await self.update_general(general_id, {"army_id": army_id})
-        for brigade_id in brigade_ids:
-            await self.update_brigade(brigade_id, {"army_id": army_id})
-        
-        await self._save_json(self.armies_file, armies)
-        return army_id
+        async with self._locked(self.armies_file):
+            armies = await self._load_json(self.armies_file)
+            
+            # Generate unique ID
+            army_id = f"army_{len(armies) + 1}_{int(time.time())}"
+            
+            if not name:
+                general = await self.get_general(general_id)
+                name = f"{general['name']}'s Army" if general else f"Army {len(armies) + 1}"
+            
+            armies[army_id] = {
+                "id": army_id,
+                "player_id": player_id,
+                "general_id": general_id,
+                "brigade_ids": brigade_ids,
+                "name": name,
+                "location": "Capital",
+                "movement_orders": None,
+                "created_at": datetime.now().isoformat()
+            }
+            
+            # Update general and brigades to reference this army
+            await self.update_general(general_id, {"army_id": army_id})
+            await self.update_brigades(brigade_ids, {"army_id": army_id})
+            
+            await self._save_json(self.armies_file, armies)
+            return army_id
 
     async def get_armies(self, player_id: int) -> List[Dict]:
         """Get all armies for a player."""
@@ -254,27 +534,60 @@ class JsonDataManager:
         return [army for army in armies.values() if army.get("player_id") == player_id]
 
     async def create_war(self, attacker_id: int, defender_id: int, justification: str, 
-                        victory_conditions: List[str], defeat_conditions: List[str]) -> str:
+                        victory_conditions: Sequence[str], defeat_conditions: Sequence[str]) -> str:
         """Create a new war."""
-        wars = await self._load_json(self.wars_file)
-        
-        # Generate unique ID
-        war_id = f"war_{len(wars) + 1}_{int(datetime.now().timestamp())}"
-        
-        wars[war_id] = {
-            "id": war_id,
-            "attacker_id": attacker_id,
-            "defender_id": defender_id,
-            "justification": justification,
-            "status": "active",
-            "victory_conditions": victory_conditions,
-            "defeat_conditions": defeat_conditions,
-            "started_at": datetime.now().isoformat(),
-            "ended_at": None
-        }
-        
-        await self._save_json(self.wars_file, wars)
-        return war_id
+        async with self._locked(self.wars_file):
+            wars = await self._load_json(self.wars_file)
+            
+            # Generate unique ID
+            war_id = f"war_{len(wars) + 1}_{int(time.time())}"
+            
+            wars[war_id] = {
+                "id": war_id,
+                "attacker_id": attacker_id,
+                "defender_id": defender_id,
+                "justification": justification,
+                "status": "active",
+                "victory_conditions": list(victory_conditions),
+                "defeat_conditions": list(defeat_conditions),
+                "started_at": datetime.now().isoformat(),
+                "ended_at": None
+            }
+            
+            await self._save_json(self.wars_file, wars)
+            if self._war_pair_index is not None:
+                self._war_pair_index.add(self._war_pair(attacker_id, defender_id))
+            return war_id
+
+    async def end_war(self, war_id: str, status: str = "ended") -> bool:
+        """Mark a war as no longer active."""
+        async with self._locked(self.wars_file):
+            wars = await self._load_json(self.wars_file)
+            war = wars.get(war_id)
+            if not war:
+                return False
+            
+            war["status"] = status
+            war["ended_at"] = datetime.now().isoformat()
+            await self._save_json(self.wars_file, wars)
+            
+            self._war_pair_index = None  # Rebuilt on next lookup in case another war links the pair
+            return True
+
+    async def has_active_war(self, player_a: int, player_b: int) -> bool:
+        """Check whether two players are already at war with each other."""
+        if self._war_pair_index is None:
+            wars = await self._load_json(self.wars_file)
+            self._war_pair_index = {
+                self._war_pair(war.get("attacker_id"), war.get("defender_id"))
+                for war in wars.values() if war.get("status") == "active"
+            }
+        return self._war_pair(player_a, player_b) in self._war_pair_index
+
+    @staticmethod
+    def _war_pair(player_a: int, player_b: int) -> Tuple[int, int]:
+        """Order a pair of player IDs so either side of a war maps to the same key."""
+        return (player_a, player_b) if player_a <= player_b else (player_b, player_a)
 
     async def get_active_wars(self, player_id: Optional[int] = None) -> List[Dict]:
         """Get active wars, optionally filtered by player."""
@@ -289,41 +602,43 @@ class JsonDataManager:
 
     async def create_battle(self, war_id: str, location: str, participants: List[int]) -> str:
         """Create a new battle."""
-        battles = await self._load_json(self.battles_file)
-        
-        # Generate unique ID
-        battle_id = f"battle_{len(battles) + 1}_{int(datetime.now().timestamp())}"
-        
-        battles[battle_id] = {
-            "id": battle_id,
-            "war_id": war_id,
-            "location": location,
-            "participants": participants,
-            "status": "pending",
-            "battle_log": [],
-            "winner_id": None,
-            "started_at": datetime.now().isoformat(),
-            "ended_at": None
-        }
-        
-        await self._save_json(self.battles_file, battles)
-        return battle_id
-
-    async def update_battle(self, battle_id: str, updates: Dict) -> bool:
-        """Update battle data."""
-        try:
+        async with self._locked(self.battles_file):
             battles = await self._load_json(self.battles_file)
             
-            if battle_id not in battles:
-                return False
+            # Generate unique ID
+            battle_id = f"battle_{len(battles) + 1}_{int(time.time())}"
             
-            battles[battle_id].update(updates)
-            battles[battle_id]["updated_at"] = datetime.now().isoformat()
+            battles[battle_id] = {
+                "id": battle_id,
+                "war_id": war_id,
+                "location": location,
+                "participants": participants,
+                "status": "pending",
+                "battle_log": [],
+                "winner_id": None,
+                "started_at": datetime.now().isoformat(),
+                "ended_at": None
+            }
             
             await self._save_json(self.battles_file, battles)
-            return True
-        except Exception:
-            return False
+            return battle_id
+
+    async def update_battle(self, battle_id: str, updates: Dict) -> bool:
+        """Update battle data."""
+        async with self._locked(self.battles_file):
+            try:
+                battles = await self._load_json(self.battles_file)
+                
+                if battle_id not in battles:
+                    return False
+                
+                battles[battle_id].update(updates)
+                battles[battle_id]["updated_at"] = datetime.now().isoformat()
+                
+                await self._save_json(self.battles_file, battles)
+                return True
+            except Exception:
+                return False
 
     async def get_game_state(self) -> Dict:
         """Get current game state."""
@@ -331,58 +646,80 @@ class JsonDataManager:
 
     async def update_game_state(self, updates: Dict) -> bool:
         """Update game state."""
-        try:
-            game_state = await self._load_json(self.game_state_file)
-            game_state.update(updates)
-            game_state["updated_at"] = datetime.now().isoformat()
-            
-            await self._save_json(self.game_state_file, game_state)
-            return True
-        except Exception:
-            return False
+        async with self._locked(self.game_state_file):
+            try:
+                game_state = await self._load_json(self.game_state_file)
+                game_state.update(updates)
+                game_state["updated_at"] = datetime.now().isoformat()
+                
+                await self._save_json(self.game_state_file, game_state)
+                return True
+            except Exception:
+                return False
 
-    async def deduct_resources(self, player_id: int, resource_costs: Dict[str, int]) -> bool:
-        """Deduct resources from a player."""
-        player = await self.get_player(player_id)
-        if not player:
+    @staticmethod
+    def _charge_player(player: Dict, resource_costs: Dict[str, int], silver_cost: int) -> bool:
+        """Deduct resources and silver from a loaded player record in place.
+
+        Leaves the record untouched and returns False if the player cannot afford the cost.
+        """
+        resources = player.get("resources", {})
+        if player.get("silver", 0) < silver_cost:
             return False
-        
-        # Check if player has enough resources
         for resource, cost in resource_costs.items():
-            if player.get("resources", {}).get(resource, 0) < cost:
+            if resources.get(resource, 0) < cost:
                 return False
         
-        # Deduct resources
         for resource, cost in resource_costs.items():
             player["resources"][resource] -= cost
-        
-        return await self.update_player(player_id, {"resources": player["resources"]})
+        if silver_cost:
+            player["silver"] -= silver_cost
+        player["updated_at"] = datetime.now().isoformat()
+        return True
+
+    async def deduct_resources(self, player_id: int, resource_costs: Dict[str, int]) -> Optional[Dict]:
+        """Deduct resources from a player and return the updated player record."""
+        async with self._locked(self.players_file):
+            players = await self._load_json(self.players_file)
+            player = players.get(str(player_id))
+            if not player or not self._charge_player(player, resource_costs, 0):
+                return None
+            
+            await self._save_json(self.players_file, players)
+            return player
 
-    async def deduct_silver(self, player_id: int, amount: int) -> bool:
-        """Deduct silver from a player."""
-        player = await self.get_player(player_id)
-        if not player or player.get("silver", 0) < amount:
-            return False
-        
-        new_silver = player["silver"] - amount
-        return await self.update_player(player_id, {"silver": new_silver})
+    async def deduct_silver(self, player_id: int, amount: int) -> Optional[Dict]:
+        """Deduct silver from a player and return the updated player record."""
+        async with self._locked(self.players_file):
+            players = await self._load_json(self.players_file)
+            player = players.get(str(player_id))
+            if not player or not self._charge_player(player, {}, amount):
+                return None
+            
+            await self._save_json(self.players_file, players)
+            return player
 
-    async def add_resources(self, player_id: int, resource_gains: Dict[str, int]) -> bool:
-        """Add resources to a player."""
-        player = await self.get_player(player_id)
-        if not player:
-            return False
-        
-        resources = player.get("resources", {})
-        for resource, amount in resource_gains.items():
-            resources[resource] = resources.get(resource, 0) + amount
-        
-        return await self.update_player(player_id, {"resources": resources})
+    async def add_resources(self, player_id: int, resource_gains: Dict[str, int]) -> Optional[Dict]:
+        """Add resources to a player and return the updated player record."""
+        async with self._locked(self.players_file):
+            players = await self._load_json(self.players_file)
+            player = players.get(str(player_id))
+            if not player:
+                return None
+            
+            resources = player.setdefault("resources", {})
+            for resource, amount in resource_gains.items():
+                resources[resource] = resources.get(resource, 0) + amount
+            player["updated_at"] = datetime.now().isoformat()
+            
+            await self._save_json(self.players_file, players)
+            return player
 
     async def backup_data(self, backup_dir: str = "backups") -> str:
         """Create a backup of all data files."""
         import shutil
         
+        await self.flush()
         os.makedirs(backup_dir, exist_ok=True)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         backup_path = os.path.join(backup_dir, f"backup_{timestamp}")
@@ -417,34 +754,238 @@ class JsonDataManager:
 
     async def update_army(self, army_id: str, updates: Dict) -> bool:
         """Update army data."""
-        armies = await self._load_json(self.armies_file)
-        if army_id in armies:
-            armies[army_id].update(updates)
-            armies[army_id]['updated_at'] = datetime.now().isoformat()
-            await self._save_json(self.armies_file, armies)
-            return True
-        return False
+        async with self._locked(self.armies_file):
+            armies = await self._load_json(self.armies_file)
+            if army_id in armies:
+                armies[army_id].update(updates)
+                armies[army_id]['updated_at'] = datetime.now().isoformat()
+                await self._save_json(self.armies_file, armies)
+                return True
+            return False
 
     async def delete_army(self, army_id: str) -> bool:
         """Delete an army."""
-        armies = await self._load_json(self.armies_file)
-        if army_id in armies:
-            del armies[army_id]
-            await self._save_json(self.armies_file, armies)
-            return True
-        return False
+        async with self._locked(self.armies_file):
+            armies = await self._load_json(self.armies_file)
+            if army_id in armies:
+                del armies[army_id]
+                await self._save_json(self.armies_file, armies)
+                return True
+            return False
 
-    async def add_resource(self, player_id: int, resource_type: str, amount: int) -> bool:
-        """Add a single resource to player."""
+    async def add_resource(self, player_id: int, resource_type: str, amount: int) -> Optional[Dict]:
+        """Add a single resource to player and return the updated player record."""
         return await self.add_resources(player_id, {resource_type: amount})
 
+    async def transfer_resources(self, sender_id: int, recipient_id: int,
+                                 amounts: Dict[str, int]) -> Optional[Dict]:
+        """Move resources between two players in a single read/write pass.
+
+        Returns the updated sender record, or None if either player is missing or the sender cannot afford it.
+        """
+        async with self._locked(self.players_file):
+            players = await self._load_json(self.players_file)
+            sender = players.get(str(sender_id))
+            recipient = players.get(str(recipient_id))
+            if not sender or not recipient or not self._charge_player(sender, amounts, 0):
+                return None
+            
+            resources = recipient.setdefault("resources", {})
+            for resource, amount in amounts.items():
+                resources[resource] = resources.get(resource, 0) + amount
+            recipient["updated_at"] = sender["updated_at"]
+            
+            await self._save_json(self.players_file, players)
+            return sender
+
+    async def add_city(self, player_id: int, city_data: Dict) -> Optional[Dict]:
+        """Add a city to a player, recalculate their brigade cap and return the updated player record."""
+        async with self._locked(self.players_file):
+            players = await self._load_json(self.players_file)
+            player = players.get(str(player_id))
+            if not player:
+                return None
+            
+            tier_counts = player_tier_counts(player)
+            tier = str(city_data.get("tier", 1))
+            tier_counts[tier] = tier_counts.get(tier, 0) + 1
+            
+            player.setdefault("cities", []).append(city_data)
+            player["tier_counts"] = tier_counts
+            player["brigade_cap"] = brigade_cap_for_tier_counts(tier_counts)
+            player["updated_at"] = datetime.now().isoformat()
+            
+            await self._save_json(self.players_file, players)
+            return player
+
+    async def remove_city(self, player_id: int, city_name: str) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """Remove a player's city by name (case-insensitive) and recalculate their brigade cap.
+
+        Returns (player, removed_city); player is None if unregistered, removed_city is None if not found.
+        """
+        async with self._locked(self.players_file):
+            players = await self._load_json(self.players_file)
+            player = players.get(str(player_id))
+            if not player:
+                return None, None
+            
+            cities = player.get("cities", [])
+            index, _ = find_city(cities, city_name)
+            if index < 0:
+                return player, None
+            
+            tier_counts = player_tier_counts(player)
+            removed_city = cities.pop(index)
+            tier = str(removed_city.get("tier", 1))
+            tier_counts[tier] = max(tier_counts.get(tier, 0) - 1, 0)
+            
+            player["tier_counts"] = tier_counts
+            player["brigade_cap"] = brigade_cap_for_tier_counts(tier_counts)
+            player["updated_at"] = datetime.now().isoformat()
+            
+            await self._save_json(self.players_file, players)
+            return player, removed_city
+
+    async def set_city_tier(self, player_id: int, city_name: str, tier: int) -> Tuple[Optional[Dict], Optional[int]]:
+        """Change a player's city tier by name (case-insensitive) and recalculate their brigade cap.
+
+        Returns (player, old_tier); player is None if unregistered, old_tier is None if the city is not found.
+        """
+        async with self._locked(self.players_file):
+            players = await self._load_json(self.players_file)
+            player = players.get(str(player_id))
+            if not player:
+                return None, None
+            
+            cities = player.get("cities", [])
+            _, city = find_city(cities, city_name)
+            if city is None:
+                return player, None
+            
+            tier_counts = player_tier_counts(player)
+            old_tier = city["tier"]
+            city["tier"] = tier
+            tier_counts[str(old_tier)] = max(tier_counts.get(str(old_tier), 0) - 1, 0)
+            tier_counts[str(tier)] = tier_counts.get(str(tier), 0) + 1
+            
+            player["tier_counts"] = tier_counts
+            player["brigade_cap"] = brigade_cap_for_tier_counts(tier_counts)
+            player["updated_at"] = datetime.now().isoformat()
+            
+            await self._save_json(self.players_file, players)
+            return player, old_tier
+
+    async def update_city(self, player_id: int, city_name: str, updates: Dict) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """Update fields of one of a player's cities by name (case-insensitive), e.g. its siege status.
+
+        Returns (player, city); player is None if unregistered, city is None if not found.
+        """
+        async with self._locked(self.players_file):
+            players = await self._load_json(self.players_file)
+            player = players.get(str(player_id))
+            if not player:
+                return None, None
+
+            _, city = find_city(player.get("cities", []), city_name)
+            if city is None:
+                return player, None
+
+            city.update(updates)
+            player["updated_at"] = datetime.now().isoformat()
+
+            await self._save_json(self.players_file, players)
+            return player, city
+
+    async def add_city_garrison(self, player_id: int, city_name: str,
+                                brigade_ids: List[str]) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """Add brigades to a city's garrison, skipping any already in it.
+
+        Returns (player, city); player is None if unregistered, city is None if not found.
+        """
+        async with self._locked(self.players_file):
+            players = await self._load_json(self.players_file)
+            player = players.get(str(player_id))
+            if not player:
+                return None, None
+
+            _, city = find_city(player.get("cities", []), city_name)
+            if city is None:
+                return player, None
+
+            garrison = city.setdefault("garrison", [])
+            present = set(garrison)
+            garrison.extend(brigade_id for brigade_id in dict.fromkeys(brigade_ids) if brigade_id not in present)
+            player["updated_at"] = datetime.now().isoformat()
+
+            await self._save_json(self.players_file, players)
+            return player, city
+
+    async def remove_city_garrison(self, player_id: int, city_name: str,
+                                   brigade_ids: Optional[List[str]] = None) -> Tuple[Optional[Dict], Optional[Dict], List[str]]:
+        """Remove brigades (all of them if brigade_ids is None) from a city's garrison.
+
+        Returns (player, city, removed_ids); player is None if unregistered, city is None if not found.
+        """
+        async with self._locked(self.players_file):
+            players = await self._load_json(self.players_file)
+            player = players.get(str(player_id))
+            if not player:
+                return None, None, []
+
+            _, city = find_city(player.get("cities", []), city_name)
+            if city is None:
+                return player, None, []
+
+            garrison = city.get("garrison", [])
+            if brigade_ids is None:
+                removed_ids = list(dict.fromkeys(garrison))
+            else:
+                garrison_set = set(garrison)
+                removed_ids = list(dict.fromkeys(brigade_id for brigade_id in brigade_ids if brigade_id in garrison_set))
+            if not removed_ids:
+                return player, city, []
+
+            removed_set = set(removed_ids)
+            city["garrison"] = [brigade_id for brigade_id in garrison if brigade_id not in removed_set]
+            player["updated_at"] = datetime.now().isoformat()
+
+            await self._save_json(self.players_file, players)
+            return player, city, removed_ids
+
+    async def recalculate_brigade_caps(self) -> int:
+        """Recalculate every player's brigade cap from their tier counters in one write; returns how many changed.
+
+        Players saved before the counters existed get them built from their cities along the way.
+        """
+        async with self._locked(self.players_file):
+            players = await self._load_json(self.players_file)
+            now = datetime.now().isoformat()
+            
+            updated = 0
+            for player in players.values():
+                backfill = "tier_counts" not in player
+                tier_counts = player_tier_counts(player)
+                new_brigade_cap = brigade_cap_for_tier_counts(tier_counts)
+                if backfill or new_brigade_cap != player.get("brigade_cap", 2):
+                    player["tier_counts"] = tier_counts
+                    player["brigade_cap"] = new_brigade_cap
+                    player["updated_at"] = now
+                    updated += 1
+            
+            # Skip the write entirely when nothing changed
+            if updated:
+                await self._save_json(self.players_file, players)
+            return updated
+
     async def export_player_data(self, player_id: int) -> Dict:
         """Export all data for a specific player."""
-        player = await self.get_player(player_id)
-        brigades = await self.get_brigades(player_id)
-        generals = await self.get_generals(player_id)
-        armies = await self.get_armies(player_id)
-        wars = await self.get_active_wars(player_id)
+        player, brigades, generals, armies, wars = await asyncio.gather(
+            self.get_player(player_id),
+            self.get_brigades(player_id),
+            self.get_generals(player_id),
+            self.get_armies(player_id),
+            self.get_active_wars(player_id)
+        )
         
         return {
             "player": player,
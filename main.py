@@ -1,25 +1,25 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
 import os
-import json
 import random
+import signal
+import functools
+import inspect
+import weakref
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 import asyncio
 from dotenv import load_dotenv
 
-try:
-    import aiofiles
-except ImportError:
-    aiofiles = None
-
 from models import (
     BrigadeType, GamePhase, BRIGADE_STATS, 
-    ENHANCEMENTS, GENERAL_TRAITS, Enhancement, BrigadeStats
+    ENHANCEMENTS, GENERAL_TRAITS_TUPLE, GENERAL_TRAIT_NAMES, GENERAL_TRAIT_IDS, Enhancement, BrigadeStats,
+    BRIGADE_TYPE_BY_NAME, TRAIT_ID_BY_NAME, CITY_TIER_BRIGADE_BONUS, BASE_BRIGADE_CAP,
+    brigade_cap_for_cities, brigade_cap_for_tier_counts, player_tier_counts, find_city, brigade_total_stats
 )
 from json_data_manager import JsonDataManager
-from war_justifications import WAR_JUSTIFICATIONS, get_available_justifications, validate_justification
+from war_justifications import WAR_JUSTIFICATIONS, format_conditions, get_available_justifications, validate_justification
 from battle_system import BattleSystem, BattleSide, create_battle_brigade, create_battle_general
 from siege_system import SiegeSystem
 from temporary_structures import TemporaryStructureSystem, StructureType
@@ -32,6 +32,12 @@ except ImportError:
     REPLIT_HOSTING = False
     keep_alive = None
 
+# Use uvloop's faster event loop when it is installed (not available on Windows)
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 # Load environment variables
 load_dotenv()
 
@@ -45,6 +51,15 @@ class HegemonyBot(commands.Bot):
         super().__init__(command_prefix='/', intents=intents)
 
     async def setup_hook(self):
+        # Start the game cycle scheduler once; it sleeps until each phase boundary
+        self.game_cycle = asyncio.create_task(game_cycle_task())
+        
+        # Close cleanly on SIGTERM so buffered data saves are flushed (not supported on Windows)
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, lambda: asyncio.create_task(self.close()))
+        except NotImplementedError:
+            pass
+        
         # Sync slash commands on startup
         try:
             synced = await self.tree.sync()
@@ -52,6 +67,11 @@ class HegemonyBot(commands.Bot):
         except Exception as e:
             print(f"Failed to sync slash commands: {e}")
 
+    async def close(self):
+        await super().close()
+        # Write out any data saves still buffered in the data manager
+        await db.flush()
+
 bot = HegemonyBot()
 
 # Initialize JSON data manager
@@ -61,84 +81,212 @@ db = JsonDataManager()
 siege_system = SiegeSystem(db)
 structure_system = TemporaryStructureSystem(db)
 
+def deferred(func):
+    """Acknowledge the interaction before running a command that does several reads.
+
+    Discord expires the interaction token after 3 seconds; wrapped commands must
+    reply with interaction.followup.send.
+    """
+    @functools.wraps(func)
+    async def wrapper(interaction: discord.Interaction, *args, **kwargs):
+        await interaction.response.defer(thinking=True)
+        return await func(interaction, *args, **kwargs)
+    return wrapper
+
+# Days each phase runs, for phase-gate messages
+_PHASE_DAYS = {
+    GamePhase.ORGANIZATION: "Tuesday/Friday",
+    GamePhase.MOVEMENT: "Wednesday/Saturday",
+    GamePhase.BATTLE: "Thursday/Sunday"
+}
+
+def require_phase(phase: GamePhase, action: str):
+    """Only run the command during the given game phase.
+
+    `action` starts the refusal message, e.g. "Brigades can only be created"; the message is built once here.
+    Place above @deferred so out-of-phase commands are refused without deferring.
+    """
+    message = f"{action} during {phase.label} phase ({_PHASE_DAYS[phase]})!"
+    
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(interaction: discord.Interaction, *args, **kwargs):
+            if war_bot.current_phase is not phase:
+                send = interaction.followup.send if interaction.response.is_done() else interaction.response.send_message
+                await send(message)
+                return
+            return await func(interaction, *args, **kwargs)
+        return wrapper
+    return decorator
+
+# One lock per user with a command in flight; entries disappear once no command holds or awaits them
+_player_locks: "weakref.WeakValueDictionary[int, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+def requires_registration(func):
+    """Load the calling user's player record and pass it to the command as `player`.
+
+    Unregistered users get the standard register prompt and the command body never runs.
+    Each user's wrapped commands run one at a time in arrival order, so the record a
+    command receives can't be changed underneath it by that user's other wrapped commands.
+    Admin commands and other players' commands aren't serialized with these; the data
+    layer's per-file locks still keep their writes from being lost.
+
+    The interaction is acknowledged before waiting for the lock, so a command queued
+    behind a slow one can't outlive Discord's 3-second window; wrapped commands must
+    reply with interaction.followup.send. Place below @require_phase so out-of-phase
+    commands are refused without deferring.
+    """
+    @functools.wraps(func)
+    async def wrapper(interaction: discord.Interaction, *args, **kwargs):
+        if not interaction.response.is_done():
+            await interaction.response.defer(thinking=True)
+        
+        lock = _player_locks.get(interaction.user.id)
+        if lock is None:
+            lock = _player_locks[interaction.user.id] = asyncio.Lock()
+        
+        async with lock:
+            player = await db.get_player(interaction.user.id)
+            if not player:
+                await interaction.followup.send("You must register first! Use `/register`")
+                return
+            return await func(interaction, *args, player=player, **kwargs)
+    
+    # Hide the injected record from the slash command's parameters
+    signature = inspect.signature(func)
+    wrapper.__signature__ = signature.replace(
+        parameters=[param for name, param in signature.parameters.items() if name != "player"]
+    )
+    return wrapper
+
 class WarBot:
     def __init__(self):
         self.current_phase = GamePhase.ORGANIZATION
         self.battles_in_progress = {}
 
-    def get_brigade_total_stats(self, brigade_type: BrigadeType, enhancement: Optional[str] = None, 
-                               is_garrisoned: bool = False, general_level: int = 0) -> BrigadeStats:
-        """Calculate total stats for a brigade including enhancements and bonuses."""
-        base_stats = BRIGADE_STATS[brigade_type]
-        total_stats = BrigadeStats(
-            skirmish=base_stats.skirmish,
-            defense=base_stats.defense,
-            pitch=base_stats.pitch,
-            rally=base_stats.rally,
-            movement=base_stats.movement
-        )
-        
-        # Apply enhancement bonuses
-        if enhancement and enhancement in ENHANCEMENTS:
-            enh = ENHANCEMENTS[enhancement]
-            total_stats.skirmish += enh.stats.skirmish
-            total_stats.defense += enh.stats.defense
-            total_stats.pitch += enh.stats.pitch
-            total_stats.rally += enh.stats.rally
-            total_stats.movement += enh.stats.movement
-        
-        # Apply garrison bonuses
-        if is_garrisoned:
-            total_stats.defense += 2
-            total_stats.rally += 2
-        
-        return total_stats
+    def get_brigade_total_stats(self, brigade_type: BrigadeType, enhancement: Optional[str] = None,
+                               is_garrisoned: bool = False) -> Tuple[int, int, int, int, int]:
+        """Calculate total stats for a brigade including enhancements and bonuses.
+
+        Returns a shared (skirmish, defense, pitch, rally, movement) tuple precomputed at import.
+        """
+        return brigade_total_stats(brigade_type, enhancement, is_garrisoned)
 
     def roll_general_trait(self) -> int:
         """Roll a random general trait."""
-        return random.randint(1, 20)
+        return random.choice(GENERAL_TRAIT_IDS)
+
+    def roll_general_traits(self, count: int) -> List[int]:
+        """Roll several general traits with one call into the RNG."""
+        return random.choices(GENERAL_TRAIT_IDS, k=count)
 
     def calculate_brigade_cap(self, cities: List[dict]) -> int:
         """Calculate brigade cap based on owned cities."""
-        base_cap = 2
-        for city in cities:
-            tier = city.get('tier', 1)
-            if tier == 1:
-                base_cap += 1
-            elif tier == 2:
-                base_cap += 3
-            elif tier == 3:
-                base_cap += 5
-        return base_cap
+        return brigade_cap_for_cities(cities)
 
 war_bot = WarBot()
 battle_system = BattleSystem()
 
+# Default general names and pillage loot pools
+_DEFAULT_GENERAL_NAMES = ("Alexander", "Caesar", "Napoleon", "Hannibal", "Wellington",
+                          "Scipio", "Patton", "Rommel", "Montgomery", "Zhukov")
+_PILLAGE_RESOURCES = ('food', 'metal', 'wood', 'stone')
+
+# "**Name**: description" display line per trait, indexed by trait_id like GENERAL_TRAITS_TUPLE
+_TRAIT_LINES = tuple(f"**{name}**: {desc}" if name else None for name, desc in GENERAL_TRAITS_TUPLE)
+
+# Shared embed colors, created once instead of on every command
+_BLUE = discord.Color.blue()
+_DARK_BLUE = discord.Color.dark_blue()
+_DARK_GOLD = discord.Color.dark_gold()
+_DARK_RED = discord.Color.dark_red()
+_GOLD = discord.Color.gold()
+_GREEN = discord.Color.green()
+_ORANGE = discord.Color.orange()
+_PURPLE = discord.Color.purple()
+_RED = discord.Color.red()
+
+# City fields per list_cities embed; Discord allows 25 fields and the last page adds 2 summary fields
+_CITIES_PER_PAGE = 22
+
+# Benefit text shown for each city tier
+_CITY_TIER_BENEFITS = {tier: f"+{bonus} brigade cap" for tier, bonus in CITY_TIER_BRIGADE_BONUS.items()}
+
+# Economy resources handled by the resource admin and transfer commands
+RESOURCE_KEYS = ('gold', 'gems', 'population')
+
+def _format_resources(resources: Dict) -> str:
+    """Format a player's economy resources as one 'Name: amount' line per resource."""
+    return "\n".join(f"{resource.title()}: {resources.get(resource, 0)}" for resource in RESOURCE_KEYS)
+
+# Discord's limit on an embed description
+_EMBED_DESCRIPTION_LIMIT = 4096
+
+async def _send_embeds(interaction: discord.Interaction, embeds: List[discord.Embed]):
+    """Send embeds in as few messages as Discord allows: up to 10 per message and 6000 characters in total."""
+    batches, batch, size = [], [], 0
+    for embed in embeds:
+        if batch and (len(batch) == 10 or size + len(embed) > 6000):
+            batches.append(batch)
+            batch, size = [], 0
+        batch.append(embed)
+        size += len(embed)
+    batches.append(batch)
+    
+    send = interaction.followup.send if interaction.response.is_done() else interaction.response.send_message
+    await send(embeds=batches[0])
+    for batch in batches[1:]:
+        await interaction.followup.send(embeds=batch)
+
+def _join_pages(entries: List[str], separator: str = "\n") -> List[str]:
+    """Join entries into as few embed descriptions as fit, never splitting an entry across pages."""
+    pages, current, length = [], [], 0
+    for entry in entries:
+        added = len(entry) + (len(separator) if current else 0)
+        if current and length + added > _EMBED_DESCRIPTION_LIMIT:
+            pages.append(separator.join(current))
+            current, length = [], 0
+            added = len(entry)
+        current.append(entry)
+        length += added
+    if current:
+        pages.append(separator.join(current))
+    return pages
+
 @bot.event
 async def on_ready():
     print(f'{bot.user} has connected to Discord!')
     await db.init_data_files()
-    # Start the game cycle task
-    game_cycle_task.start()
     print("Bot is ready! Use slash commands (e.g., /register, /profile, /help_warfare)")
 
-@tasks.loop(hours=24)  # Check daily for phase changes
+# Phase for each weekday, indexed by datetime.weekday() (0=Monday, 1=Tuesday, etc.)
+# Tuesday/Friday = Organization, Wednesday/Saturday = Movement, Thursday/Sunday = Battle
+# Monday = Rest day (None keeps the previous phase)
+_PHASE_BY_WEEKDAY = (
+    None,
+    GamePhase.ORGANIZATION, GamePhase.MOVEMENT, GamePhase.BATTLE,
+    GamePhase.ORGANIZATION, GamePhase.MOVEMENT, GamePhase.BATTLE
+)
+
+def seconds_until_next_phase(now: datetime) -> float:
+    """Seconds from now until midnight of the next day that starts a phase."""
+    days_ahead = 1
+    while _PHASE_BY_WEEKDAY[(now.weekday() + days_ahead) % 7] is None:
+        days_ahead += 1
+    
+    boundary = datetime.combine(now.date() + timedelta(days=days_ahead), datetime.min.time())
+    return (boundary - now).total_seconds()
+
 async def game_cycle_task():
-    """Manage the 3-day game cycle."""
-    now = datetime.now()
-    weekday = now.weekday()  # 0=Monday, 1=Tuesday, etc.
-    
-    # Tuesday(1) and Friday(4) = Organization
-    # Wednesday(2) and Saturday(5) = Movement  
-    # Thursday(3) and Sunday(6) = Battle
-    # Monday(0) = Rest day
-    
-    if weekday in [1, 4]:  # Tuesday, Friday
-        war_bot.current_phase = GamePhase.ORGANIZATION
-    elif weekday in [2, 5]:  # Wednesday, Saturday
-        war_bot.current_phase = GamePhase.MOVEMENT
-    elif weekday in [3, 6]:  # Thursday, Sunday
-        war_bot.current_phase = GamePhase.BATTLE
+    """Manage the 3-day game cycle, waking only at phase boundaries."""
+    while True:
+        now = datetime.now()
+        phase = _PHASE_BY_WEEKDAY[now.weekday()]
+        if phase is not None:
+            war_bot.current_phase = phase
+        
+        # Overshoot the boundary slightly: the loop clock can wake a hair early, which would read the old weekday
+        await asyncio.sleep(seconds_until_next_phase(now) + 1)
 
 # Slash Commands
 @bot.tree.command(name="register", description="Register as a new player to start your nation")
@@ -157,7 +305,7 @@ async def register_slash(interaction: discord.Interaction):
         embed = discord.Embed(
             title="Welcome to Hegemony!",
             description=f"{username} has been registered as a new player.",
-            color=discord.Color.green()
+            color=_GREEN
         )
         embed.add_field(name="Starting Resources", value="Food: 10, Metal: 10, Silver: 100", inline=False)
         embed.add_field(name="Brigade Cap", value="2", inline=True)
@@ -186,7 +334,7 @@ async def profile_slash(interaction: discord.Interaction, member: Optional[disco
     
     embed = discord.Embed(
         title=f"{target.display_name}'s Profile",
-        color=discord.Color.blue()
+        color=_BLUE
     )
     
     embed.add_field(name="War College Level", value=player['war_college_level'], inline=True)
@@ -213,23 +361,23 @@ async def profile_slash(interaction: discord.Interaction, member: Optional[disco
     app_commands.Choice(name="🏹 Ranged", value="🏹 Ranged"),
     app_commands.Choice(name="🛡️ Support", value="🛡️ Support")
 ])
-async def create_brigade_slash(interaction: discord.Interaction, brigade_type: str, city: str = "Capital"):
+@require_phase(GamePhase.ORGANIZATION, "Brigades can only be created")
+@requires_registration
+async def create_brigade_slash(interaction: discord.Interaction, brigade_type: str, player: Dict, city: str = "Capital"):
     """Create a new brigade."""
-    if war_bot.current_phase != GamePhase.ORGANIZATION:
-        await interaction.response.send_message("Brigades can only be created during Organization phase (Tuesday/Friday)!")
+    # Validate and resolve the brigade type in one lookup, before brigades are read
+    brigade_enum = BRIGADE_TYPE_BY_NAME.get(brigade_type)
+    if brigade_enum is None:
+        await interaction.followup.send(f"Unknown brigade type '{brigade_type}'.")
         return
     
-    player = await db.get_player(interaction.user.id)
-    if not player:
-        await interaction.response.send_message("You must register first! Use `/register`")
-        return
+    current_brigades = await db.get_brigades(interaction.user.id)
     
     # Check brigade cap
-    current_brigades = await db.get_brigades(interaction.user.id)
     brigade_cap = calculate_brigade_cap(player)
     
     if len(current_brigades) >= brigade_cap:
-        await interaction.response.send_message(f"You've reached your brigade cap of {brigade_cap}!")
+        await interaction.followup.send(f"You've reached your brigade cap of {brigade_cap}!")
         return
     
     # Check resources (2 food + 1 metal OR 40 silver)
@@ -238,66 +386,54 @@ async def create_brigade_slash(interaction: discord.Interaction, brigade_type: s
     has_silver = player.get('silver', 0) >= 40
     
     if not (has_resources or has_silver):
-        await interaction.response.send_message("Insufficient resources! Need 2 food + 1 metal OR 40 silver.")
+        await interaction.followup.send("Insufficient resources! Need 2 food + 1 metal OR 40 silver.")
         return
     
-    # Create the brigade
-    brigade_id = await db.create_brigade(interaction.user.id, brigade_type, city)
-    
-    # Deduct resources (prefer resources over silver)
+    # Create the brigade and deduct its cost in one write (prefer resources over silver)
     if has_resources:
-        await db.deduct_resources(interaction.user.id, {"food": 2, "metal": 1})
+        brigade_id = await db.atomic_create_brigade(interaction.user.id, brigade_type, city,
+                                                    cost_resources={"food": 2, "metal": 1})
         cost_text = "2 food + 1 metal"
     else:
-        await db.deduct_silver(interaction.user.id, 40)
+        brigade_id = await db.atomic_create_brigade(interaction.user.id, brigade_type, city, cost_silver=40)
         cost_text = "40 silver"
     
+    if not brigade_id:
+        await interaction.followup.send("Brigade creation failed. Please try again.")
+        return
+    
     embed = discord.Embed(
         title="Brigade Created!",
         description=f"Created {brigade_type} brigade at {city}",
-        color=discord.Color.green()
+        color=_GREEN
     )
     
-    # Show brigade stats - find matching brigade type
-    try:
-        brigade_enum = next(bt for bt in BrigadeType if bt.value == brigade_type)
-        stats = BRIGADE_STATS[brigade_enum]
-        
-        embed.add_field(name="Stats", value=(
-            f"⚔️ Skirmish: {stats.skirmish}\n"
-            f"🛡️ Defense: {stats.defense}\n"
-            f"📯 Pitch: {stats.pitch}\n"
-            f"🚩 Rally: {stats.rally}\n"
-            f"🏃 Movement: {stats.movement}"
-        ), inline=True)
-    except StopIteration:
-        # Fallback if brigade type not found
-        embed.add_field(name="Stats", value="Stats will be available after creation", inline=True)
+    # Show brigade stats
+    stats = BRIGADE_STATS[brigade_enum]
+    embed.add_field(name="Stats", value=(
+        f"⚔️ Skirmish: {stats.skirmish}\n"
+        f"🛡️ Defense: {stats.defense}\n"
+        f"📯 Pitch: {stats.pitch}\n"
+        f"🚩 Rally: {stats.rally}\n"
+        f"🏃 Movement: {stats.movement}"
+    ), inline=True)
     
     embed.add_field(name="Brigade ID", value=str(brigade_id), inline=True)
     embed.add_field(name="Cost", value=cost_text, inline=True)
     
-    await interaction.response.send_message(embed=embed)
+    await interaction.followup.send(embed=embed)
 
 @bot.tree.command(name="list_brigades", description="List all your brigades")
-async def list_brigades_slash(interaction: discord.Interaction):
+@requires_registration
+async def list_brigades_slash(interaction: discord.Interaction, player: Dict):
     """List all your brigades."""
-    player = await db.get_player(interaction.user.id)
-    if not player:
-        await interaction.response.send_message("You must register first! Use `/register`")
-        return
-    
     brigades = await db.get_brigades(interaction.user.id)
     
     if not brigades:
-        await interaction.response.send_message("You have no brigades. Create one with `/create_brigade`")
+        await interaction.followup.send("You have no brigades. Create one with `/create_brigade`")
         return
     
-    embed = discord.Embed(
-        title=f"{interaction.user.display_name}'s Brigades",
-        color=discord.Color.blue()
-    )
-    
+    entries = []
     for brigade in brigades:
         enhancement_text = f" ({brigade['enhancement']})" if brigade['enhancement'] else ""
         status_text = ""
@@ -306,76 +442,66 @@ async def list_brigades_slash(interaction: discord.Interaction):
         if brigade['is_fatigued']:
             status_text += " 😴"
         
-        embed.add_field(
-            name=f"{brigade['id']} {brigade['type']}{enhancement_text}",
-            value=f"📍 {brigade['location']}{status_text}",
-            inline=True
-        )
+        entries.append(f"**{brigade['id']} {brigade['type']}{enhancement_text}** — 📍 {brigade['location']}{status_text}")
     
-    await interaction.response.send_message(embed=embed)
+    title = f"{interaction.user.display_name}'s Brigades"
+    pages = _join_pages(entries)
+    
+    await _send_embeds(interaction, [discord.Embed(title=title, description=page, color=_BLUE) for page in pages])
 
 @bot.tree.command(name="recruit_general", description="Recruit a new general for your army")
 @app_commands.describe(name="Custom name for the general (optional)")
-async def recruit_general_slash(interaction: discord.Interaction, name: Optional[str] = None):
+@require_phase(GamePhase.ORGANIZATION, "Generals can only be recruited")
+@requires_registration
+async def recruit_general_slash(interaction: discord.Interaction, player: Dict, name: Optional[str] = None):
     """Recruit a new general."""
-    if war_bot.current_phase != GamePhase.ORGANIZATION:
-        await interaction.response.send_message("Generals can only be recruited during Organization phase (Tuesday/Friday)!")
-        return
-    
-    player = await db.get_player(interaction.user.id)
-    if not player:
-        await interaction.response.send_message("You must register first! Use `/register`")
-        return
+    current_generals = await db.get_generals(interaction.user.id)
     
     # Check general cap
-    current_generals = await db.get_generals(interaction.user.id)
     if len(current_generals) >= player['general_cap']:
-        await interaction.response.send_message(f"You've reached your general cap of {player['general_cap']}!")
+        await interaction.followup.send(f"You've reached your general cap of {player['general_cap']}!")
         return
     
     # Calculate cost (100 silver per existing general)
     cost = len(current_generals) * 100
     if player.get('silver', 0) < cost:
-        await interaction.response.send_message(f"Insufficient silver! Need {cost} silver.")
+        await interaction.followup.send(f"Insufficient silver! Need {cost} silver.")
         return
     
     # Generate random name if not provided
     if not name:
-        name_options = ["Alexander", "Caesar", "Napoleon", "Hannibal", "Wellington", 
-                       "Scipio", "Patton", "Rommel", "Montgomery", "Zhukov"]
-        name = random.choice(name_options)
+        name = random.choice(_DEFAULT_GENERAL_NAMES)
     
     # Roll trait (with War College Level 2 double roll)
     war_college_level = player.get('war_college_level', 1)
     
     if war_college_level >= 2:
         # Roll twice and choose
-        trait_id_1 = war_bot.roll_general_trait()
-        trait_id_2 = war_bot.roll_general_trait()
+        trait_id_1, trait_id_2 = war_bot.roll_general_traits(2)
         
-        trait_1_name, trait_1_desc = GENERAL_TRAITS[trait_id_1]
-        trait_2_name, trait_2_desc = GENERAL_TRAITS[trait_id_2]
+        trait_1_name, trait_1_desc = GENERAL_TRAITS_TUPLE[trait_id_1]
+        trait_2_name, trait_2_desc = GENERAL_TRAITS_TUPLE[trait_id_2]
         
         # For simplicity, randomly choose one (in real game, player would choose)
         trait_id = random.choice([trait_id_1, trait_id_2])
-        trait_name, trait_desc = GENERAL_TRAITS[trait_id]
+        trait_name, trait_desc = GENERAL_TRAITS_TUPLE[trait_id]
         
         trait_info = f"**{trait_name}** (chosen from {trait_1_name}/{trait_2_name})\n{trait_desc}"
     else:
         trait_id = war_bot.roll_general_trait()
-        trait_name, trait_desc = GENERAL_TRAITS[trait_id]
+        trait_name, trait_desc = GENERAL_TRAITS_TUPLE[trait_id]
         trait_info = f"**{trait_name}**\n{trait_desc}"
     
-    # Create general
-    general_id = await db.create_general(interaction.user.id, name, trait_id)
-    
-    # Deduct silver from player
-    await db.deduct_silver(interaction.user.id, cost)
+    # Create general and deduct silver from player in one write
+    general_id = await db.atomic_create_general(interaction.user.id, name, trait_id, cost_silver=cost)
+    if not general_id:
+        await interaction.followup.send("General recruitment failed. Please try again.")
+        return
     
     embed = discord.Embed(
         title="General Recruited!",
         description=f"**{name}** has joined your forces!",
-        color=discord.Color.gold()
+        color=_GOLD
     )
     
     embed.add_field(name="General ID", value=str(general_id), inline=True)
@@ -383,80 +509,114 @@ async def recruit_general_slash(interaction: discord.Interaction, name: Optional
     embed.add_field(name="Cost", value=f"{cost} silver", inline=True)
     embed.add_field(name="Trait", value=trait_info, inline=False)
     
-    await interaction.response.send_message(embed=embed)
+    await interaction.followup.send(embed=embed)
 
 @bot.tree.command(name="list_generals", description="List all your generals")
-async def list_generals_slash(interaction: discord.Interaction):
+@requires_registration
+async def list_generals_slash(interaction: discord.Interaction, player: Dict):
     """List all your generals."""
-    player = await db.get_player(interaction.user.id)
-    if not player:
-        await interaction.response.send_message("You must register first! Use `/register`")
-        return
-    
     generals = await db.get_generals(interaction.user.id)
     
     if not generals:
-        await interaction.response.send_message("You have no generals. Recruit one with `/recruit_general`")
+        await interaction.followup.send("You have no generals. Recruit one with `/recruit_general`")
         return
     
-    embed = discord.Embed(
-        title=f"{interaction.user.display_name}'s Generals",
-        color=discord.Color.gold()
-    )
-    
+    entries = []
     for general in generals:
-        trait_name, trait_desc = GENERAL_TRAITS[general['trait_id']]
         status = "🏰" if general['army_id'] else "🏠"
-        
-        embed.add_field(
-            name=f"#{general['id']} {general['name']} (Level {general['level']}) {status}",
-            value=f"**{trait_name}**: {trait_desc}",
-            inline=False
+        entries.append(
+            f"**#{general['id']} {general['name']} (Level {general['level']}) {status}**\n"
+            f"{_TRAIT_LINES[general['trait_id']]}"
         )
     
-    await interaction.response.send_message(embed=embed)
+    title = f"{interaction.user.display_name}'s Generals"
+    pages = _join_pages(entries, separator="\n\n")
+    
+    await _send_embeds(interaction, [discord.Embed(title=title, description=page, color=_GOLD) for page in pages])
+
+_WEEKDAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+# Phase descriptions and when the following phase starts
+_PHASE_ACTIONS = {
+    GamePhase.ORGANIZATION: "Create/enhance brigades, recruit generals, build structures",
+    GamePhase.MOVEMENT: "Move brigades/armies, pillage resources",
+    GamePhase.BATTLE: "Fight battles, siege cities"
+}
+
+_NEXT_PHASE_DAYS = {
+    GamePhase.ORGANIZATION: "Wednesday/Saturday",
+    GamePhase.MOVEMENT: "Thursday/Sunday",
+    GamePhase.BATTLE: "Tuesday/Friday"
+}
 
 @bot.tree.command(name="game_status", description="Check current game phase and timing")
 async def game_status_slash(interaction: discord.Interaction):
     """Show current game cycle and phase."""
-    now = datetime.now()
-    weekday_names = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-    current_day = weekday_names[now.weekday()]
-    
     embed = discord.Embed(
         title="Game Status",
-        color=discord.Color.purple()
+        color=_PURPLE
     )
     
-    embed.add_field(name="Current Day", value=current_day, inline=True)
-    embed.add_field(name="Current Phase", value=war_bot.current_phase.value, inline=True)
-    
-    # Phase descriptions
-    phase_info = {
-        GamePhase.ORGANIZATION: "Create/enhance brigades, recruit generals, build structures",
-        GamePhase.MOVEMENT: "Move brigades/armies, pillage resources", 
-        GamePhase.BATTLE: "Fight battles, siege cities"
-    }
-    
-    embed.add_field(name="Phase Actions", value=phase_info[war_bot.current_phase], inline=False)
-    
-    # Next phase timing
-    next_phase_day = {
-        GamePhase.ORGANIZATION: "Wednesday/Saturday",
-        GamePhase.MOVEMENT: "Thursday/Sunday",
-        GamePhase.BATTLE: "Tuesday/Friday"
-    }
-    
-    embed.add_field(name="Next Phase", value=next_phase_day[war_bot.current_phase], inline=True)
+    embed.add_field(name="Current Day", value=_WEEKDAY_NAMES[datetime.now().weekday()], inline=True)
+    embed.add_field(name="Current Phase", value=war_bot.current_phase.label, inline=True)
+    embed.add_field(name="Phase Actions", value=_PHASE_ACTIONS[war_bot.current_phase], inline=False)
+    embed.add_field(name="Next Phase", value=_NEXT_PHASE_DAYS[war_bot.current_phase], inline=True)
     
     await interaction.response.send_message(embed=embed)
 
-@bot.tree.command(name="brigade_types", description="Show all available brigade types and their stats")
-async def brigade_types_slash(interaction: discord.Interaction):
-    """Show all brigade types and their stats."""
+def _embed_from_template(template: Dict, description: Optional[str], *values: str,
+                         title: Optional[str] = None) -> discord.Embed:
+    """Build an embed in one pass from a static template, filling its field values in order."""
+    return discord.Embed.from_dict({
+        "title": title or template["title"],
+        "description": description,
+        "color": template["color"],
+        "fields": [
+            {"name": name, "value": value, "inline": inline}
+            for (name, inline), value in zip(template["fields"], values)
+        ]
+    })
+
+# Static parts of result embeds: title, color and (field name, inline) pairs
+_ARMY_FORMED_EMBED_TEMPLATE = {
+    "title": "Army Formed!",
+    "color": _PURPLE.value,
+    "fields": (("Army ID", True), ("General", True), ("Brigades", True), ("Brigade Composition", False))
+}
+
+_SIEGE_BEGUN_EMBED_TEMPLATE = {
+    "title": "Siege Begun!",
+    "color": _DARK_RED.value,
+    "fields": (("Siege ID", True), ("City Tier", True), ("Siege Timer", True), ("Brigades", True),
+               ("Next Steps", False))
+}
+
+_CITY_ADDED_EMBED_TEMPLATE = {
+    "title": "City Added",
+    "color": _GREEN.value,
+    "fields": (("City Name", True), ("Tier", True), ("Location", True), ("Benefits", True),
+               ("New Brigade Cap", True), ("Total Cities", True))
+}
+
+_RESOURCES_TRANSFERRED_EMBED_TEMPLATE = {
+    "title": "Resources Transferred",
+    "color": _GREEN.value,
+    "fields": (("Transferred", False), ("Your Remaining Resources", True))
+}
+
+# view_resources sets the title per player
+_RESOURCES_EMBED_TEMPLATE = {
+    "title": "Resources",
+    "color": _GOLD.value,
+    "fields": (("💰 Gold", True), ("💎 Gems", True), ("👥 Population", True), ("💹 Income (per turn)", True),
+               ("💸 Expenses (per turn)", True), ("📊 Net Income", True), ("📋 Capacity", True))
+}
+
+def _build_brigade_types_embed() -> discord.Embed:
+    """Build the static brigade types reference embed."""
     embed = discord.Embed(
         title="Brigade Types & Stats",
-        color=discord.Color.green()
+        color=_GREEN
     )
     
     for brigade_type, stats in BRIGADE_STATS.items():
@@ -473,52 +633,51 @@ async def brigade_types_slash(interaction: discord.Interaction):
         )
     
     embed.add_field(name="Cost", value="2 food + 1 metal OR 40 silver", inline=False)
-    
-    await interaction.response.send_message(embed=embed)
+    return embed
+
+# Brigade stats never change at runtime, so the embed is built once at import
+_BRIGADE_TYPES_EMBED = _build_brigade_types_embed()
+
+@bot.tree.command(name="brigade_types", description="Show all available brigade types and their stats")
+async def brigade_types_slash(interaction: discord.Interaction):
+    """Show all brigade types and their stats."""
+    await interaction.response.send_message(embed=_BRIGADE_TYPES_EMBED)
 
 @bot.tree.command(name="declare_war", description="Declare war against another player")
 @app_commands.describe(
     target="The player to declare war on",
     justification="Reason for declaring war"
 )
-async def declare_war_slash(interaction: discord.Interaction, target: discord.Member, justification: str):
+@require_phase(GamePhase.ORGANIZATION, "Wars can only be declared")
+@deferred
+@requires_registration
+async def declare_war_slash(interaction: discord.Interaction, target: discord.Member, justification: str, player: Dict):
     """Declare war against another player."""
-    if war_bot.current_phase != GamePhase.ORGANIZATION:
-        await interaction.response.send_message("Wars can only be declared during Organization phase!")
-        return
-    
     # Validate players
-    attacker = await db.get_player(interaction.user.id)
-    defender = await db.get_player(target.id)
-    
-    if not attacker:
-        await interaction.response.send_message("You must register first! Use `/register`")
-        return
+    defender, already_at_war = await asyncio.gather(
+        db.get_player(target.id),
+        db.has_active_war(interaction.user.id, target.id)
+    )
     
     if not defender:
-        await interaction.response.send_message(f"{target.display_name} is not registered.")
+        await interaction.followup.send(f"{target.display_name} is not registered.")
         return
     
     if interaction.user.id == target.id:
-        await interaction.response.send_message("You cannot declare war on yourself!")
+        await interaction.followup.send("You cannot declare war on yourself!")
         return
     
-    # Validate justification
-    is_valid, error_msg = validate_justification(
-        justification, dict(attacker), dict(defender)
-    )
+    # Validate justification; get_player already returns a private dict per call, so no copies are needed
+    is_valid, error_msg = validate_justification(justification, player, defender)
     
     if not is_valid:
-        await interaction.response.send_message(f"Invalid justification: {error_msg}")
+        await interaction.followup.send(f"Invalid justification: {error_msg}")
         return
     
     # Check for existing active wars
-    existing_wars = await db.get_active_wars(interaction.user.id)
-    for war in existing_wars:
-        if (war.get('attacker_id') == interaction.user.id and war.get('defender_id') == target.id) or \
-           (war.get('attacker_id') == target.id and war.get('defender_id') == interaction.user.id):
-            await interaction.response.send_message("There is already an active war between these players!")
-            return
+    if already_at_war:
+        await interaction.followup.send("There is already an active war between these players!")
+        return
     
     # Create war in database
     justification_data = WAR_JUSTIFICATIONS[justification]
@@ -533,7 +692,7 @@ async def declare_war_slash(interaction: discord.Interaction, target: discord.Me
     embed = discord.Embed(
         title="⚔️ WAR DECLARED!",
         description=f"**{interaction.user.display_name}** has declared war on **{target.display_name}**",
-        color=discord.Color.dark_red()
+        color=_DARK_RED
     )
     
     embed.add_field(name="Justification", value=justification_data.name, inline=True)
@@ -542,21 +701,20 @@ async def declare_war_slash(interaction: discord.Interaction, target: discord.Me
     
     embed.add_field(
         name="Victory Conditions (Attacker)",
-        value="\n".join([f"• {cond}" for cond in justification_data.victory_conditions]),
+        value=format_conditions(justification_data.victory_conditions),
         inline=False
     )
     
     embed.set_footer(text="The war has begun! Prepare your forces!")
     
-    await interaction.response.send_message(embed=embed)
+    await interaction.followup.send(embed=embed)
 
-@bot.tree.command(name="help", description="Show comprehensive help for the war game")
-async def help_slash(interaction: discord.Interaction):
-    """Show detailed warfare help."""
+def _build_help_embed() -> discord.Embed:
+    """Build the static command help embed."""
     embed = discord.Embed(
         title="🎮 Hegemony War Game Commands",
         description="Complete guide to playing the war simulation",
-        color=discord.Color.dark_blue()
+        color=_DARK_BLUE
     )
     
     embed.add_field(name="🏗️ Getting Started", value=(
@@ -585,7 +743,14 @@ async def help_slash(interaction: discord.Interaction):
         "**Thursday/Sunday**: Battle (fight & siege)"
     ), inline=False)
     
-    await interaction.response.send_message(embed=embed)
+    return embed
+
+_HELP_EMBED = _build_help_embed()
+
+@bot.tree.command(name="help", description="Show comprehensive help for the war game")
+async def help_slash(interaction: discord.Interaction):
+    """Show detailed warfare help."""
+    await interaction.response.send_message(embed=_HELP_EMBED)
 
 @bot.tree.command(name="move_brigade", description="Move a brigade in a direction")
 @app_commands.describe(
@@ -602,28 +767,21 @@ async def help_slash(interaction: discord.Interaction):
     app_commands.Choice(name="Southeast", value="southeast"),
     app_commands.Choice(name="Southwest", value="southwest")
 ])
-async def move_brigade_slash(interaction: discord.Interaction, brigade_id: str, direction: str):
+@require_phase(GamePhase.MOVEMENT, "Brigades can only be moved")
+@requires_registration
+async def move_brigade_slash(interaction: discord.Interaction, brigade_id: str, direction: str, player: Dict):
     """Move a brigade in a direction."""
-    if war_bot.current_phase != GamePhase.MOVEMENT:
-        await interaction.response.send_message("Brigades can only be moved during Movement phase (Wednesday/Saturday)!")
-        return
-    
-    player = await db.get_player(interaction.user.id)
-    if not player:
-        await interaction.response.send_message("You must register first! Use `/register`")
-        return
-    
     brigade = await db.get_brigade(brigade_id)
     if not brigade:
-        await interaction.response.send_message("Brigade not found.")
+        await interaction.followup.send("Brigade not found.")
         return
     
     if brigade['player_id'] != interaction.user.id:
-        await interaction.response.send_message("You don't own this brigade.")
+        await interaction.followup.send("You don't own this brigade.")
         return
     
     if brigade.get('army_id'):
-        await interaction.response.send_message("This brigade is part of an army. Use `/move_army` instead.")
+        await interaction.followup.send("This brigade is part of an army. Use `/move_army` instead.")
         return
     
     # Update brigade location (simplified - just append direction)
@@ -634,36 +792,30 @@ async def move_brigade_slash(interaction: discord.Interaction, brigade_id: str,
     embed = discord.Embed(
         title="Brigade Moved",
         description=f"Brigade {brigade_id} moved {direction}",
-        color=discord.Color.green()
+        color=_GREEN
     )
     embed.add_field(name="New Location", value=new_location, inline=False)
     
-    await interaction.response.send_message(embed=embed)
+    await interaction.followup.send(embed=embed)
 
 @bot.tree.command(name="pillage", description="Pillage resources with a brigade")
 @app_commands.describe(brigade_id="ID of the brigade to use for pillaging")
-async def pillage_slash(interaction: discord.Interaction, brigade_id: str):
+@require_phase(GamePhase.MOVEMENT, "Pillaging can only be done")
+@deferred
+@requires_registration
+async def pillage_slash(interaction: discord.Interaction, brigade_id: str, player: Dict):
     """Pillage resources with a brigade."""
-    if war_bot.current_phase != GamePhase.MOVEMENT:
-        await interaction.response.send_message("Pillaging can only be done during Movement phase (Wednesday/Saturday)!")
-        return
-    
-    player = await db.get_player(interaction.user.id)
-    if not player:
-        await interaction.response.send_message("You must register first! Use `/register`")
-        return
-    
     brigade = await db.get_brigade(brigade_id)
     if not brigade:
-        await interaction.response.send_message("Brigade not found.")
+        await interaction.followup.send("Brigade not found.")
         return
     
     if brigade['player_id'] != interaction.user.id:
-        await interaction.response.send_message("You don't own this brigade.")
+        await interaction.followup.send("You don't own this brigade.")
         return
     
     if brigade.get('is_garrisoned'):
-        await interaction.response.send_message("Garrisoned brigades cannot pillage.")
+        await interaction.followup.send("Garrisoned brigades cannot pillage.")
         return
     
     # Roll for pillage success (6 on d6, or 5-6 with Brutal trait)
@@ -677,13 +829,11 @@ async def pillage_slash(interaction: discord.Interaction, brigade_id: str):
         army = await db.get_army(army_id)
         if army and army.get('general_id'):
             general = await db.get_general(army['general_id'])
-            if general:
-                trait_name, _ = GENERAL_TRAITS[general['trait_id']]
-                if trait_name == "Brutal":
-                    success_threshold = 5
-                    brutal_general = True
+            if general and general['trait_id'] == TRAIT_ID_BY_NAME["Brutal"]:
+                success_threshold = 5
+                brutal_general = True
     
-    embed = discord.Embed(title="Pillaging Attempt", color=discord.Color.orange())
+    embed = discord.Embed(title="Pillaging Attempt", color=_ORANGE)
     embed.add_field(name="Brigade", value=f"{brigade['type']} at {brigade.get('location', 'Unknown')}", inline=False)
     embed.add_field(name="Roll", value=f"🎲 {roll}/6", inline=True)
     
@@ -692,23 +842,23 @@ async def pillage_slash(interaction: discord.Interaction, brigade_id: str):
     
     if roll >= success_threshold:
         # Successful pillage - gain random resource
-        resources = ['food', 'metal', 'wood', 'stone']
-        gained_resource = random.choice(resources)
+        gained_resource = _PILLAGE_RESOURCES[random.randrange(len(_PILLAGE_RESOURCES))]
         amount = 1
         
         await db.add_resource(interaction.user.id, gained_resource, amount)
         
         embed.add_field(name="Result", value="✅ Success!", inline=True)
         embed.add_field(name="Gained", value=f"{amount} {gained_resource}", inline=True)
-        embed.color = discord.Color.green()
+        embed.color = _GREEN
     else:
         embed.add_field(name="Result", value="❌ Failed", inline=True)
         embed.add_field(name="Gained", value="Nothing", inline=True)
-        embed.color = discord.Color.red()
+        embed.color = _RED
     
-    await interaction.response.send_message(embed=embed)
+    await interaction.followup.send(embed=embed)
 
 @bot.tree.command(name="data_stats", description="Show game statistics and player counts")
+@deferred
 async def data_stats_slash(interaction: discord.Interaction):
     """Show game data statistics."""
     try:
@@ -721,7 +871,7 @@ async def data_stats_slash(interaction: discord.Interaction):
         embed = discord.Embed(
             title="📊 Game Statistics",
             description="Current state of the game world",
-            color=discord.Color.blue()
+            color=_BLUE
         )
         
         # Basic counts
@@ -735,92 +885,108 @@ async def data_stats_slash(interaction: discord.Interaction):
         active_wars = len([w for w in wars.values() if w.get('status') == 'active'])
         embed.add_field(name="🔥 Active Wars", value=str(active_wars), inline=True)
         
-        embed.add_field(name="Current Phase", value=war_bot.current_phase.value, inline=True)
+        embed.add_field(name="Current Phase", value=war_bot.current_phase.label, inline=True)
         
-        await interaction.response.send_message(embed=embed)
+        await interaction.followup.send(embed=embed)
     
     except Exception as e:
-        await interaction.response.send_message(f"❌ Error retrieving statistics: {e}")
+        await interaction.followup.send(f"❌ Error retrieving statistics: {e}")
+
+# Valid enhancement names, overall and per brigade type (type-specific plus universal), for error messages
+_ENHANCEMENT_NAMES_TEXT = ", ".join(ENHANCEMENTS)
+_ENHANCEMENTS_FOR_TYPE = {
+    brigade_type: tuple(name for name, enhancement in ENHANCEMENTS.items()
+                        if enhancement.brigade_type in (brigade_type, None))
+    for brigade_type in BrigadeType
+}
+_ENHANCEMENT_NAMES_BY_TYPE = {brigade_type: ", ".join(names) for brigade_type, names in _ENHANCEMENTS_FOR_TYPE.items()}
+_ENHANCEMENT_SETS_BY_TYPE = {brigade_type: frozenset(names) for brigade_type, names in _ENHANCEMENTS_FOR_TYPE.items()}
+# Resource part of each enhancement's cost ("" when it costs silver only)
+_ENHANCEMENT_RESOURCE_COSTS = {
+    name: ", ".join(f"{amount} {resource}" for resource, amount in enhancement.cost_resources.items())
+    for name, enhancement in ENHANCEMENTS.items()
+}
 
 @bot.tree.command(name="enhance_brigade", description="Add an enhancement to a brigade")
 @app_commands.describe(
     brigade_id="ID of the brigade to enhance",
     enhancement="Enhancement to add"
 )
-async def enhance_brigade_slash(interaction: discord.Interaction, brigade_id: str, enhancement: str):
+@require_phase(GamePhase.ORGANIZATION, "Brigades can only be enhanced")
+@requires_registration
+async def enhance_brigade_slash(interaction: discord.Interaction, brigade_id: str, enhancement: str, player: Dict):
     """Add an enhancement to a brigade."""
-    if war_bot.current_phase != GamePhase.ORGANIZATION:
-        await interaction.response.send_message("Brigades can only be enhanced during Organization phase!")
-        return
-    
-    player = await db.get_player(interaction.user.id)
-    if not player:
-        await interaction.response.send_message("You must register first! Use `/register`")
+    # Check the enhancement exists before the brigade is read
+    enhancement_data = ENHANCEMENTS.get(enhancement)
+    if enhancement_data is None:
+        await interaction.followup.send(f"Invalid enhancement. Choose from: {_ENHANCEMENT_NAMES_TEXT}")
         return
     
     brigade = await db.get_brigade(brigade_id)
     if not brigade:
-        await interaction.response.send_message("Brigade not found.")
+        await interaction.followup.send("Brigade not found.")
         return
     
     if brigade['player_id'] != interaction.user.id:
-        await interaction.response.send_message("You don't own this brigade.")
+        await interaction.followup.send("You don't own this brigade.")
         return
     
     if brigade.get('enhancement'):
-        await interaction.response.send_message("This brigade already has an enhancement.")
+        await interaction.followup.send("This brigade already has an enhancement.")
         return
     
-    # Check if enhancement exists and is valid for brigade type
-    if enhancement not in ENHANCEMENTS:
-        await interaction.response.send_message("Invalid enhancement.")
+    brigade_type = BRIGADE_TYPE_BY_NAME.get(brigade['type'])
+    if brigade_type is None:
+        await interaction.followup.send(f"Unknown brigade type '{brigade['type']}'.")
         return
     
-    enhancement_data = ENHANCEMENTS[enhancement]
-    brigade_type = next(bt for bt in BrigadeType if bt.value.split()[1].lower() == brigade['type'])
-    
     # Check if enhancement is compatible with brigade type
-    if enhancement_data.brigade_type and enhancement_data.brigade_type != brigade_type:
-        await interaction.response.send_message(f"Enhancement '{enhancement}' cannot be applied to {brigade['type']} brigades.")
+    if enhancement not in _ENHANCEMENT_SETS_BY_TYPE[brigade_type]:
+        await interaction.followup.send(
+            f"Enhancement '{enhancement}' cannot be applied to {brigade['type']} brigades. "
+            f"Available: {_ENHANCEMENT_NAMES_BY_TYPE[brigade_type]}"
+        )
         return
     
     # Check if player can afford enhancement
     if player.get('silver', 0) < enhancement_data.cost_silver:
-        await interaction.response.send_message(f"Insufficient silver! Need {enhancement_data.cost_silver} silver.")
+        await interaction.followup.send(f"Insufficient silver! Need {enhancement_data.cost_silver} silver.")
         return
     
     # Check resource costs
-    if enhancement_data.cost_resources:
-        for resource, cost in enhancement_data.cost_resources.items():
-            if player.get('resources', {}).get(resource, 0) < cost:
-                await interaction.response.send_message(f"Insufficient {resource}! Need {cost}.")
-                return
-    
-    # Deduct costs
-    await db.deduct_silver(interaction.user.id, enhancement_data.cost_silver)
-    if enhancement_data.cost_resources:
-        await db.deduct_resources(interaction.user.id, enhancement_data.cost_resources)
+    player_resources = player.get('resources') or {}
+    shortfalls = [
+        f"{cost - held} {resource}"
+        for resource, cost in enhancement_data.cost_resources.items()
+        if (held := player_resources.get(resource, 0)) < cost
+    ]
+    if shortfalls:
+        missing = ", ".join(shortfalls)
+        await interaction.followup.send(f"Insufficient resources! Missing {missing}.")
+        return
     
-    # Apply enhancement
-    await db.update_brigade(brigade_id, {"enhancement": enhancement})
+    # Deduct costs and apply the enhancement in one write, re-checked under the data locks
+    if not await db.atomic_enhance_brigade(interaction.user.id, brigade_id, enhancement,
+                                           enhancement_data.cost_resources, enhancement_data.cost_silver):
+        await interaction.followup.send("Enhancement failed. Please try again.")
+        return
     
     embed = discord.Embed(
         title="Brigade Enhanced!",
         description=f"Brigade {brigade_id} has been enhanced",
-        color=discord.Color.gold()
+        color=_GOLD
     )
     
     embed.add_field(name="Enhancement", value=enhancement, inline=True)
     embed.add_field(name="Cost", value=f"{enhancement_data.cost_silver} silver", inline=True)
     
     if enhancement_data.cost_resources:
-        resources_cost = ", ".join([f"{amount} {resource}" for resource, amount in enhancement_data.cost_resources.items()])
-        embed.add_field(name="Resources", value=resources_cost, inline=True)
+        embed.add_field(name="Resources", value=_ENHANCEMENT_RESOURCE_COSTS[enhancement], inline=True)
     
     if enhancement_data.special_ability:
         embed.add_field(name="Special Ability", value=enhancement_data.special_ability, inline=False)
     
-    await interaction.response.send_message(embed=embed)
+    await interaction.followup.send(embed=embed)
 
 @bot.tree.command(name="build_structure", description="Build a temporary structure")
 @app_commands.describe(
@@ -841,7 +1007,7 @@ async def build_structure_slash(interaction: discord.Interaction, structure_type
         embed = discord.Embed(
             title="Structure Built!",
             description=result["message"],
-            color=discord.Color.green()
+            color=_GREEN
         )
         embed.add_field(name="Effect", value=result["effect"], inline=False)
         embed.add_field(name="Expires", value="Next map update", inline=True)
@@ -849,86 +1015,81 @@ async def build_structure_slash(interaction: discord.Interaction, structure_type
         embed = discord.Embed(
             title="Construction Failed",
             description=result["message"],
-            color=discord.Color.red()
+            color=_RED
         )
     
     await interaction.response.send_message(embed=embed)
 
 @bot.tree.command(name="list_structures", description="List your temporary structures")
-async def list_structures_slash(interaction: discord.Interaction):
+@requires_registration
+async def list_structures_slash(interaction: discord.Interaction, player: Dict):
     """List player's temporary structures."""
-    player = await db.get_player(interaction.user.id)
-    if not player:
-        await interaction.response.send_message("You must register first! Use `/register`")
-        return
-    
-    structures = await structure_system.get_player_structures(interaction.user.id)
+    structure_fields = await structure_system.get_player_structures_rendered(interaction.user.id)
     
-    if not structures:
-        await interaction.response.send_message("You have no active structures.")
+    if not structure_fields:
+        await interaction.followup.send("You have no active structures.")
         return
     
     embed = discord.Embed(
         title=f"{interaction.user.display_name}'s Structures",
-        color=discord.Color.blue()
+        color=_BLUE
     )
     
-    for structure in structures:
-        structure_type = structure['type'].title()
-        embed.add_field(
-            name=f"{structure_type} at {structure['location']}",
-            value=f"Built: {structure['built_at'][:10]}\nExpires: Next map update",
-            inline=True
-        )
+    for name, value in structure_fields:
+        embed.add_field(name=name, value=value, inline=True)
     
-    await interaction.response.send_message(embed=embed)
+    await interaction.followup.send(embed=embed)
 
 @bot.tree.command(name="form_army", description="Form an army with a general and brigades")
 @app_commands.describe(
     general_id="ID of the general to lead the army",
     brigade_ids="Comma-separated list of brigade IDs (max 8)"
 )
+@deferred
 async def form_army_slash(interaction: discord.Interaction, general_id: str, brigade_ids: str):
     """Form an army with a general and brigades."""
-    player = await db.get_player(interaction.user.id)
+    # Parse brigade IDs before touching stored data
+    brigade_id_list = [bid.strip() for bid in brigade_ids.split(',')]
+    if len(brigade_id_list) > 8:
+        await interaction.followup.send("Armies cannot have more than 8 brigades.")
+        return
+    
+    player, general = await asyncio.gather(
+        db.get_player(interaction.user.id), db.get_general(general_id)
+    )
     if not player:
-        await interaction.response.send_message("You must register first! Use `/register`")
+        await interaction.followup.send("You must register first! Use `/register`")
         return
     
     # Validate general
-    general = await db.get_general(general_id)
     if not general:
-        await interaction.response.send_message("General not found.")
+        await interaction.followup.send("General not found.")
         return
     
     if general['player_id'] != interaction.user.id:
-        await interaction.response.send_message("You don't own this general.")
+        await interaction.followup.send("You don't own this general.")
         return
     
     if general.get('army_id'):
-        await interaction.response.send_message("This general is already leading an army.")
+        await interaction.followup.send("This general is already leading an army.")
         return
     
-    # Parse brigade IDs
-    brigade_id_list = [bid.strip() for bid in brigade_ids.split(',')]
-    if len(brigade_id_list) > 8:
-        await interaction.response.send_message("Armies cannot have more than 8 brigades.")
+    # Validate brigades
+    brigades = await db.get_brigades_by_ids(brigade_id_list)
+    missing = [brigade_id for brigade_id in brigade_id_list if brigade_id not in brigades]
+    if missing:
+        await interaction.followup.send(f"Brigade {missing[0]} not found.")
         return
     
-    # Validate brigades
     valid_brigades = []
     for brigade_id in brigade_id_list:
-        brigade = await db.get_brigade(brigade_id)
-        if not brigade:
-            await interaction.response.send_message(f"Brigade {brigade_id} not found.")
-            return
-        
+        brigade = brigades[brigade_id]
         if brigade['player_id'] != interaction.user.id:
-            await interaction.response.send_message(f"You don't own brigade {brigade_id}.")
+            await interaction.followup.send(f"You don't own brigade {brigade_id}.")
             return
         
         if brigade.get('army_id'):
-            await interaction.response.send_message(f"Brigade {brigade_id} is already in an army.")
+            await interaction.followup.send(f"Brigade {brigade_id} is already in an army.")
             return
         
         valid_brigades.append(brigade)
@@ -936,30 +1097,20 @@ async def form_army_slash(interaction: discord.Interaction, general_id: str, bri
     # Create army
     army_id = await db.create_army(interaction.user.id, general_id, brigade_id_list)
     
-    embed = discord.Embed(
-        title="Army Formed!",
-        description=f"**{general['name']}'s Army** has been formed",
-        color=discord.Color.purple()
-    )
-    
-    embed.add_field(name="Army ID", value=army_id, inline=True)
-    embed.add_field(name="General", value=f"{general['name']} (Level {general['level']})", inline=True)
-    embed.add_field(name="Brigades", value=f"{len(valid_brigades)} brigades", inline=True)
-    
     brigade_list = "\n".join([f"• {b['id']} ({b['type']})" for b in valid_brigades])
-    embed.add_field(name="Brigade Composition", value=brigade_list, inline=False)
-    
-    await interaction.response.send_message(embed=embed)
-
-@bot.tree.command(name="enhancements", description="Show all available brigade enhancements")
-async def enhancements_slash(interaction: discord.Interaction):
-    """Show all available enhancements."""
-    embed = discord.Embed(
-        title="🛠️ Brigade Enhancements",
-        description="Available enhancements for brigades",
-        color=discord.Color.orange()
+    embed = _embed_from_template(
+        _ARMY_FORMED_EMBED_TEMPLATE,
+        f"**{general['name']}'s Army** has been formed",
+        army_id,
+        f"{general['name']} (Level {general['level']})",
+        f"{len(valid_brigades)} brigades",
+        brigade_list
     )
     
+    await interaction.followup.send(embed=embed)
+
+def _build_enhancements_embed() -> discord.Embed:
+    """Build the static enhancements listing embed."""
     # Group by brigade type
     enhancement_groups = {}
     for name, enhancement in ENHANCEMENTS.items():
@@ -973,13 +1124,18 @@ async def enhancements_slash(interaction: discord.Interaction):
         
         enhancement_groups[type_name].append((name, enhancement))
     
+    embed = discord.Embed(
+        title="🛠️ Brigade Enhancements",
+        description="Available enhancements for brigades",
+        color=_ORANGE
+    )
+    
     for group_name, enhancements in enhancement_groups.items():
         enhancement_text = ""
         for name, enhancement in enhancements:
             cost_text = f"{enhancement.cost_silver} silver"
             if enhancement.cost_resources:
-                resources = ", ".join([f"{amount} {resource}" for resource, amount in enhancement.cost_resources.items()])
-                cost_text += f" + {resources}"
+                cost_text += f" + {_ENHANCEMENT_RESOURCE_COSTS[name]}"
             
             enhancement_text += f"**{name}** ({cost_text})\n"
             if enhancement.special_ability:
@@ -988,28 +1144,32 @@ async def enhancements_slash(interaction: discord.Interaction):
         
         embed.add_field(name=group_name, value=enhancement_text, inline=False)
     
-    await interaction.response.send_message(embed=embed)
+    return embed
+
+# Enhancements never change at runtime, so the embed is built once at import
+_ENHANCEMENTS_EMBED = _build_enhancements_embed()
+
+@bot.tree.command(name="enhancements", description="Show all available brigade enhancements")
+async def enhancements_slash(interaction: discord.Interaction):
+    """Show all available enhancements."""
+    await interaction.response.send_message(embed=_ENHANCEMENTS_EMBED)
 
 @bot.tree.command(name="retire_general", description="Retire a level 10 general to increase War College level")
 @app_commands.describe(general_id="ID of the level 10 general to retire")
-async def retire_general_slash(interaction: discord.Interaction, general_id: str):
+@requires_registration
+async def retire_general_slash(interaction: discord.Interaction, general_id: str, player: Dict):
     """Retire a level 10 general."""
-    player = await db.get_player(interaction.user.id)
-    if not player:
-        await interaction.response.send_message("You must register first! Use `/register`")
-        return
-    
     general = await db.get_general(general_id)
     if not general:
-        await interaction.response.send_message("General not found.")
+        await interaction.followup.send("General not found.")
         return
     
     if general['player_id'] != interaction.user.id:
-        await interaction.response.send_message("You don't own this general.")
+        await interaction.followup.send("You don't own this general.")
         return
     
     if general['level'] < 10:
-        await interaction.response.send_message(f"General must be level 10 to retire. Currently level {general['level']}.")
+        await interaction.followup.send(f"General must be level 10 to retire. Currently level {general['level']}.")
         return
     
     # Check current war college level
@@ -1017,95 +1177,74 @@ async def retire_general_slash(interaction: discord.Interaction, general_id: str
     
     if current_war_college >= 10:
         # Max level - give 300 silver instead
-        await db.add_resource(interaction.user.id, 'silver', 300)
+        player_updates, silver_reward = None, 300
         reward_text = "300 silver (War College already at max level)"
     else:
         # Increase war college level
         new_war_college = current_war_college + 1
-        await db.update_player(interaction.user.id, {'war_college_level': new_war_college})
         
         # Update general cap based on new war college level
         new_general_cap = calculate_general_cap(new_war_college)
-        await db.update_player(interaction.user.id, {'general_cap': new_general_cap})
+        player_updates = {
+            'war_college_level': new_war_college,
+            'general_cap': new_general_cap
+        }
+        silver_reward = 0
         
         reward_text = f"War College Level {new_war_college} (General Cap: {new_general_cap})"
     
-    # Remove the general (retirement)
-    await db.update_general(general_id, {'status': 'retired', 'retired_at': datetime.now().isoformat()})
+    # Retire the general and grant the reward in one write
+    if not await db.retire_general(interaction.user.id, general_id, player_updates, silver_reward):
+        await interaction.followup.send("Failed to retire general. Please try again.")
+        return
     
     embed = discord.Embed(
         title="General Retired",
         description=f"**{general['name']}** has retired from service",
-        color=discord.Color.gold()
+        color=_GOLD
     )
     
     embed.add_field(name="Reward", value=reward_text, inline=False)
     embed.add_field(name="Service Record", value=f"Level {general['level']} at retirement", inline=True)
     
-    trait_name, _ = GENERAL_TRAITS[general['trait_id']]
+    trait_name = GENERAL_TRAIT_NAMES[general['trait_id']]
     embed.add_field(name="Final Trait", value=trait_name, inline=True)
     
-    await interaction.response.send_message(embed=embed)
+    await interaction.followup.send(embed=embed)
 
 @bot.tree.command(name="war_college", description="View your War College level and benefits")
-async def war_college_slash(interaction: discord.Interaction):
+@requires_registration
+async def war_college_slash(interaction: discord.Interaction, player: Dict):
     """Show War College information."""
-    player = await db.get_player(interaction.user.id)
-    if not player:
-        await interaction.response.send_message("You must register first! Use `/register`")
-        return
-    
     war_college_level = player.get('war_college_level', 1)
-    
-    embed = discord.Embed(
-        title="🎓 War College",
-        description=f"Level {war_college_level}",
-        color=discord.Color.dark_gold()
-    )
-    
-    # Current benefits
-    benefits = get_war_college_benefits(war_college_level)
-    embed.add_field(name="Current Benefits", value=benefits, inline=False)
-    
-    # Next level benefits
-    if war_college_level < 10:
-        next_benefits = get_war_college_benefits(war_college_level + 1)
-        embed.add_field(name=f"Level {war_college_level + 1} Benefits", value=next_benefits, inline=False)
-        embed.add_field(name="To Advance", value="Retire a Level 10 General or Win a War", inline=False)
-    else:
-        embed.add_field(name="Status", value="Maximum Level Reached!", inline=False)
-    
-    await interaction.response.send_message(embed=embed)
+    embed = _WAR_COLLEGE_EMBEDS.get(war_college_level) or _build_war_college_embed(war_college_level)
+    await interaction.followup.send(embed=embed)
 
 @bot.tree.command(name="siege", description="Start a siege on an enemy city")
 @app_commands.describe(
     city_name="Name of the city to siege",
     brigade_ids="Comma-separated list of brigade IDs to use in siege"
 )
-async def siege_slash(interaction: discord.Interaction, city_name: str, brigade_ids: str):
+@require_phase(GamePhase.BATTLE, "Sieges can only be started")
+@deferred
+@requires_registration
+async def siege_slash(interaction: discord.Interaction, city_name: str, brigade_ids: str, player: Dict):
     """Start a siege on an enemy city."""
-    if war_bot.current_phase != GamePhase.BATTLE:
-        await interaction.response.send_message("Sieges can only be started during Battle phase!")
-        return
-    
-    player = await db.get_player(interaction.user.id)
-    if not player:
-        await interaction.response.send_message("You must register first! Use `/register`")
-        return
-    
     # Parse brigade IDs
     brigade_id_list = [bid.strip() for bid in brigade_ids.split(',')]
     
     # Validate brigades
+    brigades = await db.get_brigades_by_ids(brigade_id_list)
+    missing = [brigade_id for brigade_id in brigade_id_list if brigade_id not in brigades]
+    if missing:
+        await interaction.followup.send(f"Brigade {missing[0]} not found.")
+        return
+    
     valid_brigades = []
     for brigade_id in brigade_id_list:
-        brigade = await db.get_brigade(brigade_id)
-        if not brigade:
-            await interaction.response.send_message(f"Brigade {brigade_id} not found.")
-            return
-        
+        brigade = brigades[brigade_id]
         if brigade['player_id'] != interaction.user.id:
-            await interaction.response.send_message(f"You don't own brigade {brigade_id}.")
+            await interaction.followup.send(f"You don't own brigade {brigade_id}.")
             return
         
         valid_brigades.append(brigade)
@@ -1116,25 +1255,19 @@ async def siege_slash(interaction: discord.Interaction, city_name: str, brigade_
     
     siege_id = await siege_system.start_siege(city_name, city_tier, interaction.user.id, defender_id, brigade_id_list)
     
-    embed = discord.Embed(
-        title="Siege Begun!",
-        description=f"Siege of {city_name} has started",
-        color=discord.Color.dark_red()
-    )
-    
-    embed.add_field(name="Siege ID", value=siege_id, inline=True)
-    embed.add_field(name="City Tier", value=str(city_tier), inline=True)
-    embed.add_field(name="Siege Timer", value=f"{city_tier} action cycles", inline=True)
-    embed.add_field(name="Brigades", value=f"{len(valid_brigades)} brigades", inline=True)
-    
-    embed.add_field(
-        name="Next Steps",
-        value="Wait for siege timer to expire, then use `/assault_city` or continue waiting to starve out the city",
-        inline=False
+    embed = _embed_from_template(
+        _SIEGE_BEGUN_EMBED_TEMPLATE,
+        f"Siege of {city_name} has started",
+        siege_id,
+        str(city_tier),
+        f"{city_tier} action cycles",
+        f"{len(valid_brigades)} brigades",
+        "Wait for siege timer to expire, then use `/assault_city` or continue waiting to starve out the city"
     )
     
-    await interaction.response.send_message(embed=embed)
+    await interaction.followup.send(embed=embed)
 
+@functools.lru_cache(maxsize=None)
 def calculate_general_cap(war_college_level: int) -> int:
     """Calculate general cap based on war college level."""
     if war_college_level >= 10:
@@ -1148,20 +1281,9 @@ def calculate_general_cap(war_college_level: int) -> int:
 
 def calculate_brigade_cap(player: Dict) -> int:
     """Calculate brigade cap based on cities owned."""
-    base_cap = 2
-    cities = player.get('cities', [])
-    
-    for city in cities:
-        tier = city.get('tier', 1)
-        if tier == 1:
-            base_cap += 1
-        elif tier == 2:
-            base_cap += 3
-        elif tier == 3:
-            base_cap += 5
-    
-    return base_cap
+    return brigade_cap_for_tier_counts(player_tier_counts(player))
 
+@functools.lru_cache(maxsize=None)
 def get_war_college_benefits(level: int) -> str:
     """Get description of war college benefits for a level."""
     benefits = []
@@ -1183,42 +1305,69 @@ def get_war_college_benefits(level: int) -> str:
     
     return "\n".join([f"• {benefit}" for benefit in benefits])
 
+def _build_war_college_embed(war_college_level: int) -> discord.Embed:
+    """Build the War College embed for a level: current benefits and what the next level adds."""
+    embed = discord.Embed(
+        title="🎓 War College",
+        description=f"Level {war_college_level}",
+        color=_DARK_GOLD
+    )
+    
+    # Current benefits
+    benefits = get_war_college_benefits(war_college_level)
+    embed.add_field(name="Current Benefits", value=benefits, inline=False)
+    
+    # Next level benefits
+    if war_college_level < 10:
+        next_benefits = get_war_college_benefits(war_college_level + 1)
+        embed.add_field(name=f"Level {war_college_level + 1} Benefits", value=next_benefits, inline=False)
+        embed.add_field(name="To Advance", value="Retire a Level 10 General or Win a War", inline=False)
+    else:
+        embed.add_field(name="Status", value="Maximum Level Reached!", inline=False)
+    
+    return embed
+
+# The embed only depends on the level, so every regular level is built once at import
+_WAR_COLLEGE_EMBEDS = {level: _build_war_college_embed(level) for level in range(1, 11)}
+
 def calculate_army_movement(army_data: Dict, general_data: Optional[Dict] = None) -> int:
     """Calculate army movement speed including general trait bonuses."""
     # Base movement is speed of slowest brigade (would need to implement)
     base_movement = 3  # Placeholder
     
     if general_data:
-        trait_name, _ = GENERAL_TRAITS[general_data['trait_id']]
-        if trait_name == "Relentless":
+        trait_id = general_data['trait_id']
+        if trait_id == TRAIT_ID_BY_NAME["Relentless"]:
             base_movement += 1  # +1 army movement on land
-        elif trait_name == "Mariner":
+        elif trait_id == TRAIT_ID_BY_NAME["Mariner"]:
             # +1 army movement while embarked (would need embarkation system)
             pass
     
     return base_movement
 
 @bot.tree.command(name="list_armies", description="List all your armies")
+@deferred
 async def list_armies_slash(interaction: discord.Interaction):
     """List all player's armies."""
-    player = await db.get_player(interaction.user.id)
+    player, armies = await asyncio.gather(
+        db.get_player(interaction.user.id), db.get_armies(interaction.user.id)
+    )
     if not player:
-        await interaction.response.send_message("You must register first! Use `/register`")
+        await interaction.followup.send("You must register first! Use `/register`")
         return
     
-    armies = await db.get_armies(interaction.user.id)
-    
     if not armies:
-        await interaction.response.send_message("You have no armies. Use `/form_army` to create one.")
+        await interaction.followup.send("You have no armies. Use `/form_army` to create one.")
         return
     
     embed = discord.Embed(
         title=f"{interaction.user.display_name}'s Armies",
-        color=discord.Color.purple()
+        color=_PURPLE
     )
     
-    for army in armies:
-        general = await db.get_general(army['general_id'])
+    generals = await asyncio.gather(*[db.get_general(army['general_id']) for army in armies])
+    
+    for army, general in zip(armies, generals):
         brigade_count = len(army.get('brigade_ids', []))
         
         embed.add_field(
@@ -1227,18 +1376,19 @@ async def list_armies_slash(interaction: discord.Interaction):
             inline=False
         )
     
-    await interaction.response.send_message(embed=embed)
+    await interaction.followup.send(embed=embed)
 
 @bot.tree.command(name="disband_army", description="Disband an army, returning brigades to individual control")
 @app_commands.describe(army_id="ID of the army to disband")
 async def disband_army_slash(interaction: discord.Interaction, army_id: str):
     """Disband an army."""
-    player = await db.get_player(interaction.user.id)
+    player, army = await asyncio.gather(
+        db.get_player(interaction.user.id), db.get_army(army_id)
+    )
     if not player:
         await interaction.response.send_message("You must register first! Use `/register`")
         return
     
-    army = await db.get_army(army_id)
     if not army:
         await interaction.response.send_message("Army not found.")
         return
@@ -1251,8 +1401,7 @@ async def disband_army_slash(interaction: discord.Interaction, army_id: str):
     if army.get('general_id'):
         await db.update_general(army['general_id'], {'army_id': None})
     
-    for brigade_id in army.get('brigade_ids', []):
-        await db.update_brigade(brigade_id, {'army_id': None})
+    await db.update_brigades(army.get('brigade_ids', []), {'army_id': None})
     
     # Delete army
     await db.delete_army(army_id)
@@ -1260,7 +1409,7 @@ async def disband_army_slash(interaction: discord.Interaction, army_id: str):
     embed = discord.Embed(
         title="Army Disbanded",
         description=f"Army {army_id} has been disbanded",
-        color=discord.Color.orange()
+        color=_ORANGE
     )
     
     embed.add_field(name="General", value="Returned to city", inline=True)
@@ -1270,68 +1419,64 @@ async def disband_army_slash(interaction: discord.Interaction, army_id: str):
 
 @bot.tree.command(name="celebrate", description="Celebrate with an army after victory for rally bonus")
 @app_commands.describe(army_id="ID of the army to celebrate")
+@require_phase(GamePhase.MOVEMENT, "Celebrating can only be done")
+@deferred
 async def celebrate_slash(interaction: discord.Interaction, army_id: str):
     """Celebrate with an army."""
-    if war_bot.current_phase != GamePhase.MOVEMENT:
-        await interaction.response.send_message("Celebrating can only be done during Movement phase!")
-        return
-    
-    player = await db.get_player(interaction.user.id)
+    player, army = await asyncio.gather(
+        db.get_player(interaction.user.id), db.get_army(army_id)
+    )
     if not player:
-        await interaction.response.send_message("You must register first! Use `/register`")
+        await interaction.followup.send("You must register first! Use `/register`")
         return
     
-    army = await db.get_army(army_id)
     if not army:
-        await interaction.response.send_message("Army not found.")
+        await interaction.followup.send("Army not found.")
         return
     
     if army['player_id'] != interaction.user.id:
-        await interaction.response.send_message("You don't own this army.")
+        await interaction.followup.send("You don't own this army.")
         return
     
     # Check if army can celebrate (must have won a battle recently)
     if not army.get('can_celebrate', False):
-        await interaction.response.send_message("This army cannot celebrate (must have won a battle in the previous cycle).")
+        await interaction.followup.send("This army cannot celebrate (must have won a battle in the previous cycle).")
         return
     
     # Apply celebration effects
     celebration_bonus = 1
     general = await db.get_general(army['general_id']) if army.get('general_id') else None
     
-    if general:
-        trait_name, _ = GENERAL_TRAITS[general['trait_id']]
-        if trait_name == "Inspiring":
-            celebration_bonus = 2
+    if general and general['trait_id'] == TRAIT_ID_BY_NAME["Inspiring"]:
+        celebration_bonus = 2
     
-    # Mark brigades as celebrated (would need to track this)
-    for brigade_id in army.get('brigade_ids', []):
-        await db.update_brigade(brigade_id, {
+    # Mark brigades as celebrated and remove the army's ability to celebrate again;
+    # the two writes touch different files, so they run concurrently
+    await asyncio.gather(
+        db.update_brigades(army.get('brigade_ids', []), {
             'is_fatigued': True,
             'celebration_bonus': celebration_bonus
-        })
-    
-    # Remove ability to celebrate again
-    await db.update_army(army_id, {'can_celebrate': False})
+        }),
+        db.update_army(army_id, {'can_celebrate': False})
+    )
     
     embed = discord.Embed(
         title="Army Celebrates!",
         description=f"Army {army_id} celebrates their recent victory",
-        color=discord.Color.gold()
+        color=_GOLD
     )
     
     embed.add_field(name="Rally Bonus", value=f"+{celebration_bonus} rally in next battle", inline=True)
     embed.add_field(name="Status", value="All brigades are now fatigued", inline=True)
     
-    await interaction.response.send_message(embed=embed)
+    await interaction.followup.send(embed=embed)
 
-@bot.tree.command(name="general_traits", description="Show all general traits and their effects")
-async def general_traits_slash(interaction: discord.Interaction):
-    """Show detailed information about all general traits."""
+def _build_general_traits_embed() -> discord.Embed:
+    """Build the static general traits reference embed."""
     embed = discord.Embed(
         title="🎖️ General Traits",
         description="All possible traits and their effects",
-        color=discord.Color.gold()
+        color=_GOLD
     )
     
     # Group traits for better display
@@ -1343,11 +1488,7 @@ async def general_traits_slash(interaction: discord.Interaction):
     }
     
     for group_name, trait_ids in trait_groups.items():
-        trait_text = ""
-        for trait_id in trait_ids:
-            trait_name, trait_desc = GENERAL_TRAITS[trait_id]
-            trait_text += f"**{trait_name}**: {trait_desc}\n"
-        
+        trait_text = "\n".join(_TRAIT_LINES[trait_id] for trait_id in trait_ids)
         embed.add_field(name=group_name, value=trait_text, inline=False)
     
     embed.add_field(
@@ -1356,33 +1497,38 @@ async def general_traits_slash(interaction: discord.Interaction):
         inline=False
     )
     
-    await interaction.response.send_message(embed=embed)
+    return embed
+
+# Trait descriptions never change at runtime, so the embed is built once at import
+_GENERAL_TRAITS_EMBED = _build_general_traits_embed()
+
+@bot.tree.command(name="general_traits", description="Show all general traits and their effects")
+async def general_traits_slash(interaction: discord.Interaction):
+    """Show detailed information about all general traits."""
+    await interaction.response.send_message(embed=_GENERAL_TRAITS_EMBED)
 
 @bot.tree.command(name="reroll_trait", description="Reroll a general's trait (costs 3 gems)")
 @app_commands.describe(general_id="ID of the general whose trait to reroll")
-async def reroll_trait_slash(interaction: discord.Interaction, general_id: str):
+@deferred
+@requires_registration
+async def reroll_trait_slash(interaction: discord.Interaction, general_id: str, player: Dict):
     """Reroll a general's trait for 3 gems."""
-    player = await db.get_player(interaction.user.id)
-    if not player:
-        await interaction.response.send_message("You must register first! Use `/register`")
-        return
-    
     general = await db.get_general(general_id)
     if not general:
-        await interaction.response.send_message("General not found.")
+        await interaction.followup.send("General not found.")
         return
     
     if general['player_id'] != interaction.user.id:
-        await interaction.response.send_message("You don't own this general.")
+        await interaction.followup.send("You don't own this general.")
         return
     
     # Check gem cost
     if player.get('resources', {}).get('gems', 0) < 3:
-        await interaction.response.send_message("Insufficient gems! Need 3 gems to reroll trait.")
+        await interaction.followup.send("Insufficient gems! Need 3 gems to reroll trait.")
         return
     
     # Get old trait info
-    old_trait_name, _ = GENERAL_TRAITS[general['trait_id']]
+    old_trait_name = GENERAL_TRAIT_NAMES[general['trait_id']]
     old_level = general['level']
     
     # Check if losing Prodigious levels
@@ -1397,13 +1543,12 @@ async def reroll_trait_slash(interaction: discord.Interaction, general_id: str):
     war_college_level = player.get('war_college_level', 1)
     
     if war_college_level >= 2:
-        trait_id_1 = war_bot.roll_general_trait()
-        trait_id_2 = war_bot.roll_general_trait()
+        trait_id_1, trait_id_2 = war_bot.roll_general_traits(2)
         trait_id = random.choice([trait_id_1, trait_id_2])  # Simplified choice
     else:
         trait_id = war_bot.roll_general_trait()
     
-    new_trait_name, new_trait_desc = GENERAL_TRAITS[trait_id]
+    new_trait_name, new_trait_desc = GENERAL_TRAITS_TUPLE[trait_id]
     
     # Apply level adjustments
     new_level = max(1, old_level + level_adjustment)
@@ -1420,7 +1565,7 @@ async def reroll_trait_slash(interaction: discord.Interaction, general_id: str):
     embed = discord.Embed(
         title="General Trait Rerolled",
         description=f"**{general['name']}** has a new trait!",
-        color=discord.Color.purple()
+        color=_PURPLE
     )
     
     embed.add_field(name="Old Trait", value=old_trait_name, inline=True)
@@ -1431,7 +1576,7 @@ async def reroll_trait_slash(interaction: discord.Interaction, general_id: str):
     if level_adjustment != 0:
         embed.add_field(name="Level Change", value=f"{old_level} → {new_level}", inline=True)
     
-    await interaction.response.send_message(embed=embed)
+    await interaction.followup.send(embed=embed)
 
 @bot.tree.command(name="add_resources", description="Add resources to a player (Admin)")
 @app_commands.describe(
@@ -1453,42 +1598,24 @@ async def add_resources_slash(interaction: discord.Interaction, player: discord.
         return
     
     # Add resources
-    resources_to_add = {}
-    if gold > 0:
-        resources_to_add['gold'] = gold
-    if gems > 0:
-        resources_to_add['gems'] = gems
-    if population > 0:
-        resources_to_add['population'] = population
-    
-    if resources_to_add:
-        await db.add_resources(player.id, resources_to_add)
-    
-    # Get updated player data
-    updated_player = await db.get_player(player.id)
-    if updated_player:
-        current_resources = updated_player.get('resources', {})
-    else:
-        current_resources = {}
+    resources_to_add = {
+        resource: amount for resource, amount in zip(RESOURCE_KEYS, (gold, gems, population)) if amount > 0
+    }
+    
+    # The write returns the updated player, so no re-read is needed
+    updated_player = await db.add_resources(player.id, resources_to_add) if resources_to_add else target_player
+    current_resources = updated_player.get('resources', {}) if updated_player else {}
     
     embed = discord.Embed(
         title="Resources Added",
         description=f"Resources added to {player.display_name}",
-        color=discord.Color.green()
+        color=_GREEN
     )
     
-    if gold > 0:
-        embed.add_field(name="Gold Added", value=f"+{gold}", inline=True)
-    if gems > 0:
-        embed.add_field(name="Gems Added", value=f"+{gems}", inline=True)
-    if population > 0:
-        embed.add_field(name="Population Added", value=f"+{population}", inline=True)
+    for resource, amount in resources_to_add.items():
+        embed.add_field(name=f"{resource.title()} Added", value=f"+{amount}", inline=True)
     
-    embed.add_field(
-        name="Current Resources",
-        value=f"Gold: {current_resources.get('gold', 0)}\nGems: {current_resources.get('gems', 0)}\nPopulation: {current_resources.get('population', 0)}",
-        inline=False
-    )
+    embed.add_field(name="Current Resources", value=_format_resources(current_resources), inline=False)
     
     await interaction.response.send_message(embed=embed)
 
@@ -1507,31 +1634,20 @@ async def set_resources_slash(interaction: discord.Interaction, player: discord.
         return
     
     current_resources = target_player.get('resources', {})
-    new_resources = current_resources.copy()
-    
-    changes = []
-    if gold is not None:
-        old_gold = current_resources.get('gold', 0)
-        new_resources['gold'] = gold
-        changes.append(f"Gold: {old_gold} → {gold}")
-    
-    if gems is not None:
-        old_gems = current_resources.get('gems', 0)
-        new_resources['gems'] = gems
-        changes.append(f"Gems: {old_gems} → {gems}")
-    
-    if population is not None:
-        old_pop = current_resources.get('population', 0)
-        new_resources['population'] = population
-        changes.append(f"Population: {old_pop} → {population}")
+    updates = {
+        resource: amount for resource, amount in zip(RESOURCE_KEYS, (gold, gems, population)) if amount is not None
+    }
+    changes = [f"{resource.title()}: {current_resources.get(resource, 0)} → {amount}" for resource, amount in updates.items()]
     
-    if changes:
+    # Only build a new resources dict (and write it) when something actually changes
+    new_resources = {**current_resources, **updates} if updates else current_resources
+    if updates:
         await db.update_player(player.id, {'resources': new_resources})
     
     embed = discord.Embed(
         title="Resources Set",
         description=f"Resources updated for {player.display_name}",
-        color=discord.Color.blue()
+        color=_BLUE
     )
     
     if changes:
@@ -1539,11 +1655,7 @@ async def set_resources_slash(interaction: discord.Interaction, player: discord.
     else:
         embed.add_field(name="Status", value="No changes made", inline=False)
     
-    embed.add_field(
-        name="Current Resources",
-        value=f"Gold: {new_resources.get('gold', 0)}\nGems: {new_resources.get('gems', 0)}\nPopulation: {new_resources.get('population', 0)}",
-        inline=False
-    )
+    embed.add_field(name="Current Resources", value=_format_resources(new_resources), inline=False)
     
     await interaction.response.send_message(embed=embed)
 
@@ -1560,11 +1672,6 @@ async def add_city_slash(interaction: discord.Interaction, player: discord.Membe
         await interaction.response.send_message("City tier must be between 1 and 3.")
         return
     
-    target_player = await db.get_player(player.id)
-    if not target_player:
-        await interaction.response.send_message(f"{player.display_name} is not registered.")
-        return
-    
     # Create city data
     city_data = {
         'name': city_name,
@@ -1576,39 +1683,26 @@ async def add_city_slash(interaction: discord.Interaction, player: discord.Membe
         'structures': []
     }
     
-    # Add city to player's cities list
-    current_cities = target_player.get('cities', [])
-    current_cities.append(city_data)
-    
-    # Update brigade cap based on new city
-    new_brigade_cap = calculate_brigade_cap({'cities': current_cities})
+    # Add city to player's cities list and update the brigade cap in one write
+    target_player = await db.add_city(player.id, city_data)
+    if not target_player:
+        await interaction.response.send_message(f"{player.display_name} is not registered.")
+        return
     
-    await db.update_player(player.id, {
-        'cities': current_cities,
-        'brigade_cap': new_brigade_cap
-    })
+    current_cities = target_player['cities']
+    new_brigade_cap = target_player['brigade_cap']
     
-    embed = discord.Embed(
-        title="City Added",
-        description=f"New city granted to {player.display_name}",
-        color=discord.Color.green()
+    embed = _embed_from_template(
+        _CITY_ADDED_EMBED_TEMPLATE,
+        f"New city granted to {player.display_name}",
+        city_name,
+        f"Tier {tier}",
+        location,
+        _CITY_TIER_BENEFITS[tier],
+        str(new_brigade_cap),
+        str(len(current_cities))
     )
     
-    embed.add_field(name="City Name", value=city_name, inline=True)
-    embed.add_field(name="Tier", value=f"Tier {tier}", inline=True)
-    embed.add_field(name="Location", value=location, inline=True)
-    
-    # Calculate tier benefits
-    tier_benefits = {
-        1: "+1 brigade cap",
-        2: "+3 brigade cap",
-        3: "+5 brigade cap"
-    }
-    
-    embed.add_field(name="Benefits", value=tier_benefits[tier], inline=True)
-    embed.add_field(name="New Brigade Cap", value=str(new_brigade_cap), inline=True)
-    embed.add_field(name="Total Cities", value=str(len(current_cities)), inline=True)
-    
     await interaction.response.send_message(embed=embed)
 
 @bot.tree.command(name="remove_city", description="Remove a city from a player (Admin)")
@@ -1618,36 +1712,23 @@ async def add_city_slash(interaction: discord.Interaction, player: discord.Membe
 )
 async def remove_city_slash(interaction: discord.Interaction, player: discord.Member, city_name: str):
     """Remove a city from a player."""
-    target_player = await db.get_player(player.id)
+    # Remove the city and update the brigade cap in one write
+    target_player, city_to_remove = await db.remove_city(player.id, city_name)
     if not target_player:
         await interaction.response.send_message(f"{player.display_name} is not registered.")
         return
     
-    current_cities = target_player.get('cities', [])
-    city_to_remove = None
-    
-    # Find the city
-    for i, city in enumerate(current_cities):
-        if city['name'].lower() == city_name.lower():
-            city_to_remove = current_cities.pop(i)
-            break
-    
     if not city_to_remove:
         await interaction.response.send_message(f"City '{city_name}' not found for {player.display_name}.")
         return
     
-    # Update brigade cap
-    new_brigade_cap = calculate_brigade_cap({'cities': current_cities})
-    
-    await db.update_player(player.id, {
-        'cities': current_cities,
-        'brigade_cap': new_brigade_cap
-    })
+    current_cities = target_player['cities']
+    new_brigade_cap = target_player['brigade_cap']
     
     embed = discord.Embed(
         title="City Removed",
         description=f"City removed from {player.display_name}",
-        color=discord.Color.red()
+        color=_RED
     )
     
     embed.add_field(name="City Name", value=city_to_remove['name'], inline=True)
@@ -1678,48 +1759,47 @@ async def list_cities_slash(interaction: discord.Interaction, player: Optional[d
         await interaction.response.send_message(f"{target_name} owns no cities.")
         return
     
-    embed = discord.Embed(
-        title=f"{target_name}'s Cities",
-        description=f"Total cities: {len(cities)}",
-        color=discord.Color.blue()
-    )
+    tier_counts = player_tier_counts(target_player_data)
+    total_brigade_bonus = brigade_cap_for_tier_counts(tier_counts) - BASE_BRIGADE_CAP
     
-    tier_counts = {1: 0, 2: 0, 3: 0}
-    total_brigade_bonus = 0
+    # Split cities across embeds so no embed exceeds Discord's field limit
+    pages = [cities[i:i + _CITIES_PER_PAGE] for i in range(0, len(cities), _CITIES_PER_PAGE)]
+    embeds = []
     
-    for city in cities:
-        tier = city.get('tier', 1)
-        tier_counts[tier] += 1
-        
-        if tier == 1:
-            total_brigade_bonus += 1
-        elif tier == 2:
-            total_brigade_bonus += 3
-        elif tier == 3:
-            total_brigade_bonus += 5
+    for page_number, page in enumerate(pages, start=1):
+        embed = discord.Embed(
+            title=f"{target_name}'s Cities",
+            description=f"Total cities: {len(cities)}",
+            color=_BLUE
+        )
+        if len(pages) > 1:
+            embed.set_footer(text=f"Page {page_number}/{len(pages)}")
         
-        siege_status = " 🏴 (Under Siege)" if city.get('under_siege', False) else ""
-        garrison_count = len(city.get('garrison', []))
+        for city in page:
+            siege_status = " 🏴 (Under Siege)" if city.get('under_siege', False) else ""
+            garrison_count = len(city.get('garrison', []))
+            
+            embed.add_field(
+                name=f"{city['name']} (Tier {city.get('tier', 1)}){siege_status}",
+                value=f"Location: {city.get('location', 'Unknown')}\nGarrison: {garrison_count} brigades",
+                inline=True
+            )
         
-        embed.add_field(
-            name=f"{city['name']} (Tier {tier}){siege_status}",
-            value=f"Location: {city.get('location', 'Unknown')}\nGarrison: {garrison_count} brigades",
-            inline=True
-        )
+        embeds.append(embed)
     
-    embed.add_field(
+    embeds[-1].add_field(
         name="Summary",
-        value=f"Tier 1: {tier_counts[1]} cities\nTier 2: {tier_counts[2]} cities\nTier 3: {tier_counts[3]} cities",
+        value=f"Tier 1: {tier_counts.get('1', 0)} cities\nTier 2: {tier_counts.get('2', 0)} cities\nTier 3: {tier_counts.get('3', 0)} cities",
         inline=True
     )
     
-    embed.add_field(
+    embeds[-1].add_field(
         name="Brigade Cap Bonus",
-        value=f"+{total_brigade_bonus} from cities\nTotal Cap: {calculate_brigade_cap(target_player_data)}",
+        value=f"+{total_brigade_bonus} from cities\nTotal Cap: {BASE_BRIGADE_CAP + total_brigade_bonus}",
         inline=True
     )
     
-    await interaction.response.send_message(embed=embed)
+    await _send_embeds(interaction, embeds)
 
 @bot.tree.command(name="upgrade_city", description="Upgrade a city's tier (Admin)")
 @app_commands.describe(
@@ -1733,59 +1813,35 @@ async def upgrade_city_slash(interaction: discord.Interaction, player: discord.M
         await interaction.response.send_message("City tier must be between 1 and 3.")
         return
     
-    target_player = await db.get_player(player.id)
+    # Change the city's tier and update the brigade cap in one write
+    target_player, old_tier = await db.set_city_tier(player.id, city_name, new_tier)
     if not target_player:
         await interaction.response.send_message(f"{player.display_name} is not registered.")
         return
     
-    current_cities = target_player.get('cities', [])
-    city_found = False
-    old_tier = 0
-    
-    # Find and update the city
-    for city in current_cities:
-        if city['name'].lower() == city_name.lower():
-            old_tier = city['tier']
-            city['tier'] = new_tier
-            city_found = True
-            break
-    
-    if not city_found:
+    if old_tier is None:
         await interaction.response.send_message(f"City '{city_name}' not found for {player.display_name}.")
         return
     
-    # Update brigade cap
-    new_brigade_cap = calculate_brigade_cap({'cities': current_cities})
-    
-    await db.update_player(player.id, {
-        'cities': current_cities,
-        'brigade_cap': new_brigade_cap
-    })
+    new_brigade_cap = target_player['brigade_cap']
     
     embed = discord.Embed(
         title="City Upgraded",
         description=f"City tier changed for {player.display_name}",
-        color=discord.Color.gold()
+        color=_GOLD
     )
     
     embed.add_field(name="City Name", value=city_name, inline=True)
     embed.add_field(name="Tier Change", value=f"{old_tier} → {new_tier}", inline=True)
     embed.add_field(name="New Brigade Cap", value=str(new_brigade_cap), inline=True)
     
-    # Show tier benefits
-    tier_benefits = {
-        1: "+1 brigade cap",
-        2: "+3 brigade cap",
-        3: "+5 brigade cap"
-    }
-    
-    embed.add_field(name="New Benefits", value=tier_benefits[new_tier], inline=True)
+    embed.add_field(name="New Benefits", value=_CITY_TIER_BENEFITS[new_tier], inline=True)
     
     if new_tier > old_tier:
-        embed.color = discord.Color.green()
+        embed.color = _GREEN
         embed.add_field(name="Status", value="Upgraded! 📈", inline=True)
     elif new_tier < old_tier:
-        embed.color = discord.Color.orange()
+        embed.color = _ORANGE
         embed.add_field(name="Status", value="Downgraded 📉", inline=True)
     else:
         embed.add_field(name="Status", value="No change", inline=True)
@@ -1799,117 +1855,75 @@ async def upgrade_city_slash(interaction: discord.Interaction, player: discord.M
     gems="Amount of gems to transfer",
     population="Amount of population to transfer"
 )
+@deferred
 async def transfer_resources_slash(interaction: discord.Interaction, recipient: discord.Member, gold: int = 0, gems: int = 0, population: int = 0):
     """Transfer resources to another player."""
     if recipient.id == interaction.user.id:
-        await interaction.response.send_message("You cannot transfer resources to yourself.")
+        await interaction.followup.send("You cannot transfer resources to yourself.")
         return
     
-    if gold <= 0 and gems <= 0 and population <= 0:
-        await interaction.response.send_message("You must transfer at least some resources.")
+    amounts = {resource: amount for resource, amount in zip(RESOURCE_KEYS, (gold, gems, population)) if amount > 0}
+    if not amounts:
+        await interaction.followup.send("You must transfer at least some resources.")
         return
     
-    sender = await db.get_player(interaction.user.id)
+    sender, recipient_data = await asyncio.gather(
+        db.get_player(interaction.user.id), db.get_player(recipient.id)
+    )
     if not sender:
-        await interaction.response.send_message("You must register first! Use `/register`")
+        await interaction.followup.send("You must register first! Use `/register`")
         return
     
-    recipient_data = await db.get_player(recipient.id)
     if not recipient_data:
-        await interaction.response.send_message(f"{recipient.display_name} is not registered.")
+        await interaction.followup.send(f"{recipient.display_name} is not registered.")
         return
     
     sender_resources = sender.get('resources', {})
     
     # Check if sender has enough resources
-    if gold > sender_resources.get('gold', 0):
-        await interaction.response.send_message(f"Insufficient gold! You have {sender_resources.get('gold', 0)}, need {gold}.")
-        return
-    if gems > sender_resources.get('gems', 0):
-        await interaction.response.send_message(f"Insufficient gems! You have {sender_resources.get('gems', 0)}, need {gems}.")
-        return
-    if population > sender_resources.get('population', 0):
-        await interaction.response.send_message(f"Insufficient population! You have {sender_resources.get('population', 0)}, need {population}.")
-        return
-    
-    # Perform transfer
-    resources_to_deduct = {}
-    resources_to_add = {}
-    
-    if gold > 0:
-        resources_to_deduct['gold'] = gold
-        resources_to_add['gold'] = gold
-    if gems > 0:
-        resources_to_deduct['gems'] = gems
-        resources_to_add['gems'] = gems
-    if population > 0:
-        resources_to_deduct['population'] = population
-        resources_to_add['population'] = population
+    for resource, amount in amounts.items():
+        available = sender_resources.get(resource, 0)
+        if amount > available:
+            await interaction.followup.send(f"Insufficient {resource}! You have {available}, need {amount}.")
+            return
     
-    await db.deduct_resources(interaction.user.id, resources_to_deduct)
-    await db.add_resources(recipient.id, resources_to_add)
+    # Deduct from the sender and credit the recipient in one write, so neither side can be lost
+    updated_sender = await db.transfer_resources(interaction.user.id, recipient.id, amounts)
+    if not updated_sender:
+        await interaction.followup.send("Transfer failed. Please check your resources and try again.")
+        return
     
-    embed = discord.Embed(
-        title="Resources Transferred",
-        description=f"{interaction.user.display_name} → {recipient.display_name}",
-        color=discord.Color.green()
+    # Show remaining resources for sender, straight from the record the transfer wrote
+    embed = _embed_from_template(
+        _RESOURCES_TRANSFERRED_EMBED_TEMPLATE,
+        f"{interaction.user.display_name} → {recipient.display_name}",
+        "\n".join(f"{resource.title()}: {amount}" for resource, amount in amounts.items()),
+        _format_resources(updated_sender['resources'])
     )
     
-    transfer_text = []
-    if gold > 0:
-        transfer_text.append(f"Gold: {gold}")
-    if gems > 0:
-        transfer_text.append(f"Gems: {gems}")
-    if population > 0:
-        transfer_text.append(f"Population: {population}")
-    
-    embed.add_field(name="Transferred", value="\n".join(transfer_text), inline=False)
-    
-    # Show remaining resources for sender
-    updated_sender = await db.get_player(interaction.user.id)
-    if updated_sender:
-        sender_resources = updated_sender.get('resources', {})
-        embed.add_field(
-            name="Your Remaining Resources",
-            value=f"Gold: {sender_resources.get('gold', 0)}\nGems: {sender_resources.get('gems', 0)}\nPopulation: {sender_resources.get('population', 0)}",
-            inline=True
-        )
-    
-    await interaction.response.send_message(embed=embed)
+    await interaction.followup.send(embed=embed)
 
 @bot.tree.command(name="view_resources", description="View detailed resource information")
 @app_commands.describe(player="Player to view resources for (optional, defaults to yourself)")
+@deferred
 async def view_resources_slash(interaction: discord.Interaction, player: Optional[discord.Member] = None):
     """View detailed resource information for a player."""
     target_player_id = player.id if player else interaction.user.id
-    target_player_data = await db.get_player(target_player_id)
+    target_player_data, brigades, generals = await asyncio.gather(
+        db.get_player(target_player_id),
+        db.get_brigades(target_player_id),
+        db.get_generals(target_player_id)
+    )
     
     if not target_player_data:
         target_name = player.display_name if player else "You"
-        await interaction.response.send_message(f"{target_name} must register first! Use `/register`")
+        await interaction.followup.send(f"{target_name} must register first! Use `/register`")
         return
     
     target_name = player.display_name if player else interaction.user.display_name
     resources = target_player_data.get('resources', {})
     
-    embed = discord.Embed(
-        title=f"{target_name}'s Resources",
-        color=discord.Color.gold()
-    )
-    
-    # Current resources
-    gold = resources.get('gold', 0)
-    gems = resources.get('gems', 0)
-    population = resources.get('population', 0)
-    
-    embed.add_field(name="💰 Gold", value=str(gold), inline=True)
-    embed.add_field(name="💎 Gems", value=str(gems), inline=True)
-    embed.add_field(name="👥 Population", value=str(population), inline=True)
-    
-    # Calculate income/expenses
     cities = target_player_data.get('cities', [])
-    brigades = await db.get_brigades(target_player_id)
-    generals = await db.get_generals(target_player_id)
     
     # Income calculation
     city_income = len(cities) * 5  # Base city income
@@ -1922,55 +1936,35 @@ async def view_resources_slash(interaction: discord.Interaction, player: Optiona
     
     net_income = total_income - total_expenses
     
-    embed.add_field(
-        name="💹 Income (per turn)",
-        value=f"Cities: +{city_income} gold\nTotal: +{total_income} gold",
-        inline=True
-    )
-    
-    embed.add_field(
-        name="💸 Expenses (per turn)",
-        value=f"Brigades: -{brigade_upkeep} gold\nGenerals: -{general_upkeep} gold\nTotal: -{total_expenses} gold",
-        inline=True
-    )
-    
-    embed.add_field(
-        name="📊 Net Income",
-        value=f"{'+'if net_income >= 0 else ''}{net_income} gold per turn",
-        inline=True
-    )
-    
     # Resource capacity/limits
     brigade_cap = calculate_brigade_cap(target_player_data)
     general_cap = calculate_general_cap(target_player_data.get('war_college_level', 1))
     
-    embed.add_field(
-        name="📋 Capacity",
-        value=f"Brigades: {len(brigades)}/{brigade_cap}\nGenerals: {len(generals)}/{general_cap}",
-        inline=True
+    embed = _embed_from_template(
+        _RESOURCES_EMBED_TEMPLATE,
+        None,
+        str(resources.get('gold', 0)),
+        str(resources.get('gems', 0)),
+        str(resources.get('population', 0)),
+        f"Cities: +{city_income} gold\nTotal: +{total_income} gold",
+        f"Brigades: -{brigade_upkeep} gold\nGenerals: -{general_upkeep} gold\nTotal: -{total_expenses} gold",
+        f"{'+'if net_income >= 0 else ''}{net_income} gold per turn",
+        f"Brigades: {len(brigades)}/{brigade_cap}\nGenerals: {len(generals)}/{general_cap}",
+        title=f"{target_name}'s Resources"
     )
     
-    await interaction.response.send_message(embed=embed)
+    await interaction.followup.send(embed=embed)
 
 @bot.tree.command(name="update_brigade_cap", description="Recalculate brigade cap based on cities (Admin)")
 async def update_brigade_cap_slash(interaction: discord.Interaction):
     """Update brigade cap calculation for all players."""
     # This would be an admin command in a real implementation
-    players = await db.get_all_players()
-    updated_count = 0
-    
-    for player_id, player_data in players.items():
-        new_brigade_cap = calculate_brigade_cap(player_data)
-        old_brigade_cap = player_data.get('brigade_cap', 2)
-        
-        if new_brigade_cap != old_brigade_cap:
-            await db.update_player(int(player_id), {'brigade_cap': new_brigade_cap})
-            updated_count += 1
+    updated_count = await db.recalculate_brigade_caps()
     
     embed = discord.Embed(
         title="Brigade Caps Updated",
         description=f"Updated {updated_count} players' brigade caps",
-        color=discord.Color.green()
+        color=_GREEN
     )
     
     await interaction.response.send_message(embed=embed)
@@ -1981,46 +1975,39 @@ async def update_brigade_cap_slash(interaction: discord.Interaction):
     city_name="Name of the city to siege",
     target_player="Player who owns the city"
 )
+@require_phase(GamePhase.MOVEMENT, "Sieges can only be initiated")
+@deferred
 async def siege_city_slash(interaction: discord.Interaction, army_id: str, city_name: str, target_player: discord.Member):
     """Lay siege to an enemy city."""
-    if war_bot.current_phase != GamePhase.MOVEMENT:
-        await interaction.response.send_message("Sieges can only be initiated during Movement phase!")
-        return
-    
-    player = await db.get_player(interaction.user.id)
+    player, army, target_data = await asyncio.gather(
+        db.get_player(interaction.user.id), db.get_army(army_id), db.get_player(target_player.id)
+    )
     if not player:
-        await interaction.response.send_message("You must register first! Use `/register`")
+        await interaction.followup.send("You must register first! Use `/register`")
         return
     
-    army = await db.get_army(army_id)
     if not army:
-        await interaction.response.send_message("Army not found.")
+        await interaction.followup.send("Army not found.")
         return
     
     if army['player_id'] != interaction.user.id:
-        await interaction.response.send_message("You don't own this army.")
+        await interaction.followup.send("You don't own this army.")
         return
     
-    target_data = await db.get_player(target_player.id)
     if not target_data:
-        await interaction.response.send_message(f"{target_player.display_name} is not registered.")
+        await interaction.followup.send(f"{target_player.display_name} is not registered.")
         return
     
     # Find the target city
     target_cities = target_data.get('cities', [])
-    target_city = None
-    
-    for city in target_cities:
-        if city['name'].lower() == city_name.lower():
-            target_city = city
-            break
+    _, target_city = find_city(target_cities, city_name)
     
     if not target_city:
-        await interaction.response.send_message(f"City '{city_name}' not found for {target_player.display_name}.")
+        await interaction.followup.send(f"City '{city_name}' not found for {target_player.display_name}.")
         return
     
     if target_city.get('under_siege', False):
-        await interaction.response.send_message(f"City '{city_name}' is already under siege!")
+        await interaction.followup.send(f"City '{city_name}' is already under siege!")
         return
     
     # Start siege using siege system
@@ -2037,15 +2024,17 @@ async def siege_city_slash(interaction: discord.Interaction, army_id: str, city_
     )
     
     if siege_id:
-        # Mark city as under siege
-        target_city['under_siege'] = True
-        target_city['besieging_army'] = army_id
-        await db.update_player(target_player.id, {'cities': target_cities})
+        # Mark city as under siege; only this city is written, so concurrent city changes are kept
+        _, besieged_city = await db.update_city(
+            target_player.id, target_city['name'], {'under_siege': True, 'besieging_army': army_id}
+        )
+        if besieged_city is not None:
+            target_city = besieged_city
         
         embed = discord.Embed(
             title="Siege Begun!",
             description=f"Army {army_id} has laid siege to {city_name}",
-            color=discord.Color.red()
+            color=_RED
         )
         
         embed.add_field(name="Target City", value=f"{city_name} (Tier {target_city['tier']})", inline=True)
@@ -2055,75 +2044,65 @@ async def siege_city_slash(interaction: discord.Interaction, army_id: str, city_
         garrison_count = len(target_city.get('garrison', []))
         embed.add_field(name="Garrison", value=f"{garrison_count} brigades", inline=True)
         
-        await interaction.response.send_message(embed=embed)
+        await interaction.followup.send(embed=embed)
     else:
-        await interaction.response.send_message("Failed to start siege.")
+        await interaction.followup.send("Failed to start siege.")
 
 @bot.tree.command(name="garrison_city", description="Move brigades to garrison a city")
 @app_commands.describe(
     city_name="Name of your city to garrison",
     brigade_ids="Comma-separated list of brigade IDs to garrison"
 )
-async def garrison_city_slash(interaction: discord.Interaction, city_name: str, brigade_ids: str):
+@deferred
+@requires_registration
+async def garrison_city_slash(interaction: discord.Interaction, city_name: str, brigade_ids: str, player: Dict):
     """Move brigades to garrison a city."""
-    player = await db.get_player(interaction.user.id)
-    if not player:
-        await interaction.response.send_message("You must register first! Use `/register`")
-        return
-    
     # Find the city
     cities = player.get('cities', [])
-    target_city = None
-    city_index = -1
-    
-    for i, city in enumerate(cities):
-        if city['name'].lower() == city_name.lower():
-            target_city = city
-            city_index = i
-            break
+    _, target_city = find_city(cities, city_name)
     
     if not target_city:
-        await interaction.response.send_message(f"You don't own a city named '{city_name}'.")
+        await interaction.followup.send(f"You don't own a city named '{city_name}'.")
         return
     
     # Parse brigade IDs
     try:
         brigade_id_list = [bid.strip() for bid in brigade_ids.split(',')]
     except:
-        await interaction.response.send_message("Invalid brigade ID format. Use comma-separated IDs.")
+        await interaction.followup.send("Invalid brigade ID format. Use comma-separated IDs.")
         return
     
     # Validate brigades
+    brigades = await db.get_brigades_by_ids(brigade_id_list)
     valid_brigades = []
     for brigade_id in brigade_id_list:
-        brigade = await db.get_brigade(brigade_id)
+        brigade = brigades.get(brigade_id)
         if not brigade:
-            await interaction.response.send_message(f"Brigade {brigade_id} not found.")
+            await interaction.followup.send(f"Brigade {brigade_id} not found.")
             return
         if brigade['player_id'] != interaction.user.id:
-            await interaction.response.send_message(f"You don't own brigade {brigade_id}.")
+            await interaction.followup.send(f"You don't own brigade {brigade_id}.")
             return
         if brigade.get('army_id'):
-            await interaction.response.send_message(f"Brigade {brigade_id} is already in an army.")
+            await interaction.followup.send(f"Brigade {brigade_id} is already in an army.")
             return
         valid_brigades.append(brigade)
     
-    # Add brigades to garrison
-    current_garrison = target_city.get('garrison', [])
+    # Add the brigades to the city's current garrison, then mark them as garrisoning
+    valid_ids = [brigade['id'] for brigade in valid_brigades]
+    _, garrisoned_city = await db.add_city_garrison(interaction.user.id, city_name, valid_ids)
     
-    for brigade in valid_brigades:
-        current_garrison.append(brigade['id'])
-        # Update brigade to show it's garrisoning
-        await db.update_brigade(brigade['id'], {'garrison_city': city_name})
+    if garrisoned_city is None:
+        await interaction.followup.send(f"You don't own a city named '{city_name}'.")
+        return
     
-    # Update city
-    cities[city_index]['garrison'] = current_garrison
-    await db.update_player(interaction.user.id, {'cities': cities})
+    await db.update_brigades(valid_ids, {'garrison_city': city_name})
+    current_garrison = garrisoned_city['garrison']
     
     embed = discord.Embed(
         title="City Garrisoned",
         description=f"Brigades added to {city_name} garrison",
-        color=discord.Color.blue()
+        color=_BLUE
     )
     
     embed.add_field(name="City", value=f"{city_name} (Tier {target_city['tier']})", inline=True)
@@ -2136,74 +2115,58 @@ async def garrison_city_slash(interaction: discord.Interaction, city_name: str,
     
     embed.add_field(name="Added Brigades", value="\n".join(brigade_names), inline=False)
     
-    await interaction.response.send_message(embed=embed)
+    await interaction.followup.send(embed=embed)
 
 @bot.tree.command(name="ungarrison_city", description="Remove brigades from city garrison")
 @app_commands.describe(
     city_name="Name of your city to ungarrison",
     brigade_ids="Comma-separated list of brigade IDs to remove (or 'all' for all brigades)"
 )
-async def ungarrison_city_slash(interaction: discord.Interaction, city_name: str, brigade_ids: str):
+@deferred
+@requires_registration
+async def ungarrison_city_slash(interaction: discord.Interaction, city_name: str, brigade_ids: str, player: Dict):
     """Remove brigades from city garrison."""
-    player = await db.get_player(interaction.user.id)
-    if not player:
-        await interaction.response.send_message("You must register first! Use `/register`")
-        return
-    
     # Find the city
     cities = player.get('cities', [])
-    target_city = None
-    city_index = -1
-    
-    for i, city in enumerate(cities):
-        if city['name'].lower() == city_name.lower():
-            target_city = city
-            city_index = i
-            break
+    _, target_city = find_city(cities, city_name)
     
     if not target_city:
-        await interaction.response.send_message(f"You don't own a city named '{city_name}'.")
+        await interaction.followup.send(f"You don't own a city named '{city_name}'.")
         return
     
     current_garrison = target_city.get('garrison', [])
     if not current_garrison:
-        await interaction.response.send_message(f"{city_name} has no garrison.")
+        await interaction.followup.send(f"{city_name} has no garrison.")
         return
     
-    # Parse brigade IDs
+    # Parse brigade IDs; None removes the whole garrison as it stands when the city is updated
     if brigade_ids.lower() == 'all':
-        brigade_id_list = current_garrison.copy()
+        brigade_id_list = None
     else:
         try:
             brigade_id_list = [bid.strip() for bid in brigade_ids.split(',')]
         except:
-            await interaction.response.send_message("Invalid brigade ID format. Use comma-separated IDs or 'all'.")
+            await interaction.followup.send("Invalid brigade ID format. Use comma-separated IDs or 'all'.")
             return
     
-    # Remove brigades from garrison
-    removed_brigades = []
-    for brigade_id in brigade_id_list:
-        if brigade_id in current_garrison:
-            current_garrison.remove(brigade_id)
-            # Update brigade to remove garrison status
-            await db.update_brigade(brigade_id, {'garrison_city': None})
-            
-            brigade = await db.get_brigade(brigade_id)
-            if brigade:
-                removed_brigades.append(brigade)
+    # Remove the brigades from the city's current garrison, then clear their garrison status
+    _, ungarrisoned_city, removed_ids = await db.remove_city_garrison(interaction.user.id, city_name, brigade_id_list)
     
-    if not removed_brigades:
-        await interaction.response.send_message("No valid brigades found in garrison.")
+    if not removed_ids:
+        await interaction.followup.send("No valid brigades found in garrison.")
         return
     
-    # Update city
-    cities[city_index]['garrison'] = current_garrison
-    await db.update_player(interaction.user.id, {'cities': cities})
+    current_garrison = ungarrisoned_city['garrison']
+    brigades, _ = await asyncio.gather(
+        db.get_brigades_by_ids(removed_ids),
+        db.update_brigades(removed_ids, {'garrison_city': None})
+    )
+    removed_brigades = list(brigades.values())
     
     embed = discord.Embed(
         title="Brigades Ungarrisoned",
         description=f"Brigades removed from {city_name} garrison",
-        color=discord.Color.orange()
+        color=_ORANGE
     )
     
     embed.add_field(name="City", value=f"{city_name} (Tier {target_city['tier']})", inline=True)
@@ -2216,28 +2179,38 @@ async def ungarrison_city_slash(interaction: discord.Interaction, city_name: str
     
     embed.add_field(name="Removed Brigades", value="\n".join(brigade_names), inline=False)
     
-    await interaction.response.send_message(embed=embed)
+    await interaction.followup.send(embed=embed)
+
+# Error handling: error type -> reply text; anything not listed gets the generic message
+_APP_COMMAND_ERROR_MESSAGES = {
+    app_commands.CommandOnCooldown: lambda error: f"Command is on cooldown. Try again in {error.retry_after:.2f} seconds.",
+}
+
+def _default_error_message(error: Exception) -> str:
+    return f"An error occurred: {error}"
 
-# Error handling
 @bot.event
 async def on_app_command_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
-    if isinstance(error, app_commands.CommandOnCooldown):
-        await interaction.response.send_message(f"Command is on cooldown. Try again in {error.retry_after:.2f} seconds.")
-    else:
-        await interaction.response.send_message(f"An error occurred: {error}")
+    # Deferred commands have already acknowledged the interaction and must reply via followup
+    send = interaction.followup.send if interaction.response.is_done() else interaction.response.send_message
+    await send(_APP_COMMAND_ERROR_MESSAGES.get(type(error), _default_error_message)(error))
 
 if __name__ == "__main__":
     token = os.getenv('DISCORD_TOKEN')
     if not token:
-        print("ERROR: DISCORD_TOKEN not found in environment variables!")
-        print("Please create a .env file with your bot token.")
-    else:
-        # Start keep-alive server for Replit hosting
-        if REPLIT_HOSTING and keep_alive:
-            try:
-                keep_alive()
-                print("Keep-alive server started for Replit hosting")
-            except Exception as e:
-                print(f"Could not start keep-alive server: {e}")
-        
-        bot.run(token)
+        # Exit non-zero instead of falling through, so hosts don't keep an idle process alive
+        raise SystemExit("ERROR: DISCORD_TOKEN missing! Please create a .env file with your bot token.")
+    
+    # Start keep-alive server for Replit hosting; a failure is reported once and not retried
+    if REPLIT_HOSTING and keep_alive:
+        try:
+            keep_alive()
+            print("Keep-alive server started for Replit hosting")
+        except Exception as e:
+            print(f"Could not start keep-alive server, continuing without it: {e}")
+    
+    if uvloop:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        print("Using uvloop event loop")
+    
+    bot.run(token)
@@ -9,11 +9,6 @@ from typing import Optional, List, Dict
 import asyncio
 from dotenv import load_dotenv
 
-try:
-    import aiofiles
-except ImportError:
-    aiofiles = None
-
 from models import (
     BrigadeType, GamePhase, BRIGADE_STATS, 
     ENHANCEMENTS, GENERAL_TRAITS, Enhancement, BrigadeStats
@@ -397,7 +392,7 @@ async def game_status_slash(interaction: discord.Interaction):
     )
     
     embed.add_field(name="Current Day", value=current_day, inline=True)
-    embed.add_field(name="Current Phase", value=war_bot.current_phase.value, inline=True)
+    embed.add_field(name="Current Phase", value=war_bot.current_phase.label, inline=True)
     
     # Phase descriptions
     phase_info = {
@@ -686,7 +681,7 @@ async def data_stats_slash(interaction: discord.Interaction):
         active_wars = len([w for w in wars.values() if w.get('status') == 'active'])
         embed.add_field(name="🔥 Active Wars", value=str(active_wars), inline=True)
         
-        embed.add_field(name="Current Phase", value=war_bot.current_phase.value, inline=True)
+        embed.add_field(name="Current Phase", value=war_bot.current_phase.label, inline=True)
         
         await interaction.response.send_message(embed=embed)
     
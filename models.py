@@ -1,22 +1,45 @@
 import asyncio
+import sys
+from collections import Counter
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
-from enum import Enum
+from enum import Enum, IntEnum
 import random
 
 class BrigadeType(Enum):
-    CAVALRY = "🐴 Cavalry"
-    HEAVY = "⚔️ Heavy"  
-    LIGHT = "🪓 Light"
-    RANGED = "🏹 Ranged"
-    SUPPORT = "🛡️ Support"
-
-class GamePhase(Enum):
-    ORGANIZATION = "Organization"  # Tuesday/Friday
-    MOVEMENT = "Movement"  # Wednesday/Saturday  
-    BATTLE = "Battle"  # Thursday/Sunday
-
-@dataclass
+    CAVALRY = ("🐴 Cavalry", "cavalry")
+    HEAVY = ("⚔️ Heavy", "heavy")
+    LIGHT = ("🪓 Light", "light")
+    RANGED = ("🏹 Ranged", "ranged")
+    SUPPORT = ("🛡️ Support", "support")
+
+    def __new__(cls, display: str, key: str):
+        # The display string stays the enum value; the lowercase key is stored alongside it
+        member = object.__new__(cls)
+        member._value_ = display
+        member.key = key
+        return member
+
+BRIGADE_TYPE_BY_KEY = {bt.key: bt for bt in BrigadeType}
+
+# Brigade type by stored name: short lowercase key ("cavalry") or full value ("🐴 Cavalry")
+BRIGADE_TYPE_BY_NAME = {**BRIGADE_TYPE_BY_KEY, **{bt.value: bt for bt in BrigadeType}}
+
+class GamePhase(IntEnum):
+    ORGANIZATION = 1  # Tuesday/Friday
+    MOVEMENT = 2  # Wednesday/Saturday
+    BATTLE = 3  # Thursday/Sunday
+
+    @property
+    def label(self) -> str:
+        """Display name, as shown to players and stored in game_state.json."""
+        return self.name.title()
+
+# dataclass(slots=...) needs Python 3.10 but the bot supports 3.9, so only pass it where it's available;
+# on 3.9 instances keep a per-instance __dict__
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**DATACLASS_SLOTS)
 class BrigadeStats:
     skirmish: int = 0
     defense: int = 0
@@ -24,6 +47,20 @@ class BrigadeStats:
     rally: int = 0
     movement: int = 0
 
+    def __add__(self, other: 'BrigadeStats') -> 'BrigadeStats':
+        """Combine two stat blocks field by field into a new block."""
+        return BrigadeStats(
+            self.skirmish + other.skirmish,
+            self.defense + other.defense,
+            self.pitch + other.pitch,
+            self.rally + other.rally,
+            self.movement + other.movement
+        )
+
+    def as_tuple(self) -> Tuple[int, int, int, int, int]:
+        """Return stats in fixed (skirmish, defense, pitch, rally, movement) order."""
+        return (self.skirmish, self.defense, self.pitch, self.rally, self.movement)
+
 # Brigade base stats
 BRIGADE_STATS = {
     BrigadeType.CAVALRY: BrigadeStats(skirmish=1, pitch=1, movement=5),
@@ -33,7 +70,55 @@ BRIGADE_STATS = {
     BrigadeType.SUPPORT: BrigadeStats(defense=2, rally=1, movement=4)
 }
 
-@dataclass
+# Bonus applied to garrisoned brigades
+GARRISON_BONUS = BrigadeStats(defense=2, rally=2)
+
+# Brigade cap increase granted by each city tier
+CITY_TIER_BRIGADE_BONUS = {1: 1, 2: 3, 3: 5}
+
+BASE_BRIGADE_CAP = 2
+
+def brigade_cap_for_cities(cities: List[Dict]) -> int:
+    """Brigade cap for a list of owned cities: the base cap plus each city's tier bonus."""
+    return brigade_cap_for_tier_counts(city_tier_counts(cities))
+
+def city_tier_counts(cities: List[Dict]) -> Dict[str, int]:
+    """Count cities per tier, keyed by the tier as a string so the counts round-trip through JSON."""
+    counts = {str(tier): 0 for tier in CITY_TIER_BRIGADE_BONUS}
+    counts.update(Counter(str(city.get('tier', 1)) for city in cities))
+    return counts
+
+def player_tier_counts(player: Dict) -> Dict[str, int]:
+    """A player's stored tier counters, rebuilt from their cities for records saved before the counters existed."""
+    tier_counts = player.get('tier_counts')
+    return dict(tier_counts) if tier_counts is not None else city_tier_counts(player.get('cities', []))
+
+def brigade_cap_for_tier_counts(tier_counts: Dict[str, int]) -> int:
+    """Brigade cap from per-tier city counts, without walking the city list."""
+    return BASE_BRIGADE_CAP + sum(CITY_TIER_BRIGADE_BONUS.get(int(tier), 0) * count for tier, count in tier_counts.items())
+
+def find_city(cities: List[Dict], city_name: str) -> Tuple[int, Optional[Dict]]:
+    """Find a city by name (case-insensitive); returns (index, city) or (-1, None) if not found."""
+    name = city_name.casefold()
+    for index, city in enumerate(cities):
+        if city['name'].casefold() == name:
+            return index, city
+    return -1, None
+
+def next_id_number(record_ids) -> int:
+    """One past the highest number in IDs of the form prefix_<number>_<timestamp>.
+
+    IDs that don't follow that form are skipped rather than treated as errors.
+    """
+    highest = 0
+    for record_id in record_ids:
+        try:
+            highest = max(highest, int(str(record_id).split("_")[1]))
+        except (IndexError, ValueError):
+            continue
+    return highest + 1
+
+@dataclass(frozen=True, **DATACLASS_SLOTS)
 class Enhancement:
     name: str
     brigade_type: Optional[BrigadeType]  # None for universal enhancements
@@ -155,6 +240,20 @@ ENHANCEMENTS = {
     )
 }
 
+# Combined (skirmish, defense, pitch, rally, movement) for every brigade type, enhancement and garrison state,
+# keyed by (BrigadeType, enhancement name or None, is_garrisoned)
+BRIGADE_TOTAL_STATS: Dict[Tuple[BrigadeType, Optional[str], bool], Tuple[int, int, int, int, int]] = {}
+for _brigade_type, _base_stats in BRIGADE_STATS.items():
+    for _name, _enhanced in [(None, _base_stats)] + [(n, _base_stats + e.stats) for n, e in ENHANCEMENTS.items()]:
+        BRIGADE_TOTAL_STATS[(_brigade_type, _name, False)] = _enhanced.as_tuple()
+        BRIGADE_TOTAL_STATS[(_brigade_type, _name, True)] = (_enhanced + GARRISON_BONUS).as_tuple()
+
+def brigade_total_stats(brigade_type: BrigadeType, enhancement: Optional[str] = None,
+                        is_garrisoned: bool = False) -> Tuple[int, int, int, int, int]:
+    """Total stats for a brigade including its enhancement and garrison bonus; unknown enhancements add nothing."""
+    stats = BRIGADE_TOTAL_STATS.get((brigade_type, enhancement, is_garrisoned))
+    return stats if stats is not None else BRIGADE_TOTAL_STATS[(brigade_type, None, is_garrisoned)]
+
 # General traits
 GENERAL_TRAITS = {
     1: ("Ambitious", "-1 to promotion number needed after battle"),
@@ -178,3 +277,13 @@ GENERAL_TRAITS = {
     19: ("Wary", "Alerted when enemy can see army, +1 sight, reveal enemy traits"),
     20: ("Zealous", "+1 Rally (+2 Rally +1 Pitch in holy wars)")
 }
+
+# Trait lookups indexed directly by trait_id (index 0 is unused)
+GENERAL_TRAITS_TUPLE: Tuple[Tuple[Optional[str], Optional[str]], ...] = tuple(
+    GENERAL_TRAITS.get(i, (None, None)) for i in range(21)
+)
+GENERAL_TRAIT_NAMES: Tuple[Optional[str], ...] = tuple(name for name, _ in GENERAL_TRAITS_TUPLE)
+TRAIT_ID_BY_NAME: Dict[str, int] = {name: trait_id for trait_id, (name, _) in GENERAL_TRAITS.items()}
+
+# Every rollable trait_id, for drawing traits without building a range per roll
+GENERAL_TRAIT_IDS: Tuple[int, ...] = tuple(GENERAL_TRAITS)
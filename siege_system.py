@@ -6,8 +6,14 @@ Handles city sieges, occupations, and related mechanics
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
+import copy
 import random
+import asyncio
+import time
 from datetime import datetime, timedelta
+from collections import Counter
+
+from models import BrigadeType, BrigadeStats, BRIGADE_STATS, GARRISON_BONUS, TRAIT_ID_BY_NAME, next_id_number
 
 class SiegeAction(Enum):
     ASSAULT = "assault"
@@ -33,6 +39,33 @@ class CityGarrison:
         }
         return garrison_map.get(tier, cls(heavy_count=1, ranged_count=2))
 
+# Garrison brigade stats by type as (skirmish, defense, pitch, rally, movement), with the
+# garrison bonus already applied; derived from the shared stats tables so they stay in step
+_GARRISON_TYPES = {"heavy": BrigadeType.HEAVY, "ranged": BrigadeType.RANGED}
+_GARRISON_STATS = {
+    brigade_type: (BRIGADE_STATS[brigade_enum] + GARRISON_BONUS).as_tuple()
+    for brigade_type, brigade_enum in _GARRISON_TYPES.items()
+}
+_STAT_NAMES = ("skirmish", "defense", "pitch", "rally", "movement")
+
+def _garrison_brigades(garrison: CityGarrison) -> Tuple[Tuple[str, str], ...]:
+    """A garrison's brigades as (id, type) pairs, heavy brigades first."""
+    return tuple(
+        [(f"garrison_heavy_{i+1}", "heavy") for i in range(garrison.heavy_count)]
+        + [(f"garrison_ranged_{i+1}", "ranged") for i in range(garrison.ranged_count)]
+    )
+
+# Garrison brigades for each city tier; other tiers fall back to tier 1 like CityGarrison.from_tier
+_GARRISONS_BY_TIER = {tier: _garrison_brigades(CityGarrison.from_tier(tier)) for tier in (1, 2, 3)}
+
+# Statuses of a siege that hasn't finished yet
+_OPEN_STATUSES = ("active", "ready_for_assault")
+
+_BRUTAL_TRAIT_ID = TRAIT_ID_BY_NAME["Brutal"]
+
+# Resources a sack can take, one unit per pick (repeats allowed)
+_SACK_RESOURCES = ("food", "metal", "stone", "timber", "fuel", "gems")
+
 @dataclass
 class Siege:
     id: str
@@ -47,33 +80,50 @@ class Siege:
 class SiegeSystem:
     def __init__(self, data_manager):
         self.db = data_manager
+        
+        # sieges.json is only written through this class, so it is loaded once and kept in memory
+        self._sieges: Optional[Dict] = None
+        # IDs of sieges that are still running (active or ready for assault), so finished ones are never walked;
+        # a dict used as an insertion-ordered set, so open sieges keep file order
+        self._open_siege_ids: Dict[str, None] = {}
+        self._sieges_load_lock = asyncio.Lock()
+        # Number for the next siege ID, one past the highest ever used so IDs never repeat
+        self._next_siege_number = 1
+    
+    async def _get_sieges(self) -> Dict:
+        """Get the in-memory sieges, loading them from file on first use."""
+        if self._sieges is None:
+            async with self._sieges_load_lock:
+                if self._sieges is None:
+                    sieges = await self.db._load_json("bot_data/sieges.json") if hasattr(self.db, '_load_json') else {}
+                    self._next_siege_number = next_id_number(sieges)
+                    self._open_siege_ids = {
+                        siege_id: None for siege_id, siege in sieges.items() if siege["status"] in _OPEN_STATUSES
+                    }
+                    self._sieges = sieges
+        return self._sieges
+    
+    async def _save_sieges(self):
+        """Save the in-memory sieges to file."""
+        if hasattr(self.db, '_save_json'):
+            await self.db._save_json("bot_data/sieges.json", self._sieges)
     
     async def start_siege(self, city_name: str, city_tier: int, attacker_id: int, 
                          defender_id: int, brigades: List[str], general_id: Optional[str] = None) -> str:
         """Start a siege on a city."""
-        sieges = await self.db._load_json("bot_data/sieges.json") if hasattr(self.db, '_load_json') else {}
+        sieges = await self._get_sieges()
         
         # Calculate siege timer with Combat Engineers bonus
         siege_timer = city_tier
         
-        # Check for Combat Engineers enhancement
-        for brigade_id in brigades:
-            brigade = await self.db.get_brigade(brigade_id)
-            if brigade and brigade.get('enhancement') == "Combat Engineers":
-                siege_timer = max(1, siege_timer - 1)  # Decrease by 1, minimum 1
-                break
+        # Check for Combat Engineers enhancement, reading all the brigades at once
+        besieging_brigades = await self.db.get_brigades_by_ids(brigades)
+        if any(brigade.get('enhancement') == "Combat Engineers" for brigade in besieging_brigades.values()):
+            siege_timer = max(1, siege_timer - 1)  # Decrease by 1, minimum 1
         
         # Create siege
-        siege_id = f"siege_{len(sieges) + 1}_{int(datetime.now().timestamp())}"
-        siege = Siege(
-            id=siege_id,
-            city_name=city_name,
-            city_tier=city_tier,
-            attacker_id=attacker_id,
-            defender_id=defender_id,
-            siege_timer=siege_timer,
-            started_at=datetime.now().isoformat()
-        )
+        siege_id = f"siege_{self._next_siege_number}_{int(time.time())}"
+        self._next_siege_number += 1
         
         sieges[siege_id] = {
             "id": siege_id,
@@ -87,109 +137,72 @@ class SiegeSystem:
             "started_at": datetime.now().isoformat(),
             "status": "active"
         }
+        self._open_siege_ids[siege_id] = None
         
-        if hasattr(self.db, '_save_json'):
-            await self.db._save_json("bot_data/sieges.json", sieges)
+        await self._save_sieges()
         
         return siege_id
     
     async def advance_siege_timers(self):
         """Advance all active siege timers by 1 cycle."""
-        sieges = await self.db._load_json("bot_data/sieges.json") if hasattr(self.db, '_load_json') else {}
+        sieges = await self._get_sieges()
         
-        for siege_id, siege_data in sieges.items():
+        advanced = False
+        for siege_id in self._open_siege_ids:
+            siege_data = sieges[siege_id]
             if siege_data["status"] == "active":
                 siege_data["siege_timer"] -= 1
+                advanced = True
                 
                 if siege_data["siege_timer"] <= 0:
                     siege_data["status"] = "ready_for_assault"
         
-        if hasattr(self.db, '_save_json'):
-            await self.db._save_json("bot_data/sieges.json", sieges)
+        # Finished sieges never change, so only rewrite the file when a timer actually moved
+        if advanced:
+            await self._save_sieges()
     
     async def can_assault(self, siege_id: str) -> bool:
         """Check if siege is ready for assault."""
-        sieges = await self.db._load_json("bot_data/sieges.json") if hasattr(self.db, '_load_json') else {}
+        sieges = await self._get_sieges()
         siege = sieges.get(siege_id)
         
         return siege is not None and siege["siege_timer"] <= 0
     
     def create_city_garrison(self, city_tier: int) -> List[Dict]:
         """Create automatic city garrison brigades."""
-        garrison = CityGarrison.from_tier(city_tier)
-        brigades = []
-        
-        # Create heavy brigades
-        for i in range(garrison.heavy_count):
-            brigades.append({
-                "id": f"garrison_heavy_{i+1}",
-                "type": "heavy",
-                "enhancement": None,
-                "stats": {
-                    "skirmish": 0,
-                    "defense": 2,
-                    "pitch": 1,
-                    "rally": 1,
-                    "movement": 3
-                }
-            })
-        
-        # Create ranged brigades
-        for i in range(garrison.ranged_count):
-            brigades.append({
-                "id": f"garrison_ranged_{i+1}",
-                "type": "ranged", 
+        return [
+            {
+                "id": brigade_id,
+                "type": brigade_type,
                 "enhancement": None,
-                "stats": {
-                    "skirmish": 0,
-                    "defense": 2,
-                    "pitch": 1,
-                    "rally": 0,
-                    "movement": 4
-                }
-            })
-        
-        # Garrison bonuses: +2 defense, +2 rally
-        for brigade in brigades:
-            brigade["stats"]["defense"] += 2
-            brigade["stats"]["rally"] += 2
-        
-        return brigades
+                "stats": dict(zip(_STAT_NAMES, _GARRISON_STATS[brigade_type]))
+            }
+            for brigade_id, brigade_type in _GARRISONS_BY_TIER.get(city_tier, _GARRISONS_BY_TIER[1])
+        ]
     
     async def conduct_assault(self, siege_id: str, attacking_brigades: List[Dict]) -> Dict:
         """Conduct an assault on a besieged city."""
         from battle_system import BattleSystem, BattleSide, create_battle_brigade
         
-        sieges = await self.db._load_json("bot_data/sieges.json") if hasattr(self.db, '_load_json') else {}
+        sieges = await self._get_sieges()
         siege = sieges.get(siege_id)
         
         if not siege or siege["status"] != "ready_for_assault":
             return {"success": False, "message": "Siege not ready for assault"}
         
-        # Create garrison
-        garrison_brigades = self.create_city_garrison(siege["city_tier"])
-        
-        # Convert to BattleBrigade objects
-        from models import BrigadeType, BrigadeStats
+        # Create the garrison straight from the precomputed per-tier table
         from battle_system import BattleBrigade
         
-        garrison_battle_brigades = []
-        for brigade_data in garrison_brigades:
-            brigade_type = BrigadeType.HEAVY if brigade_data["type"] == "heavy" else BrigadeType.RANGED
-            stats = BrigadeStats(
-                skirmish=brigade_data["stats"]["skirmish"],
-                defense=brigade_data["stats"]["defense"],
-                pitch=brigade_data["stats"]["pitch"],
-                rally=brigade_data["stats"]["rally"],
-                movement=brigade_data["stats"]["movement"]
-            )
-            garrison_battle_brigades.append(BattleBrigade(
-                id=brigade_data["id"],
+        garrison_battle_brigades = [
+            BattleBrigade(
+                id=brigade_id,
                 player_id=siege["defender_id"],
-                type=brigade_type,
+                type=_GARRISON_TYPES[brigade_type],
                 enhancement=None,
-                stats=stats
-            ))
+                stats=BrigadeStats(*_GARRISON_STATS[brigade_type])
+            )
+            for brigade_id, brigade_type in _GARRISONS_BY_TIER.get(siege["city_tier"], _GARRISONS_BY_TIER[1])
+        ]
         
         # Convert attacking brigades to BattleBrigade objects
         attacking_battle_brigades = []
@@ -223,25 +236,22 @@ class SiegeSystem:
         )
         
         # Update siege status
-        if battle_result.get("winner") == attacker_side:
-            siege["status"] = "victory"
-            siege["completed_at"] = datetime.now().isoformat()
-        else:
-            siege["status"] = "failed"
-            siege["completed_at"] = datetime.now().isoformat()
+        siege_result = "victory" if battle_result.get("winner") == attacker_side else "failed"
+        siege["status"] = siege_result
+        self._open_siege_ids.pop(siege_id, None)
+        siege["completed_at"] = datetime.now().isoformat()
         
-        if hasattr(self.db, '_save_json'):
-            await self.db._save_json("bot_data/sieges.json", sieges)
+        await self._save_sieges()
         
         return {
             "success": True,
             "battle_result": battle_result,
-            "siege_result": "victory" if battle_result.get("winner") == attacker_side else "failed"
+            "siege_result": siege_result
         }
     
     async def starve_out_city(self, siege_id: str) -> Dict:
         """Attempt to starve out a city (requires 2x city tier additional cycles)."""
-        sieges = await self.db._load_json("bot_data/sieges.json") if hasattr(self.db, '_load_json') else {}
+        sieges = await self._get_sieges()
         siege = sieges.get(siege_id)
         
         if not siege:
@@ -253,10 +263,10 @@ class SiegeSystem:
         
         if cycles_since_ready >= required_additional_cycles:
             siege["status"] = "starved"
+            self._open_siege_ids.pop(siege_id, None)
             siege["completed_at"] = datetime.now().isoformat()
             
-            if hasattr(self.db, '_save_json'):
-                await self.db._save_json("bot_data/sieges.json", sieges)
+            await self._save_sieges()
             
             return {"success": True, "message": f"{siege['city_name']} starved out!"}
         else:
@@ -278,17 +288,15 @@ class SiegeSystem:
             
         elif outcome == SiegeOutcome.SACK:
             # Take 2 random resources
-            resource_types = ["food", "metal", "stone", "timber", "fuel", "gems"]
-            taken_resources = random.choices(resource_types, k=2)
+            taken_resources = random.choices(_SACK_RESOURCES, k=2)
             
             result["message"] = f"City sacked! Gained {', '.join(taken_resources)}"
             result["effect"] = "resource_gain"
             result["resources_gained"] = ", ".join(taken_resources)
             
-            # Actually transfer resources
-            for resource in taken_resources:
-                await self.db.add_resource(attacker_id, resource, 1)
-                # Note: Should also deduct from defender if they have it
+            # Actually transfer resources, in one write
+            await self.db.add_resources(attacker_id, Counter(taken_resources))
+            # Note: Should also deduct from defender if they have it
             
         elif outcome == SiegeOutcome.RAZE:
             # Decrease city tier by 1
@@ -301,22 +309,15 @@ class SiegeSystem:
             
             if attacker:
                 generals = await self.db.get_generals(attacker_id)
-                for general in generals:
-                    from models import GENERAL_TRAITS
-                    trait_name, _ = GENERAL_TRAITS[general['trait_id']]
-                    if trait_name == "Brutal":
-                        brutal_general = True
-                        break
+                brutal_general = any(general['trait_id'] == _BRUTAL_TRAIT_ID for general in generals)
             
             # Brutal trait: razing also counts as sacking
             if brutal_general:
-                resource_types = ["food", "metal", "stone", "timber", "fuel", "gems"]
-                taken_resources = random.choices(resource_types, k=2)
+                taken_resources = random.choices(_SACK_RESOURCES, k=2)
                 result["message"] += f" + Sacked for {', '.join(taken_resources)} (Brutal trait)"
                 result["brutal_bonus"] = ", ".join(taken_resources)
                 
-                for resource in taken_resources:
-                    await self.db.add_resource(attacker_id, resource, 1)
+                await self.db.add_resources(attacker_id, Counter(taken_resources))
             
             # Would need to update city data in player profile
             # This would require additional implementation
@@ -325,12 +326,13 @@ class SiegeSystem:
 
     async def get_active_sieges(self, player_id: Optional[int] = None) -> List[Dict]:
         """Get all active sieges, optionally filtered by player."""
-        sieges = await self.db._load_json("bot_data/sieges.json") if hasattr(self.db, '_load_json') else {}
+        sieges = await self._get_sieges()
         
-        active_sieges = [s for s in sieges.values() if s["status"] in ["active", "ready_for_assault"]]
+        active_sieges = [sieges[siege_id] for siege_id in self._open_siege_ids]
         
         if player_id:
             active_sieges = [s for s in active_sieges 
                            if s["attacker_id"] == player_id or s["defender_id"] == player_id]
         
-        return active_sieges
+        # The in-memory records are the source of truth, so callers get their own copies
+        return copy.deepcopy(active_sieges)
@@ -6,7 +6,7 @@ REM Check if Python is installed
 python --version >nul 2>&1
 if errorlevel 1 (
     echo ERROR: Python is not installed or not in PATH!
-    echo Please install Python 3.8 or higher from https://python.org
+    echo Please install Python 3.9 or higher from https://python.org
     pause
     exit /b 1
 )
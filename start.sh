@@ -6,7 +6,7 @@ echo
 # Check if Python is installed
 if ! command -v python3 &> /dev/null; then
     echo "ERROR: Python 3 is not installed!"
-    echo "Please install Python 3.8 or higher"
+    echo "Please install Python 3.9 or higher"
     exit 1
 fi
 
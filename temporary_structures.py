@@ -3,17 +3,26 @@ Temporary Structures System for Discord Hegemony Bot
 Handles trenches, watchtowers, and forts
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
-import json
-from datetime import datetime
+from datetime import datetime, timedelta
+import time
+import asyncio
+
+from models import next_id_number
 
 class StructureType(Enum):
     TRENCH = "trench"
     WATCHTOWER = "watchtower"
     FORT = "fort"
 
+# Effect descriptions for structures that boost unmoved brigades, by structure type value
+_UNMOVED_EFFECT_LABELS = {
+    StructureType.WATCHTOWER.value: "Extended sight (+1)",
+    StructureType.FORT.value: "Garrisoned (+2 defense, +2 rally)",
+}
+
 @dataclass
 class TemporaryStructure:
     id: str
@@ -37,6 +46,28 @@ class TemporaryStructureSystem:
             StructureType.WATCHTOWER: "Unmoved brigades get +1 sight range",
             StructureType.FORT: "Unmoved brigades become garrisoned (+2 defense, +2 rally)"
         }
+        
+        # Cost and effect together, so a build needs one lookup: StructureType -> (cost, effect)
+        self._structure_meta = {
+            structure_type: (self.structure_costs[structure_type], self.structure_effects[structure_type])
+            for structure_type in StructureType
+        }
+        
+        # structures.json is only written through this class, so it is loaded once and kept in memory,
+        # with structure IDs indexed by location and by owner
+        self._structures: Optional[Dict] = None
+        self._structures_load_lock = asyncio.Lock()
+        self._by_location: Dict[str, List[str]] = {}
+        self._by_owner: Dict[int, List[str]] = {}
+        # Each structure's expiry in epoch seconds, parsed once when it is indexed
+        self._expiries: Dict[str, float] = {}
+        # Earliest expiry among stored structures (epoch seconds), so cleanup can skip scanning until then
+        self._next_expiry = float("inf")
+        # Number for the next structure ID, one past the highest ever used so IDs never repeat
+        self._next_structure_number = 1
+        
+        # Pre-rendered embed fields per player: player_id -> (valid_until, [(name, value), ...])
+        self._rendered: Dict[int, Tuple[datetime, List[Tuple[str, str]]]] = {}
     
     async def build_structure(self, player_id: int, structure_type: StructureType, 
                             location: str) -> Dict:
@@ -45,7 +76,7 @@ class TemporaryStructureSystem:
         
         # Check if it's organization day
         game_state = await self.db.get_game_state()
-        if game_state.get("current_phase") != GamePhase.ORGANIZATION.value:
+        if game_state.get("current_phase") != GamePhase.ORGANIZATION.label:
             return {
                 "success": False,
                 "message": "Structures can only be built during Organization phase"
@@ -56,7 +87,7 @@ class TemporaryStructureSystem:
         if not player:
             return {"success": False, "message": "Player not found"}
         
-        cost = self.structure_costs[structure_type]
+        cost, effect = self._structure_meta[structure_type]
         for resource, amount in cost.items():
             if player.get("resources", {}).get(resource, 0) < amount:
                 return {
@@ -76,37 +107,41 @@ class TemporaryStructureSystem:
         
         # Create structure
         structures = await self._load_structures()
-        structure_id = f"struct_{len(structures) + 1}_{int(datetime.now().timestamp())}"
+        structure_id = f"struct_{self._next_structure_number}_{int(time.time())}"
+        self._next_structure_number += 1
         
+        now = datetime.now()
         structure = {
             "id": structure_id,
             "type": structure_type.value,
             "location": location,
             "owner_id": player_id,
-            "built_at": datetime.now().isoformat(),
-            "expires_at": self._get_next_map_update(),
+            "built_at": now.isoformat(),
+            "expires_at": self._get_next_map_update(now),
             "active": True
         }
         
         structures[structure_id] = structure
+        self._index_structure(structure_id, structure)
         await self._save_structures(structures)
+        self._rendered.pop(player_id, None)
         
         return {
             "success": True,
             "message": f"{structure_type.value.title()} built at {location}",
             "structure_id": structure_id,
-            "effect": self.structure_effects[structure_type]
+            "effect": effect
         }
     
     async def get_structures_at_location(self, location: str) -> List[Dict]:
         """Get all active structures at a location."""
         structures = await self._load_structures()
         location_structures = []
+        now = time.time()
         
-        for structure in structures.values():
-            if (structure["location"] == location and 
-                structure["active"] and 
-                not self._is_expired(structure)):
+        for structure_id in self._by_location.get(location, ()):
+            structure = structures[structure_id]
+            if structure["active"] and not self._is_expired(structure_id, now):
                 location_structures.append(structure)
         
         return location_structures
@@ -115,11 +150,11 @@ class TemporaryStructureSystem:
         """Get all structures owned by a player."""
         structures = await self._load_structures()
         player_structures = []
+        now = time.time()
         
-        for structure in structures.values():
-            if (structure["owner_id"] == player_id and 
-                structure["active"] and 
-                not self._is_expired(structure)):
+        for structure_id in self._by_owner.get(player_id, ()):
+            structure = structures[structure_id]
+            if structure["active"] and not self._is_expired(structure_id, now):
                 player_structures.append(structure)
         
         return player_structures
@@ -127,45 +162,67 @@ class TemporaryStructureSystem:
     async def cleanup_expired_structures(self):
         """Remove expired structures (called during map updates)."""
         structures = await self._load_structures()
+        now = time.time()
+        if now <= self._next_expiry:
+            return 0
+        
         active_structures = {}
         
         for structure_id, structure in structures.items():
-            if not self._is_expired(structure):
+            if not self._is_expired(structure_id, now):
                 active_structures[structure_id] = structure
         
+        self._set_structures(active_structures)
         await self._save_structures(active_structures)
+        self._rendered.clear()
         
         expired_count = len(structures) - len(active_structures)
         return expired_count
     
+    async def get_player_structures_rendered(self, player_id: int) -> List[Tuple[str, str]]:
+        """Get a player's active structures as cached (name, value) embed fields."""
+        cached = self._rendered.get(player_id)
+        if cached and datetime.now() <= cached[0]:
+            return cached[1]
+        
+        structures = await self.get_player_structures(player_id)
+        fields = [
+            (f"{structure['type'].title()} at {structure['location']}",
+             f"Built: {structure['built_at'][:10]}\nExpires: Next map update")
+            for structure in structures
+        ]
+        
+        # The cached fields stay valid until the first listed structure expires
+        valid_until = min((datetime.fromisoformat(structure["expires_at"]) for structure in structures),
+                          default=datetime.max)
+        self._rendered[player_id] = (valid_until, fields)
+        return fields
+    
     def apply_structure_effects(self, brigade_data: Dict, location: str, 
                               structures: List[Dict]) -> Dict:
         """Apply structure effects to a brigade at a location."""
-        modified_brigade = brigade_data.copy()
         effects_applied = []
+        sight_bonus = 0
+        garrisoned = False
+        
+        # Trench effects are handled in the movement system; towers and forts only help unmoved brigades
+        if not brigade_data.get("moved_this_cycle", False):
+            for structure in structures:
+                structure_type = structure["type"]
+                if structure_type == StructureType.WATCHTOWER.value:
+                    sight_bonus += 1
+                elif structure_type == StructureType.FORT.value:
+                    garrisoned = True
+                else:
+                    continue
+                effects_applied.append(_UNMOVED_EFFECT_LABELS[structure_type])
         
-        for structure in structures:
-            if structure["type"] == StructureType.TRENCH.value:
-                # Trench effect handled in movement system
-                pass
-            
-            elif structure["type"] == StructureType.WATCHTOWER.value:
-                # Check if brigade hasn't moved this cycle
-                if not brigade_data.get("moved_this_cycle", False):
-                    modified_brigade["sight_range"] = modified_brigade.get("sight_range", 1) + 1
-                    effects_applied.append("Extended sight (+1)")
-            
-            elif structure["type"] == StructureType.FORT.value:
-                # Check if brigade hasn't moved this cycle
-                if not brigade_data.get("moved_this_cycle", False):
-                    modified_brigade["is_garrisoned"] = True
-                    modified_brigade["garrison_bonus"] = {
-                        "defense": 2,
-                        "rally": 2
-                    }
-                    effects_applied.append("Garrisoned (+2 defense, +2 rally)")
-        
-        modified_brigade["structure_effects"] = effects_applied
+        modified_brigade = {**brigade_data, "structure_effects": effects_applied}
+        if sight_bonus:
+            modified_brigade["sight_range"] = brigade_data.get("sight_range", 1) + sight_bonus
+        if garrisoned:
+            modified_brigade["is_garrisoned"] = True
+            modified_brigade["garrison_bonus"] = {"defense": 2, "rally": 2}
         return modified_brigade
     
     def calculate_movement_cost(self, from_location: str, to_location: str, 
@@ -179,13 +236,38 @@ class TemporaryStructureSystem:
         return base_cost
     
     async def _load_structures(self) -> Dict:
-        """Load structures from file."""
+        """Get the in-memory structures, loading them from file on first use."""
+        if self._structures is None:
+            async with self._structures_load_lock:
+                if self._structures is None:
+                    try:
+                        structures = await self.db._load_json("bot_data/structures.json") if hasattr(self.db, '_load_json') else {}
+                    except Exception:
+                        structures = {}
+                    self._next_structure_number = next_id_number(structures)
+                    self._set_structures(structures)
+        return self._structures
+    
+    def _set_structures(self, structures: Dict):
+        """Replace the in-memory structures and rebuild the location and owner indexes."""
+        self._structures = structures
+        self._by_location = {}
+        self._by_owner = {}
+        self._expiries = {}
+        self._next_expiry = float("inf")
+        for structure_id, structure in structures.items():
+            self._index_structure(structure_id, structure)
+    
+    def _index_structure(self, structure_id: str, structure: Dict):
+        """Add a structure to the location and owner indexes, its parsed expiry and the next-expiry time."""
+        self._by_location.setdefault(structure["location"], []).append(structure_id)
+        self._by_owner.setdefault(structure["owner_id"], []).append(structure_id)
         try:
-            if hasattr(self.db, '_load_json'):
-                return await self.db._load_json("bot_data/structures.json")
-            return {}
+            expiry = datetime.fromisoformat(structure["expires_at"]).timestamp()
         except Exception:
-            return {}
+            expiry = float("-inf")  # Unreadable expiry counts as already expired
+        self._expiries[structure_id] = expiry
+        self._next_expiry = min(self._next_expiry, expiry)
     
     async def _save_structures(self, structures: Dict):
         """Save structures to file."""
@@ -205,37 +287,22 @@ class TemporaryStructureSystem:
         # For now, allow building anywhere (would need proper territory system)
         return True
     
-    def _get_next_map_update(self) -> str:
-        """Get timestamp of next map update."""
+    def _get_next_map_update(self, now: Optional[datetime] = None) -> str:
+        """Get timestamp of next map update after now (default: the current time)."""
         # Simplified - structures expire after next cycle
-        from datetime import timedelta
-        next_update = datetime.now() + timedelta(days=1)
+        next_update = (now or datetime.now()) + timedelta(days=1)
         return next_update.isoformat()
     
-    def _is_expired(self, structure: Dict) -> bool:
-        """Check if structure has expired."""
-        try:
-            expires_at = datetime.fromisoformat(structure["expires_at"])
-            return datetime.now() > expires_at
-        except Exception:
-            return True
+    def _is_expired(self, structure_id: str, now: Optional[float] = None) -> bool:
+        """Check if an indexed structure has expired as of now (epoch seconds, default: the current time)."""
+        return (time.time() if now is None else now) > self._expiries.get(structure_id, float("-inf"))
 
     async def get_structure_info(self) -> Dict:
         """Get information about all structure types."""
         return {
             "types": {
-                "trench": {
-                    "cost": self.structure_costs[StructureType.TRENCH],
-                    "effect": self.structure_effects[StructureType.TRENCH]
-                },
-                "watchtower": {
-                    "cost": self.structure_costs[StructureType.WATCHTOWER],
-                    "effect": self.structure_effects[StructureType.WATCHTOWER]
-                },
-                "fort": {
-                    "cost": self.structure_costs[StructureType.FORT],
-                    "effect": self.structure_effects[StructureType.FORT]
-                }
+                structure_type.value: {"cost": cost, "effect": effect}
+                for structure_type, (cost, effect) in self._structure_meta.items()
             },
             "rules": [
                 "Structures can only be built during Organization phase",
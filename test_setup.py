@@ -9,8 +9,8 @@ import os
 def test_python_version():
     """Test if Python version is sufficient."""
     print("Testing Python version...")
-    if sys.version_info < (3, 8):
-        print("❌ Python 3.8+ required. Current version:", sys.version)
+    if sys.version_info < (3, 9):
+        print("❌ Python 3.9+ required. Current version:", sys.version)
         return False
     print(f"✅ Python {sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}")
     return True
@@ -27,10 +27,10 @@ def test_imports():
         return False
     
     try:
-        import aiofiles
-        print("✅ aiofiles available")
+        import orjson
+        print("✅ orjson available")
     except ImportError:
-        print("❌ aiofiles not installed. Run: pip install aiofiles")
+        print("❌ orjson not installed. Run: pip install orjson")
         return False
     
     try:
@@ -105,18 +105,16 @@ def test_database():
     
     try:
         import asyncio
+        import tempfile
         from json_data_manager import JsonDataManager
         
         async def test_json_manager():
-            db = JsonDataManager("test_data")
-            await db.init_data_files()
+            # A throwaway directory, removed even if initialization fails
+            with tempfile.TemporaryDirectory() as data_dir:
+                db = JsonDataManager(data_dir)
+                await db.init_data_files()
+                await db.flush()
             print("✅ JSON data manager initialization successful")
-            
-            # Clean up test data
-            import shutil
-            if os.path.exists("test_data"):
-                shutil.rmtree("test_data")
-            
             return True
         
         return asyncio.run(test_json_manager())
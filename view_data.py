@@ -4,22 +4,76 @@ Data viewer for Discord Hegemony Bot JSON files
 Provides easy inspection of game data
 """
 
-import json
 import os
+import sys
 from datetime import datetime
-from typing import Dict, Any
+from collections import Counter
+from typing import Dict, Any, List, Tuple
+import orjson
+
+# Trait names for display; the viewer still works without the bot's models module
+try:
+    from models import GENERAL_TRAITS
+except ImportError:
+    GENERAL_TRAITS = {}
+
+
+def _write_lines(lines: List[str]):
+    """Write lines to stdout in a single call instead of one print per line."""
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+def _group_by_player(records: Dict[str, Dict]) -> Dict[str, List[Tuple[str, Dict]]]:
+    """Group (id, record) pairs by the record's player_id (as a string), keeping first-seen order."""
+    by_player: Dict[str, List[Tuple[str, Dict]]] = {}
+    player_keys: Dict[Any, str] = {}  # raw player_id -> its string form, so str() runs once per player
+    for record_id, record in records.items():
+        player_id = record['player_id']
+        key = player_keys.get(player_id)
+        if key is None:
+            key = player_keys[player_id] = str(player_id)
+        by_player.setdefault(key, []).append((record_id, record))
+    return by_player
+
 
 class DataViewer:
     def __init__(self, data_dir: str = "bot_data"):
         self.data_dir = data_dir
+        # Parsed files, reused until the file changes: filename -> ((mtime_ns, size), data)
+        self._cache: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
         
     def load_json_file(self, filename: str) -> Dict[str, Any]:
-        """Load a JSON file and return its contents."""
+        """Load a JSON file and return its contents, reparsing only if the file changed since the last load."""
         filepath = os.path.join(self.data_dir, filename)
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
+            # A plain stat is enough to tell whether the cached parse is still current
+            stat = os.stat(filepath)
+            cached = self._cache.get(filename)
+            if cached and cached[0] == (stat.st_mtime_ns, stat.st_size):
+                return cached[1]
+            
+            # Read the whole file with raw os.read calls, bypassing the buffered io layers;
+            # a read may return fewer bytes than asked for, so keep going until EOF
+            # The opened file's fstat gives the read size and the cache version for exactly the bytes parsed
+            fd = os.open(filepath, os.O_RDONLY)
+            try:
+                opened = os.fstat(fd)
+                version = (opened.st_mtime_ns, opened.st_size)
+                chunks = []
+                remaining = opened.st_size
+                while remaining > 0:
+                    chunk = os.read(fd, remaining)
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+                    remaining -= len(chunk)
+                raw = b"".join(chunks)
+            finally:
+                os.close(fd)
+            data = orjson.loads(raw)
+            self._cache[filename] = (version, data)
+            return data
+        except (FileNotFoundError, orjson.JSONDecodeError) as e:
             print(f"Error reading {filename}: {e}")
             return {}
     
@@ -27,56 +81,50 @@ class DataViewer:
         """Display all players and their stats."""
         players = self.load_json_file("players.json")
         
-        print("=" * 60)
-        print("PLAYERS")
-        print("=" * 60)
+        out = ["=" * 60, "PLAYERS", "=" * 60]
         
         if not players:
-            print("No players found.")
+            out.append("No players found.")
+            _write_lines(out)
             return
         
         for user_id, player in players.items():
-            print(f"\nPlayer: {player['username']} (ID: {user_id})")
-            print(f"  War College Level: {player.get('war_college_level', 1)}")
-            print(f"  Brigade Cap: {player.get('brigade_cap', 2)}")
-            print(f"  General Cap: {player.get('general_cap', 1)}")
-            print(f"  Silver: {player.get('silver', 0)}")
+            out.append(f"\nPlayer: {player['username']} (ID: {user_id})")
+            out.append(f"  War College Level: {player.get('war_college_level', 1)}")
+            out.append(f"  Brigade Cap: {player.get('brigade_cap', 2)}")
+            out.append(f"  General Cap: {player.get('general_cap', 1)}")
+            out.append(f"  Silver: {player.get('silver', 0)}")
             
             resources = player.get('resources', {})
             if resources:
                 resource_str = ", ".join([f"{k}: {v}" for k, v in resources.items()])
-                print(f"  Resources: {resource_str}")
+                out.append(f"  Resources: {resource_str}")
             
             cities = player.get('cities', [])
-            print(f"  Cities: {len(cities)}")
+            out.append(f"  Cities: {len(cities)}")
             
             if player.get('created_at'):
-                print(f"  Joined: {player['created_at']}")
+                out.append(f"  Joined: {player['created_at']}")
+        
+        _write_lines(out)
     
     def display_brigades(self):
         """Display all brigades."""
         brigades = self.load_json_file("brigades.json")
         players = self.load_json_file("players.json")
         
-        print("=" * 60)
-        print("BRIGADES")
-        print("=" * 60)
+        out = ["=" * 60, "BRIGADES", "=" * 60]
         
         if not brigades:
-            print("No brigades found.")
+            out.append("No brigades found.")
+            _write_lines(out)
             return
         
-        # Group by player
-        by_player = {}
-        for brigade_id, brigade in brigades.items():
-            player_id = str(brigade['player_id'])
-            if player_id not in by_player:
-                by_player[player_id] = []
-            by_player[player_id].append((brigade_id, brigade))
+        by_player = _group_by_player(brigades)
         
         for player_id, player_brigades in by_player.items():
             player_name = players.get(player_id, {}).get('username', f'Unknown ({player_id})')
-            print(f"\n{player_name}'s Brigades:")
+            out.append(f"\n{player_name}'s Brigades:")
             
             for brigade_id, brigade in player_brigades:
                 enhancement = f" ({brigade['enhancement']})" if brigade['enhancement'] else ""
@@ -89,38 +137,27 @@ class DataViewer:
                     status.append(f"Army: {brigade['army_id']}")
                 
                 status_str = f" [{', '.join(status)}]" if status else ""
-                print(f"  {brigade_id}: {brigade['type']}{enhancement} @ {brigade['location']}{status_str}")
+                out.append(f"  {brigade_id}: {brigade['type']}{enhancement} @ {brigade['location']}{status_str}")
+        
+        _write_lines(out)
     
     def display_generals(self):
         """Display all generals."""
         generals = self.load_json_file("generals.json")
         players = self.load_json_file("players.json")
         
-        print("=" * 60)
-        print("GENERALS")
-        print("=" * 60)
+        out = ["=" * 60, "GENERALS", "=" * 60]
         
         if not generals:
-            print("No generals found.")
+            out.append("No generals found.")
+            _write_lines(out)
             return
         
-        # Import trait names for display
-        try:
-            from models import GENERAL_TRAITS
-        except ImportError:
-            GENERAL_TRAITS = {}
-        
-        # Group by player
-        by_player = {}
-        for general_id, general in generals.items():
-            player_id = str(general['player_id'])
-            if player_id not in by_player:
-                by_player[player_id] = []
-            by_player[player_id].append((general_id, general))
+        by_player = _group_by_player(generals)
         
         for player_id, player_generals in by_player.items():
             player_name = players.get(player_id, {}).get('username', f'Unknown ({player_id})')
-            print(f"\n{player_name}'s Generals:")
+            out.append(f"\n{player_name}'s Generals:")
             
             for general_id, general in player_generals:
                 trait_id = general.get('trait_id', 1)
@@ -133,85 +170,84 @@ class DataViewer:
                     status.append(f"Army: {general['army_id']}")
                 
                 status_str = f" [{', '.join(status)}]" if status else ""
-                print(f"  {general_id}: {general['name']} (Level {general['level']}, {trait_name}){status_str}")
+                out.append(f"  {general_id}: {general['name']} (Level {general['level']}, {trait_name}){status_str}")
+        
+        _write_lines(out)
     
     def display_armies(self):
         """Display all armies."""
         armies = self.load_json_file("armies.json")
         players = self.load_json_file("players.json")
         
-        print("=" * 60)
-        print("ARMIES")
-        print("=" * 60)
+        out = ["=" * 60, "ARMIES", "=" * 60]
         
         if not armies:
-            print("No armies found.")
+            out.append("No armies found.")
+            _write_lines(out)
             return
         
-        # Group by player
-        by_player = {}
-        for army_id, army in armies.items():
-            player_id = str(army['player_id'])
-            if player_id not in by_player:
-                by_player[player_id] = []
-            by_player[player_id].append((army_id, army))
+        by_player = _group_by_player(armies)
         
         for player_id, player_armies in by_player.items():
             player_name = players.get(player_id, {}).get('username', f'Unknown ({player_id})')
-            print(f"\n{player_name}'s Armies:")
+            out.append(f"\n{player_name}'s Armies:")
             
             for army_id, army in player_armies:
                 brigade_count = len(army.get('brigade_ids', []))
-                print(f"  {army_id}: {army['name']} ({brigade_count} brigades)")
-                print(f"    General: {army.get('general_id', 'None')}")
-                print(f"    Location: {army.get('location', 'Unknown')}")
+                out.append(f"  {army_id}: {army['name']} ({brigade_count} brigades)")
+                out.append(f"    General: {army.get('general_id', 'None')}")
+                out.append(f"    Location: {army.get('location', 'Unknown')}")
                 
                 if army.get('brigade_ids'):
-                    print(f"    Brigades: {', '.join(army['brigade_ids'])}")
+                    out.append(f"    Brigades: {', '.join(army['brigade_ids'])}")
+        
+        _write_lines(out)
     
     def display_wars(self):
         """Display all wars."""
         wars = self.load_json_file("wars.json")
         players = self.load_json_file("players.json")
         
-        print("=" * 60)
-        print("WARS")
-        print("=" * 60)
+        out = ["=" * 60, "WARS", "=" * 60]
         
         if not wars:
-            print("No wars found.")
+            out.append("No wars found.")
+            _write_lines(out)
             return
         
         for war_id, war in wars.items():
             attacker_name = players.get(str(war['attacker_id']), {}).get('username', f"Player {war['attacker_id']}")
             defender_name = players.get(str(war['defender_id']), {}).get('username', f"Player {war['defender_id']}")
             
-            print(f"\nWar {war_id}: {attacker_name} vs {defender_name}")
-            print(f"  Justification: {war['justification']}")
-            print(f"  Status: {war['status']}")
-            print(f"  Started: {war.get('started_at', 'Unknown')}")
+            out.append(f"\nWar {war_id}: {attacker_name} vs {defender_name}")
+            out.append(f"  Justification: {war['justification']}")
+            out.append(f"  Status: {war['status']}")
+            out.append(f"  Started: {war.get('started_at', 'Unknown')}")
             
             if war.get('ended_at'):
-                print(f"  Ended: {war['ended_at']}")
+                out.append(f"  Ended: {war['ended_at']}")
+        
+        _write_lines(out)
     
     def display_game_state(self):
         """Display current game state."""
         game_state = self.load_json_file("game_state.json")
         
-        print("=" * 60)
-        print("GAME STATE")
-        print("=" * 60)
+        out = ["=" * 60, "GAME STATE", "=" * 60]
         
         if not game_state:
-            print("No game state found.")
+            out.append("No game state found.")
+            _write_lines(out)
             return
         
-        print(f"Current Phase: {game_state.get('current_phase', 'Unknown')}")
-        print(f"Cycle Start: {game_state.get('cycle_start_date', 'Unknown')}")
-        print(f"Last Updated: {game_state.get('updated_at', 'Unknown')}")
+        out.append(f"Current Phase: {game_state.get('current_phase', 'Unknown')}")
+        out.append(f"Cycle Start: {game_state.get('cycle_start_date', 'Unknown')}")
+        out.append(f"Last Updated: {game_state.get('updated_at', 'Unknown')}")
         
         if game_state.get('phase_end_time'):
-            print(f"Phase Ends: {game_state['phase_end_time']}")
+            out.append(f"Phase Ends: {game_state['phase_end_time']}")
+        
+        _write_lines(out)
     
     def display_summary(self):
         """Display a summary of all data."""
@@ -221,41 +257,35 @@ class DataViewer:
         armies = self.load_json_file("armies.json")
         wars = self.load_json_file("wars.json")
         
-        print("=" * 60)
-        print("GAME SUMMARY")
-        print("=" * 60)
+        out = ["=" * 60, "GAME SUMMARY", "=" * 60]
         
-        print(f"Players: {len(players)}")
-        print(f"Brigades: {len(brigades)}")
-        print(f"Generals: {len(generals)}")
-        print(f"Armies: {len(armies)}")
-        print(f"Wars: {len(wars)}")
+        out.append(f"Players: {len(players)}")
+        out.append(f"Brigades: {len(brigades)}")
+        out.append(f"Generals: {len(generals)}")
+        out.append(f"Armies: {len(armies)}")
+        out.append(f"Wars: {len(wars)}")
         
         # Active wars
         active_wars = [w for w in wars.values() if w.get('status') == 'active']
-        print(f"Active Wars: {len(active_wars)}")
+        out.append(f"Active Wars: {len(active_wars)}")
         
         # Brigade type breakdown
-        brigade_types = {}
-        for brigade in brigades.values():
-            btype = brigade.get('type', 'Unknown')
-            brigade_types[btype] = brigade_types.get(btype, 0) + 1
+        brigade_types = Counter(brigade.get('type', 'Unknown') for brigade in brigades.values())
         
         if brigade_types:
-            print("\nBrigade Types:")
+            out.append("\nBrigade Types:")
             for btype, count in sorted(brigade_types.items()):
-                print(f"  {btype}: {count}")
+                out.append(f"  {btype}: {count}")
         
         # War college levels
-        wc_levels = {}
-        for player in players.values():
-            level = player.get('war_college_level', 1)
-            wc_levels[level] = wc_levels.get(level, 0) + 1
+        wc_levels = Counter(player.get('war_college_level', 1) for player in players.values())
         
         if wc_levels:
-            print("\nWar College Levels:")
+            out.append("\nWar College Levels:")
             for level, count in sorted(wc_levels.items()):
-                print(f"  Level {level}: {count} players")
+                out.append(f"  Level {level}: {count} players")
+        
+        _write_lines(out)
 
 def main():
     """Main function with interactive menu."""
@@ -267,6 +297,16 @@ def main():
         print("Make sure the bot has been run at least once to create data files.")
         return
     
+    actions = {
+        '1': viewer.display_summary,
+        '2': viewer.display_players,
+        '3': viewer.display_brigades,
+        '4': viewer.display_generals,
+        '5': viewer.display_armies,
+        '6': viewer.display_wars,
+        '7': viewer.display_game_state,
+    }
+    
     while True:
         print("\n" + "=" * 60)
         print("DISCORD HEGEMONY BOT - DATA VIEWER")
@@ -282,23 +322,13 @@ def main():
         
         choice = input("\nSelect option (1-8): ").strip()
         
-        if choice == '1':
-            viewer.display_summary()
-        elif choice == '2':
-            viewer.display_players()
-        elif choice == '3':
-            viewer.display_brigades()
-        elif choice == '4':
-            viewer.display_generals()
-        elif choice == '5':
-            viewer.display_armies()
-        elif choice == '6':
-            viewer.display_wars()
-        elif choice == '7':
-            viewer.display_game_state()
-        elif choice == '8':
+        if choice == '8':
             print("Goodbye!")
             break
+        
+        action = actions.get(choice)
+        if action:
+            action()
         else:
             print("Invalid choice. Please select 1-8.")
         